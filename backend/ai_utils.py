@@ -1,7 +1,10 @@
-import pandas as pd
-import numpy as np
 import re
 
+from .lazy import lazy_import
+
+pd = lazy_import("pandas")
+np = lazy_import("numpy")
+
 # --- Definisi Fungsi Transformasi Kustom ---
 
 # Helper functions (dipanggil oleh transformer)
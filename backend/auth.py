@@ -34,6 +34,14 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
+def get_username_from_token(token: str) -> Optional[str]:
+    """Decode JWT dan kembalikan username, None jika token tidak valid."""
+    try:
+        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+    except JWTError:
+        return None
+    return payload.get("sub")
+
 # Dependency untuk mendapatkan user saat ini dari token
 # Ini akan digunakan untuk melindungi rute
 async def get_current_user(token: str = Depends(oauth2_scheme)):
@@ -42,12 +50,8 @@ async def get_current_user(token: str = Depends(oauth2_scheme)):
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
-    try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        username: str = payload.get("sub")
-        if username is None:
-            raise credentials_exception
-    except JWTError:
+    username = get_username_from_token(token)
+    if username is None:
         raise credentials_exception
     # Di aplikasi nyata, Anda akan memvalidasi user dari database
     # Di sini kita anggap token valid jika bisa di-decode
@@ -0,0 +1,347 @@
+"""
+Generator data sintetis untuk data_raw & laporan_masalah (Postgres lokal).
+
+Contoh:
+    python -m backend.bench.generate_data --rows 10000
+    python -m backend.bench.generate_data --rows 1000000 --laporan 50000 --truncate
+
+Format nilai mengikuti data asli ("Rp 72.000", "2.400 btg", "12 th") termasuk
+variasi penulisan yang memang ada di lapangan ("tengkulak"/"Tengkulak", "0").
+
+Target diambil dari BENCH_DATABASE_URL (default: DATABASE_URL aplikasi). Host
+selain localhost ditolak kecuali dengan --force, supaya --truncate tidak
+pernah mengosongkan database produksi tanpa sengaja.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+from datetime import date, timedelta
+from urllib.parse import urlparse
+
+import asyncpg
+
+from backend.database import DATABASE_URL
+
+BENCH_DATABASE_URL = os.getenv("BENCH_DATABASE_URL", DATABASE_URL)
+LOCAL_HOSTS = {"", "localhost", "127.0.0.1", "::1"}
+BATCH_SIZE = 10000
+PRESETS = {"1k": 1000, "10k": 10000, "100k": 100000, "1m": 1000000}
+
+DATA_RAW_COLUMNS = [
+    ("NO", "INTEGER PRIMARY KEY"),
+    ("KECAMATAN", "TEXT"),
+    ("DESA", "TEXT"),
+    ("DUSUN", "TEXT"),
+    ("RT", "INTEGER"),
+    ("RW", "INTEGER"),
+    ("SURVEYOR", "TEXT"),
+    ("TGL PENDATAAN", "TEXT"),
+    ("PEMERIKSA", "TEXT"),
+    ("TGL PERIKSA", "TEXT"),
+    ("NAMA", "TEXT"),
+    ("JENIS KELAMIN", "TEXT"),
+    ("USIA", "INTEGER"),
+    ("NO HP", "BIGINT"),
+    ("KELOMPOK TANI", "TEXT"),
+    ("LAMA BERTANI", "TEXT"),
+    ("TOTAL LAHAN (M2)", "INTEGER"),
+    ("JUMLAH LAHAN", "INTEGER"),
+    ("STATUS KEPEMILIKAN", "TEXT"),
+    ("JENIS KOPI", "TEXT"),
+    ("VARIETAS KOPI", "TEXT"),
+    ("VARIETAS UNGGUL", "TEXT"),
+    ("POPULASI KOPI", "TEXT"),
+    ("TANAMAN LAINNYA", "TEXT"),
+    ("METODE BUDIDAYA", "TEXT"),
+    ("PUPUK", "TEXT"),
+    ("SISTEM IRIGASI", "TEXT"),
+    ("HASIL PER TAHUN (kg)", "INTEGER"),
+    ("PANEN NON KOPI", "TEXT"),
+    ("METODE PANEN", "TEXT"),
+    ("METODE PENGOLAHAN", "TEXT"),
+    ("ALAT PENGOLAHAN", "TEXT"),
+    ("LAMA FERMENTASI", "TEXT"),
+    ("PROSES PENGERINGAN", "TEXT"),
+    ("BENTUK PENYIMPANAN", "TEXT"),
+    ("KADAR AIR", "TEXT"),
+    ("SISTEM PENYIMPANAN", "TEXT"),
+    ("METODE PENJUALAN", "TEXT"),
+    ("HARGA JUAL PER KG", "TEXT"),
+    ("KEMITRAAN", "TEXT"),
+    ("MASALAH", "TEXT"),
+    ("PELATIHAN YANG DIPERLUKAN", "TEXT"),
+    ("CATATAN", "TEXT"),
+]
+
+DATA_RAW_DDL = "CREATE TABLE IF NOT EXISTS data_raw ({})".format(
+    ", ".join(f'"{name}" {sql_type}' for name, sql_type in DATA_RAW_COLUMNS)
+)
+
+LAPORAN_DDL = """
+CREATE TABLE IF NOT EXISTS laporan_masalah (
+    id SERIAL PRIMARY KEY,
+    nama_petani TEXT NOT NULL,
+    masalah TEXT NOT NULL,
+    detail_petani JSONB,
+    status TEXT NOT NULL DEFAULT 'pending',
+    validated_by TEXT,
+    validated_at TIMESTAMPTZ,
+    created_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+)
+"""
+
+# ======================================================
+# 🎲 Kamus nilai realistis
+# ======================================================
+WILAYAH = {
+    "Ijen": {
+        "Kalianyar": ["Krajan", "Kebun", "Sukorejo"],
+        "Kalisat": ["Blawan", "Jampit"],
+        "Sempol": ["Sempol Barat", "Sempol Timur", "Pondok Kopi"],
+    },
+    "Sumberwringin": {
+        "Sukorejo": ["Krajan", "Sumber Gading"],
+        "Rejoagung": ["Tegal", "Gunung Malang"],
+    },
+    "Botolinggo": {
+        "Lanas": ["Krajan", "Lanas Barat"],
+        "Sumbercanting": ["Karang Anyar", "Kopi Luhur"],
+    },
+}
+NAMA_DEPAN = [
+    "Ahmad", "Budi", "Siti", "Dewi", "Hendra", "Rina", "Yusuf", "Fitri", "Slamet",
+    "Sri", "Agus", "Sugeng", "Wahyu", "Nur", "Eko", "Sutrisno", "Misnah", "Rahmat",
+    "Supardi", "Ponidi", "Tuminah", "Hasan", "Mat", "Suparman", "Lilik",
+]
+NAMA_BELAKANG = [
+    "Santoso", "Aminah", "Lestari", "Kusuma", "Wulandari", "Ibrahim", "Handayani",
+    "Hidayat", "Prasetyo", "Rahayu", "Susanto", "Wijaya", "Saputra", "Hasanah", "",
+]
+KELOMPOK_TANI = [
+    "Tani Makmur", "Sumber Rejeki", "Kopi Ijen Lestari", "Gunung Raung", "Sido Mulyo",
+    "Maju Bersama", "Tunas Harapan", "Kopi Luhur", "Sri Rejeki", "Mekar Sari",
+]
+SURVEYOR = ["Andi", "Bayu", "Citra", "Dimas", "Eka"]
+PEMERIKSA = ["Pak Harun", "Bu Lina", "Pak Joko"]
+JENIS_KOPI = [("Arabika", 60), ("Robusta", 30), ("Arabika dan Robusta", 8), ("arabika", 2)]
+VARIETAS_KOPI = [
+    ("Sigararutang", 30), ("Lini S 795", 20), ("Kartika", 15), ("Komasti", 10),
+    ("Typica", 10), ("BP 42", 8), ("Andungsari", 7),
+]
+METODE_BUDIDAYA = [("organik", 45), ("kombinasi", 50), ("Organik", 5)]
+PUPUK = [("organik", 35), ("kimia", 25), ("kombinasi", 40)]
+SISTEM_IRIGASI = [("Tadah hujan", 90), ("Irigasi sederhana", 10)]
+METODE_PANEN = [("petik merah", 60), ("Petik selektif", 35), ("Petik pelangi", 5)]
+METODE_PENGOLAHAN = [("Natural", 35), ("Full wash", 30), ("Semi wash", 20), ("Honey", 15)]
+ALAT_PENGOLAHAN = ["Pulper manual", "Pulper mesin", "Huller", "Tidak ada"]
+LAMA_FERMENTASI = [("12 jam", 30), ("24 jam", 35), ("36 jam", 10), ("Tidak ada", 25)]
+PROSES_PENGERINGAN = [("Para-para", 45), ("Lantai jemur", 40), ("Dome", 15)]
+BENTUK_PENYIMPANAN = [("Green bean", 50), ("Gabah", 35), ("Cherry kering", 15)]
+SISTEM_PENYIMPANAN = [("Karung plastik", 50), ("Karung goni", 40), ("Hermetic bag", 10)]
+METODE_PENJUALAN = [("tengkulak", 35), ("Tengkulak", 15), ("Koperasi", 30), ("Langsung ke roaster", 20)]
+KEMITRAAN = [("Tidak Ada", 40), ("0", 15), ("tengkulak", 10), ("Koperasi", 20), ("Perhutani", 15)]
+STATUS_KEPEMILIKAN = [("Milik sendiri", 60), ("Sewa", 15), ("Lahan Perhutani", 25)]
+TANAMAN_LAINNYA = ["Pisang", "Sengon", "Cengkeh", "Jeruk", "Alpukat", "Tidak ada"]
+KADAR_AIR = ["11%", "12%", "13%", "14%", "Tidak diukur"]
+
+MASALAH_TEMPLATES = [
+    "Hama penggerek buah kopi menyerang {persen} tanaman",
+    "Harga jual ke tengkulak rendah, hanya {harga} per kg",
+    "Pupuk subsidi langka dan harga pupuk non subsidi mahal",
+    "Kesulitan air saat musim kemarau sehingga buah banyak rontok",
+    "Tidak punya alat pengolahan sendiri, harus sewa pulper",
+    "Jalan ke kebun rusak, biaya angkut hasil panen tinggi",
+    "Tanaman sudah tua dan produktivitas turun",
+    "Belum paham cara fermentasi yang benar untuk kopi specialty",
+    "Serangan jamur akar dan karat daun saat musim hujan",
+    "Modal untuk peremajaan tanaman tidak cukup",
+]
+PELATIHAN_TEMPLATES = [
+    "Pelatihan pengolahan pasca panen dan fermentasi",
+    "Pelatihan pengendalian hama terpadu",
+    "Pelatihan pemasaran digital dan branding kopi",
+    "Pelatihan pembuatan pupuk organik",
+    "Pelatihan pemangkasan dan peremajaan tanaman",
+    "Pelatihan cupping dan standar mutu kopi specialty",
+]
+
+
+def _weighted(rng, options):
+    values, weights = zip(*options)
+    return rng.choices(values, weights=weights)[0]
+
+
+def _rupiah(value):
+    return f"Rp {value:,}".replace(",", ".")
+
+
+def _ribuan(value):
+    return f"{value:,}".replace(",", ".")
+
+
+def _maybe(rng, value, missing=0.03, empty=True):
+    """Sisipkan nilai kosong (NULL / string kosong) seperti di data survei asli"""
+    roll = rng.random()
+    if roll < missing:
+        return None
+    if empty and roll < missing * 1.5:
+        return ""
+    return value
+
+
+def generate_petani(rng, no):
+    """Satu baris data_raw sintetis (urutan kolom sama dengan DDL)"""
+    kecamatan = rng.choice(list(WILAYAH))
+    desa = rng.choice(list(WILAYAH[kecamatan]))
+    dusun = rng.choice(WILAYAH[kecamatan][desa])
+    tgl = date(2025, 1, 1) + timedelta(days=rng.randint(0, 300))
+
+    lahan = int(rng.lognormvariate(8.8, 0.7))
+    populasi = max(50, int(lahan / rng.uniform(3, 6)))
+    hasil = int(populasi * rng.uniform(0.2, 1.2))
+    harga = rng.choice(range(45000, 95001, 2500))
+
+    return (
+        no,
+        kecamatan,
+        desa,
+        dusun,
+        rng.randint(1, 15),
+        rng.randint(1, 8),
+        rng.choice(SURVEYOR),
+        tgl.strftime("%d/%m/%Y"),
+        rng.choice(PEMERIKSA),
+        (tgl + timedelta(days=rng.randint(1, 14))).strftime("%d/%m/%Y"),
+        f"{rng.choice(NAMA_DEPAN)} {rng.choice(NAMA_BELAKANG)}".strip(),
+        rng.choice(["L", "L", "L", "P"]),
+        rng.randint(22, 75),
+        int(f"8{rng.randint(1000000000, 9999999999)}"),
+        rng.choice(KELOMPOK_TANI),
+        f"{rng.randint(1, 40)} th",
+        lahan,
+        rng.randint(1, 4),
+        _weighted(rng, STATUS_KEPEMILIKAN),
+        _weighted(rng, JENIS_KOPI),
+        _weighted(rng, VARIETAS_KOPI),
+        rng.choice(["Ya", "Tidak"]),
+        f"{_ribuan(populasi)} btg",
+        rng.choice(TANAMAN_LAINNYA),
+        _weighted(rng, METODE_BUDIDAYA),
+        _weighted(rng, PUPUK),
+        _weighted(rng, SISTEM_IRIGASI),
+        _maybe(rng, hasil, empty=False),
+        rng.choice(["Pisang", "Cengkeh", "Tidak ada"]),
+        _weighted(rng, METODE_PANEN),
+        _weighted(rng, METODE_PENGOLAHAN),
+        rng.choice(ALAT_PENGOLAHAN),
+        _weighted(rng, LAMA_FERMENTASI),
+        _weighted(rng, PROSES_PENGERINGAN),
+        _weighted(rng, BENTUK_PENYIMPANAN),
+        rng.choice(KADAR_AIR),
+        _weighted(rng, SISTEM_PENYIMPANAN),
+        _weighted(rng, METODE_PENJUALAN),
+        _maybe(rng, _rupiah(harga)),
+        _weighted(rng, KEMITRAAN),
+        _maybe(rng, generate_masalah(rng), missing=0.1),
+        _maybe(rng, rng.choice(PELATIHAN_TEMPLATES), missing=0.1),
+        None,
+    )
+
+
+def generate_masalah(rng):
+    return rng.choice(MASALAH_TEMPLATES).format(
+        persen=f"{rng.randint(10, 60)}%", harga=_rupiah(rng.choice(range(30000, 60001, 5000)))
+    )
+
+
+def generate_laporan(rng):
+    """Satu baris laporan_masalah sintetis"""
+    status = _weighted(rng, [("pending", 30), ("valid", 55), ("invalid", 15)])
+    validated = status != "pending"
+    return (
+        f"{rng.choice(NAMA_DEPAN)} {rng.choice(NAMA_BELAKANG)}".strip(),
+        generate_masalah(rng),
+        json.dumps({"kelompok_tani": rng.choice(KELOMPOK_TANI)}),
+        status,
+        rng.choice(PEMERIKSA) if validated else None,
+    )
+
+
+# ======================================================
+# 🚀 Insert massal dengan COPY
+# ======================================================
+def is_local(url):
+    """True jika URL menunjuk ke Postgres lokal (localhost / unix socket)"""
+    return (urlparse(url).hostname or "") in LOCAL_HOSTS
+
+
+async def main(rows, laporan, truncate, seed):
+    rng = random.Random(seed)
+    conn = await asyncpg.connect(BENCH_DATABASE_URL)
+    try:
+        await conn.execute(DATA_RAW_DDL)
+        await conn.execute(LAPORAN_DDL)
+        if truncate:
+            await conn.execute("TRUNCATE data_raw, laporan_masalah RESTART IDENTITY")
+
+        columns = [name for name, _ in DATA_RAW_COLUMNS]
+        start_no = await conn.fetchval('SELECT COALESCE(MAX("NO"), 0) + 1 FROM data_raw')
+
+        inserted = 0
+        while inserted < rows:
+            size = min(BATCH_SIZE, rows - inserted)
+            batch = [generate_petani(rng, start_no + inserted + i) for i in range(size)]
+            await conn.copy_records_to_table(
+                "data_raw", records=batch, columns=columns
+            )
+            inserted += size
+            print(f"data_raw: {inserted}/{rows}")
+
+        if laporan:
+            batch = [generate_laporan(rng) for _ in range(laporan)]
+            await conn.executemany(
+                """
+                INSERT INTO laporan_masalah (nama_petani, masalah, detail_petani, status, validated_by, validated_at)
+                VALUES ($1, $2, $3::jsonb, $4, $5, CASE WHEN $5::text IS NULL THEN NULL ELSE NOW() END)
+                """,
+                batch,
+            )
+            print(f"laporan_masalah: {laporan}")
+
+        await conn.execute("ANALYZE data_raw")
+        await conn.execute("ANALYZE laporan_masalah")
+    finally:
+        await conn.close()
+
+
+def parse_rows(value):
+    return PRESETS.get(value.lower()) or int(value)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument(
+        "--rows", type=parse_rows, default=1000, help="Jumlah petani (angka atau 1k/10k/100k/1m)"
+    )
+    parser.add_argument(
+        "--laporan", type=int, default=None, help="Jumlah laporan_masalah (default rows/20)"
+    )
+    parser.add_argument("--truncate", action="store_true", help="Kosongkan tabel dulu")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument(
+        "--force", action="store_true", help="Izinkan host database selain localhost"
+    )
+    args = parser.parse_args()
+
+    if not is_local(BENCH_DATABASE_URL) and not args.force:
+        host = urlparse(BENCH_DATABASE_URL).hostname
+        raise SystemExit(
+            f"Menolak menulis ke host '{host}'. Set BENCH_DATABASE_URL ke database "
+            "benchmark lokal, atau tambahkan --force jika memang disengaja."
+        )
+
+    laporan = args.laporan if args.laporan is not None else args.rows // 20
+    asyncio.run(main(args.rows, laporan, args.truncate, args.seed))
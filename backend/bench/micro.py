@@ -0,0 +1,166 @@
+"""
+Micro-benchmark untuk formatter utils.py, transformer ai_utils.py dan
+validator PetaniBase (semuanya dipanggil per baris / per field).
+
+Contoh:
+    python -m backend.bench.micro                      # bandingkan dengan baseline
+    python -m backend.bench.micro --size 50000 --only utils
+    python -m backend.bench.micro --update-baseline    # simpan hasil sebagai baseline baru
+
+Hasil dalam mikrodetik per item (nilai minimum dari beberapa ulangan).
+Exit code 1 jika ada kasus yang lebih lambat dari baseline x --tolerance,
+sehingga bisa dipasang di CI. Baseline bergantung mesin: perbarui dengan
+--update-baseline di mesin CI yang sama.
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import timeit
+
+import pandas as pd
+
+from backend import ai_utils, utils
+from backend.bench.generate_data import DATA_RAW_COLUMNS, generate_petani
+from backend.schemas import PetaniBase
+
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), "micro_baseline.json")
+
+# Nilai "kotor" yang memang muncul di data survei & input form
+MESSY_CURRENCY = [
+    "Rp 72.000", "72000", "72.000", "Rp72.000", "rp 65.000", "Rp 72.000,-",
+    72000, 72000.0, "", "-", None, "None", "tidak tahu", " 55.000 ",
+]
+MESSY_NUMBER = [
+    "2.400 btg", "2400 btg", "2400btg", "1.200 pohon", "800", 800, "1,500",
+    "", "-", None, "kurang lebih 300", "3.000 BTG",
+]
+MESSY_PHONE = [
+    "085646411390", "62 856 464 11390", "+62-856-464-11390", 85646411390,
+    "0812 3456 789", "-", "", None, "tidak ada", "(0331) 123456",
+]
+MESSY_INT = ["123", 123, "123.45", "1.250", "Rp 5.000", "", "-", None, "nan", "abc", 0]
+
+
+def _take(rng, values, size):
+    return [rng.choice(values) for _ in range(size)]
+
+
+def _petani_rows(rng, size):
+    """Baris sintetis dari generator + sebagian field dibuat kotor"""
+    names = [name for name, _ in DATA_RAW_COLUMNS]
+    rows = []
+    for no in range(1, size + 1):
+        row = dict(zip(names, generate_petani(rng, no)))
+        if rng.random() < 0.3:
+            row["HARGA JUAL PER KG"] = rng.choice(MESSY_CURRENCY)
+            row["POPULASI KOPI"] = rng.choice(MESSY_NUMBER)
+            row["NO HP"] = rng.choice(MESSY_PHONE)
+            row["TOTAL LAHAN (M2)"] = rng.choice(MESSY_INT)
+            row["LAMA BERTANI"] = rng.choice(["12", "12 tahun", "12 th", "", "-", None])
+            row["TGL PENDATAAN"] = rng.choice(["2025-03-05", "05/03/2025", "", None])
+        rows.append(row)
+    return rows
+
+
+def build_cases(size, seed):
+    """Daftar (grup, nama, fungsi tanpa argumen, jumlah item per panggilan)"""
+    rng = random.Random(seed)
+    currency = _take(rng, MESSY_CURRENCY, size)
+    number = _take(rng, MESSY_NUMBER, size)
+    phone = _take(rng, MESSY_PHONE, size)
+    integers = _take(rng, MESSY_INT, size)
+    rows = _petani_rows(rng, size)
+    df = pd.DataFrame(rows)
+    # Input impute = hasil tiga transformer pembersih, seperti urutan di pipeline
+    cleaned_df = ai_utils.transform_clean_lama_bertani(
+        ai_utils.transform_clean_populasi(ai_utils.transform_clean_harga(df))
+    )
+
+    def each(func, values):
+        return lambda: [func(v) for v in values]
+
+    return [
+        ("utils", "format_currency", each(utils.format_currency, currency), size),
+        ("utils", "format_number", each(utils.format_number, number), size),
+        ("utils", "clean_phone_number", each(utils.clean_phone_number, phone), size),
+        ("utils", "safe_int", each(utils.safe_int, integers), size),
+        ("utils", "clean_currency_input", each(utils.clean_currency_input, currency), size),
+        ("utils", "clean_number_input", each(utils.clean_number_input, number), size),
+        ("ai_utils", "transform_clean_harga", lambda: ai_utils.transform_clean_harga(df), size),
+        ("ai_utils", "transform_clean_populasi", lambda: ai_utils.transform_clean_populasi(df), size),
+        ("ai_utils", "transform_clean_lama_bertani", lambda: ai_utils.transform_clean_lama_bertani(df), size),
+        ("ai_utils", "transform_replace_kemitraan", lambda: ai_utils.transform_replace_kemitraan(df), size),
+        ("ai_utils", "transform_impute_missing", lambda: ai_utils.transform_impute_missing(cleaned_df), size),
+        ("schemas", "PetaniBase.model_validate", each(PetaniBase.model_validate, rows), size),
+    ]
+
+
+def run(size, seed, repeat, only=None):
+    """Jalankan semua kasus, kembalikan {grup.nama: mikrodetik per item}"""
+    results = {}
+    for group, name, func, items in build_cases(size, seed):
+        if only and group not in only:
+            continue
+        best = min(timeit.repeat(func, number=1, repeat=repeat))
+        key = f"{group}.{name}"
+        results[key] = round(best / items * 1e6, 4)
+        print(f"{key:45} {results[key]:>10.4f} µs/item")
+    return results
+
+
+def check(results, baseline, tolerance):
+    """Bandingkan dengan baseline, kembalikan daftar kasus yang regresi"""
+    regressions = []
+    for key, value in results.items():
+        reference = baseline.get(key)
+        if reference is None:
+            print(f"{key:45} (belum ada baseline)")
+            continue
+        ratio = value / reference if reference else 1
+        marker = "REGRESI" if ratio > tolerance else "ok"
+        print(f"{key:45} {reference:>10.4f} -> {value:>10.4f}  x{ratio:.2f}  {marker}")
+        if ratio > tolerance:
+            regressions.append(key)
+    return regressions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--size", type=int, default=20000, help="Jumlah item per kasus")
+    parser.add_argument("--repeat", type=int, default=7)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--only", action="append", choices=["utils", "ai_utils", "schemas"])
+    parser.add_argument(
+        "--tolerance", type=float, default=2.0, help="Batas rasio terhadap baseline"
+    )
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--update-baseline", action="store_true")
+    args = parser.parse_args()
+
+    results = run(args.size, args.seed, args.repeat, args.only)
+
+    if args.update_baseline:
+        baseline = {}
+        if os.path.exists(args.baseline):
+            with open(args.baseline) as f:
+                baseline = json.load(f)
+        baseline.update(results)
+        with open(args.baseline, "w") as f:
+            json.dump(baseline, f, indent=2, sort_keys=True)
+        print(f"\nBaseline diperbarui: {args.baseline}")
+        sys.exit(0)
+
+    if not os.path.exists(args.baseline):
+        print(f"\nBaseline {args.baseline} belum ada, jalankan dengan --update-baseline")
+        sys.exit(0)
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    print()
+    regressions = check(results, baseline, args.tolerance)
+    if regressions:
+        print(f"\n{len(regressions)} kasus lebih lambat dari baseline x{args.tolerance}")
+        sys.exit(1)
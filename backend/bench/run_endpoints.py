@@ -0,0 +1,345 @@
+"""
+Benchmark end-to-end untuk semua route API (latensi & throughput).
+
+Jalankan server dulu (mis. `uvicorn backend.main:app`) di atas data dari
+generate_data, lalu:
+    python -m backend.bench.run_endpoints --base-url http://localhost:8000 \\
+        --requests 50 --concurrency 4 --output bench-10k.json
+    python -m backend.bench.run_endpoints ... --compare bench-10k-lama.json
+
+Route tulis (POST/PUT/DELETE petani & laporan) hanya dijalankan dengan
+--include-writes, dan hanya ke server & database lokal (localhost, sama seperti
+generate_data) kecuali dengan --force. PUT/DELETE petani memakai baris yang
+dibuat benchmark sendiri, tidak pernah baris petani asli.
+/analysis/recommendation (Gemini, berbayar) dengan
+--include-external. POST /admin/data-quality/fill (isi massal data_raw) tidak
+pernah dijalankan. Route /admin butuh token (login otomatis dengan
+--include-writes atau --include-admin); tanpa token route itu dilewati.
+Route yang path param-nya tidak bisa diisi juga dilewati, bukan diukur
+sebagai 404. Route websocket tidak ada di OpenAPI sehingga dilewati.
+"""
+
+import argparse
+import json
+import platform
+import random
+import re
+import statistics
+import subprocess
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+
+from backend.bench.generate_data import BENCH_DATABASE_URL, generate_masalah, is_local
+
+TIMEOUT = 120  # detik, clustering di 1M baris bisa lama
+
+# Route berbayar/eksternal, hanya dengan --include-external
+EXTERNAL_ROUTES = {("POST", "/analysis/recommendation")}
+# Route yang butuh token (router /admin memakai dependency auth)
+AUTH_PREFIXES = ("/admin",)
+# Route admin yang mengubah data massal, tidak pernah dijalankan
+DESTRUCTIVE_ROUTES = {("POST", "/admin/data-quality/fill")}
+
+
+class Client:
+    def __init__(self, base_url, token=None):
+        self.base_url = base_url.rstrip("/")
+        self.token = token
+
+    def request(self, method, path, body=None, form=None):
+        """Kirim request, kembalikan (status, durasi detik, body json/None)"""
+        headers = {}
+        data = None
+        if body is not None:
+            data = json.dumps(body).encode()
+            headers["Content-Type"] = "application/json"
+        elif form is not None:
+            data = urllib.parse.urlencode(form).encode()
+            headers["Content-Type"] = "application/x-www-form-urlencoded"
+        if self.token:
+            headers["Authorization"] = f"Bearer {self.token}"
+
+        req = urllib.request.Request(
+            self.base_url + path, data=data, headers=headers, method=method
+        )
+        start = time.perf_counter()
+        try:
+            with urllib.request.urlopen(req, timeout=TIMEOUT) as resp:
+                payload = resp.read()
+                status = resp.status
+        except urllib.error.HTTPError as e:
+            payload = e.read()
+            status = e.code
+        except (urllib.error.URLError, TimeoutError):
+            return 0, time.perf_counter() - start, None
+        elapsed = time.perf_counter() - start
+
+        try:
+            return status, elapsed, json.loads(payload)
+        except ValueError:
+            return status, elapsed, None
+
+
+def discover_routes(client):
+    """Ambil daftar (method, path) dari skema OpenAPI server (sama dengan route di main.py)"""
+    status, _, spec = client.request("GET", "/openapi.json")
+    if status != 200 or not spec:
+        raise SystemExit(f"Tidak bisa membaca /openapi.json dari {client.base_url}")
+
+    routes = []
+    for path, operations in spec["paths"].items():
+        for method in sorted(operations):
+            routes.append((method.upper(), path))
+    return routes
+
+
+def build_plans(client, rng, include_writes, include_external, credentials):
+    """Susun request konkret untuk setiap route (isi path param & body contoh)"""
+    summary = client.request("GET", "/dashboard/summary")[2] or {}
+    sample_no = 1
+    pending = client.request("GET", "/analysis/laporan-masalah?limit=1")[2] or []
+    sample_laporan = pending[0]["id"] if pending else 1
+
+    path_params = {
+        "petani_no": str(sample_no),
+        "cluster_type": "produk_budidaya",
+        "cluster_id": "0",
+    }
+    if client.token:
+        profiles = client.request("GET", "/admin/profiles")[2] or []
+        if profiles:
+            path_params["profile_id"] = profiles[0]["id"]
+
+    petani_body = {
+        "NAMA": "Petani Benchmark",
+        "KECAMATAN": "Ijen",
+        "DESA": "Sempol",
+        "KELOMPOK TANI": "Tani Makmur",
+        "TOTAL LAHAN (M2)": "5.000",
+        "HASIL PER TAHUN (kg)": 800,
+        "HARGA JUAL PER KG": "Rp 72.000",
+        "POPULASI KOPI": "1.200 btg",
+        "JENIS KOPI": "Arabika",
+    }
+
+    plans = []
+    for method, path in discover_routes(client):
+        if (method, path) in DESTRUCTIVE_ROUTES:
+            continue
+        if (method, path) in EXTERNAL_ROUTES and not include_external:
+            continue
+        if method != "GET" and not include_writes:
+            continue
+        if path.startswith(AUTH_PREFIXES) and not client.token:
+            continue
+
+        concrete = re.sub(
+            r"\{(\w+)\}", lambda m: path_params.get(m.group(1), m.group(0)), path
+        )
+        if "{" in concrete:
+            print(f"Lewati {method} {path}: path param tidak bisa diisi")
+            continue
+        plan = {"method": method, "route": path, "path": concrete, "body": None}
+
+        if (method, path) == ("POST", "/token"):
+            plan["form"] = credentials
+        elif (method, path) == ("POST", "/petani/"):
+            plan["body"] = petani_body
+        elif (method, path) == ("PUT", "/petani/{petani_no}"):
+            plan["body"] = {"CATATAN": "benchmark"}
+            plan["update_created"] = True
+        elif (method, path) == ("DELETE", "/petani/{petani_no}"):
+            plan["delete_after_create"] = True
+        elif (method, path) == ("POST", "/analysis/laporan-masalah"):
+            plan["body_factory"] = lambda: {
+                "masalah": generate_masalah(rng),
+                "nama_petani": "Benchmark",
+            }
+        elif (method, path) == ("POST", "/analysis/laporan-masalah/validate"):
+            plan["body"] = {
+                "laporan_id": sample_laporan,
+                "status": "valid",
+                "validator_name": "benchmark",
+            }
+        elif (method, path) == ("POST", "/analysis/laporan-masalah/validate-bulk"):
+            plan["body"] = {
+                "laporan_ids": [sample_laporan],
+                "status": "valid",
+                "validator_name": "benchmark",
+            }
+        elif (method, path) == ("POST", "/analysis/recommendation"):
+            plan["body"] = {"masalah": generate_masalah(rng)}
+        plans.append(plan)
+
+    return plans, summary.get("total_petani")
+
+
+def create_bench_row(client, nama):
+    """Buat baris petani milik benchmark: (NO, None) atau (None, hasil request gagal)"""
+    status, elapsed, created = client.request("POST", "/petani/", body={"NAMA": nama})
+    if 200 <= status < 300 and created and "NO" in created:
+        return created["NO"], None
+    # Status 2xx tanpa NO tetap dihitung error
+    return None, (status if status >= 300 else 0, elapsed, None)
+
+
+def run_plan(client, plan, total, concurrency):
+    """
+    Jalankan satu route `total` kali dengan `concurrency` thread. None jika
+    baris uji untuk PUT tidak bisa dibuat.
+    """
+    path = plan["path"]
+    if plan.get("update_created"):
+        created_no, _ = create_bench_row(client, "Petani Benchmark Update")
+        if created_no is None:
+            print(f"Lewati {plan['method']} {plan['route']}: gagal membuat baris uji")
+            return None
+        path = f"/petani/{created_no}"
+
+    def one(_):
+        if plan.get("delete_after_create"):
+            # DELETE butuh baris baru setiap iterasi supaya tidak 404; jika
+            # create gagal, iterasi dihitung error (tidak pernah menghapus NO asli)
+            created_no, failed = create_bench_row(client, "Petani Benchmark Hapus")
+            if created_no is None:
+                return failed
+            return client.request("DELETE", f"/petani/{created_no}")
+        body = plan["body_factory"]() if "body_factory" in plan else plan["body"]
+        return client.request(plan["method"], path, body=body, form=plan.get("form"))
+
+    # Satu request pemanasan (koneksi, cache model) tidak dihitung
+    one(None)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(one, range(total)))
+    wall = time.perf_counter() - start
+
+    if plan.get("update_created"):
+        client.request("DELETE", path)
+
+    durations = sorted(r[1] * 1000 for r in results)
+    errors = sum(1 for r in results if not (200 <= r[0] < 300))
+    quantiles = statistics.quantiles(durations, n=100) if len(durations) > 1 else durations * 99
+
+    return {
+        "method": plan["method"],
+        "route": plan["route"],
+        "requests": total,
+        "errors": errors,
+        "mean_ms": round(statistics.fmean(durations), 2),
+        "p50_ms": round(quantiles[49], 2),
+        "p95_ms": round(quantiles[94], 2),
+        "p99_ms": round(quantiles[98], 2),
+        "max_ms": round(durations[-1], 2),
+        "throughput_rps": round(total / wall, 2),
+    }
+
+
+def compare(current, baseline_path):
+    """Cetak perubahan p50/p95 dibanding laporan sebelumnya"""
+    with open(baseline_path) as f:
+        baseline = {(r["method"], r["route"]): r for r in json.load(f)["results"]}
+
+    print(f"\n{'route':55} {'p50 lama':>10} {'p50 baru':>10} {'p95 Δ%':>8}")
+    for result in current["results"]:
+        old = baseline.get((result["method"], result["route"]))
+        if not old:
+            continue
+        delta = (result["p95_ms"] - old["p95_ms"]) / old["p95_ms"] * 100 if old["p95_ms"] else 0
+        label = f"{result['method']} {result['route']}"
+        print(f"{label:55} {old['p50_ms']:>10} {result['p50_ms']:>10} {delta:>+7.1f}%")
+
+
+def git_commit():
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], text=True, stderr=subprocess.DEVNULL
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def login(base_url, username, password):
+    status, _, body = Client(base_url).request(
+        "POST", "/token", form={"username": username, "password": password}
+    )
+    if status != 200:
+        raise SystemExit(f"Login gagal (status {status}), cek --username/--password")
+    return body["access_token"]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--requests", type=int, default=50, help="Request per route")
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--output", default="bench-report.json")
+    parser.add_argument("--compare", help="Laporan JSON sebelumnya untuk dibandingkan")
+    parser.add_argument("--route", action="append", help="Hanya route ini (bisa berulang)")
+    parser.add_argument("--include-writes", action="store_true")
+    parser.add_argument("--include-external", action="store_true")
+    parser.add_argument("--include-admin", action="store_true", help="Login untuk route GET /admin")
+    parser.add_argument(
+        "--force", action="store_true", help="Izinkan --include-writes ke host non-lokal"
+    )
+    parser.add_argument("--username", default="admin")
+    parser.add_argument("--password", default="admin123")
+    args = parser.parse_args()
+
+    if args.include_writes and not args.force:
+        server_host = urllib.parse.urlparse(args.base_url).hostname
+        if not is_local(args.base_url) or not is_local(BENCH_DATABASE_URL):
+            db_host = urllib.parse.urlparse(BENCH_DATABASE_URL).hostname
+            raise SystemExit(
+                f"Menolak --include-writes ke server '{server_host}' / database "
+                f"'{db_host}'. Jalankan server benchmark lokal, atau tambahkan --force "
+                "jika memang disengaja."
+            )
+
+    need_token = args.include_writes or args.include_admin
+    token = login(args.base_url, args.username, args.password) if need_token else None
+    client = Client(args.base_url, token)
+    plans, total_petani = build_plans(
+        client,
+        random.Random(42),
+        args.include_writes,
+        args.include_external,
+        {"username": args.username, "password": args.password},
+    )
+    if args.route:
+        plans = [p for p in plans if p["route"] in args.route]
+
+    results = []
+    for plan in plans:
+        result = run_plan(client, plan, args.requests, args.concurrency)
+        if result is None:
+            continue
+        results.append(result)
+        print(
+            f"{plan['method']:6} {plan['route']:50} p50={result['p50_ms']:>9}ms "
+            f"p95={result['p95_ms']:>9}ms rps={result['throughput_rps']:>8} err={result['errors']}"
+        )
+
+    report = {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "base_url": args.base_url,
+            "git_commit": git_commit(),
+            "python": platform.python_version(),
+            "total_petani": total_petani,
+            "requests_per_route": args.requests,
+            "concurrency": args.concurrency,
+        },
+        "results": results,
+    }
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"\nLaporan disimpan ke {args.output}")
+
+    if args.compare:
+        compare(report, args.compare)
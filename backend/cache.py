@@ -0,0 +1,91 @@
+import os
+import time
+
+from .metrics import CACHE_REQUESTS
+
+# ======================================================
+# 🗃️ Cache in-process sederhana
+# ======================================================
+# Menyimpan hasil komputasi mahal (word cloud, agregat, dll) per worker.
+# Key memakai format "<grup>:<nama>" supaya bisa di-invalidate per grup.
+
+DEFAULT_TTL = 300  # detik
+# Hasil turunan data_raw (cluster, word cloud, dashboard) di-invalidate setiap
+# kali data berubah, jadi TTL-nya bisa panjang; TTL hanya jaring pengaman untuk
+# perubahan yang tidak lewat API (mis. edit langsung di database).
+DATA_TTL = int(os.getenv("CACHE_DATA_TTL", "3600"))
+DATA_RAW_GROUPS = ("wordcloud", "cluster", "dashboard")
+
+_store = {}
+# Generasi per grup, naik setiap invalidate(). get_or_set membandingkannya
+# sebelum & sesudah factory supaya hasil yang dihitung dari data lama (data
+# berubah saat factory berjalan) tidak disimpan.
+_generations = {}
+_global_generation = 0
+
+
+def _generation(key):
+    return _global_generation, _generations.get(key.split(":", 1)[0], 0)
+
+
+def get(key):
+    """Ambil value dari cache, None jika tidak ada atau sudah kedaluwarsa"""
+    group = key.split(":", 1)[0]
+    entry = _store.get(key)
+    if entry is None:
+        CACHE_REQUESTS.inc(group=group, result="miss")
+        return None
+
+    expires_at, value = entry
+    if expires_at is not None and expires_at < time.monotonic():
+        _store.pop(key, None)
+        CACHE_REQUESTS.inc(group=group, result="miss")
+        return None
+    CACHE_REQUESTS.inc(group=group, result="hit")
+    return value
+
+
+def set(key, value, ttl=DEFAULT_TTL):
+    """Simpan value ke cache dengan TTL (None = tanpa kedaluwarsa)"""
+    expires_at = time.monotonic() + ttl if ttl is not None else None
+    _store[key] = (expires_at, value)
+    return value
+
+
+def invalidate(*prefixes):
+    """Hapus semua key yang diawali salah satu prefix. Tanpa argumen = hapus semua."""
+    global _global_generation
+    if not prefixes:
+        _global_generation += 1
+        removed = len(_store)
+        _store.clear()
+        return removed
+
+    for prefix in prefixes:
+        group = prefix.split(":", 1)[0]
+        _generations[group] = _generations.get(group, 0) + 1
+    keys = [key for key in _store if key.startswith(prefixes)]
+    for key in keys:
+        _store.pop(key, None)
+    return len(keys)
+
+
+def invalidate_data_raw():
+    """Hapus semua cache yang dihitung dari tabel data_raw"""
+    return invalidate(*DATA_RAW_GROUPS)
+
+
+async def get_or_set(key, factory, ttl=DEFAULT_TTL):
+    """
+    Ambil dari cache, atau jalankan coroutine factory lalu simpan hasilnya.
+    Jika grup key di-invalidate selama factory berjalan, hasil tetap
+    dikembalikan tapi tidak disimpan.
+    """
+    value = get(key)
+    if value is not None:
+        return value
+    generation = _generation(key)
+    value = await factory()
+    if _generation(key) == generation:
+        set(key, value, ttl)
+    return value
@@ -0,0 +1,193 @@
+import os
+import asyncio
+
+import asyncpg
+
+from . import realtime
+from .database import database
+from .logger import get_logger
+
+# ======================================================
+# 🧾 Change log data_raw (lihat migrations/001_data_raw_change_log.sql)
+# ======================================================
+# Trigger mencatat NO yang berubah per versi di data_raw_changes dan mengirim
+# NOTIFY data_raw_changes setelah commit. Setiap worker mengikuti log ini
+# (follower) dan meneruskan kumpulan perubahan ke subscriber (snapshot, cache),
+# jadi biaya pembaruan sebanding dengan jumlah baris yang berubah. Perubahan
+# di luar aplikasi (SQL manual, import COPY) ikut tertangkap.
+#
+# Jika migrasi belum dijalankan, follower nonaktif dan aplikasi tetap memakai
+# invalidasi lewat channel dashboard seperti sebelumnya.
+
+CHANGES_CHANNEL = "data_raw_changes"
+POLL_INTERVAL = int(os.getenv("CHANGES_POLL_INTERVAL", "30"))  # detik, jaga-jaga NOTIFY hilang
+RETENTION_DAYS = int(os.getenv("CHANGES_RETENTION_DAYS", "7"))
+PRUNE_INTERVAL = 3600  # detik
+MAX_CHANGES = 10000  # lebih dari ini -> konsumen diminta rebuild penuh
+
+log = get_logger(__name__)
+
+_subscribers = []
+_version = None
+_wakeup = None
+_task = None
+
+
+def subscribe(callback):
+    """
+    Daftarkan callback(changes) yang dipanggil setiap ada perubahan baru.
+    `changes` = hasil changes_since(): reset=True berarti bangun ulang penuh.
+    """
+    _subscribers.append(callback)
+
+
+def current_cursor():
+    """Versi terakhir yang sudah diteruskan ke subscriber di worker ini"""
+    return _version
+
+
+async def current_version():
+    """Versi data_raw terbaru di database"""
+    return await database.fetch_val("SELECT version FROM data_raw_version")
+
+
+async def changes_since(version, limit=MAX_CHANGES):
+    """
+    Perubahan data_raw setelah `version`:
+    {"version": versi terbaru, "upserted": set NO, "deleted": set NO, "reset": bool}.
+    reset=True jika riwayat sudah di-prune, ada TRUNCATE, atau perubahan > limit.
+    """
+    # Satu statement -> versi dan daftar perubahan berasal dari snapshot yang sama
+    rows = await database.fetch_all(
+        """
+        SELECT v.version AS latest, v.pruned_through, c."NO", c.op
+        FROM data_raw_version v
+        LEFT JOIN LATERAL (
+            SELECT "NO", op, version
+            FROM data_raw_changes
+            WHERE version > :since AND version <= v.version
+            ORDER BY version, id
+            LIMIT :limit
+        ) c ON TRUE
+        """,
+        values={"since": version, "limit": limit + 1},
+    )
+    latest = rows[0]["latest"]
+    changes = {"version": latest, "upserted": set(), "deleted": set(), "reset": False}
+
+    if version < rows[0]["pruned_through"] or len(rows) > limit:
+        changes["reset"] = True
+        return changes
+
+    for row in rows:
+        if row["op"] is None:
+            continue
+        if row["op"] == "T":
+            changes["reset"] = True
+            break
+        # Operasi terakhir per NO yang berlaku
+        if row["op"] == "D":
+            changes["upserted"].discard(row["NO"])
+            changes["deleted"].add(row["NO"])
+        else:
+            changes["deleted"].discard(row["NO"])
+            changes["upserted"].add(row["NO"])
+    return changes
+
+
+async def prune(days=RETENTION_DAYS):
+    """Hapus riwayat lebih tua dari `days` hari dan catat batas versinya"""
+    async with database.transaction():
+        pruned = await database.fetch_val(
+            """
+            WITH deleted AS (
+                DELETE FROM data_raw_changes
+                WHERE changed_at < now() - make_interval(days => :days)
+                RETURNING version
+            )
+            SELECT MAX(version) FROM deleted
+            """,
+            values={"days": days},
+        )
+        if pruned is not None:
+            await database.execute(
+                "UPDATE data_raw_version SET pruned_through = GREATEST(pruned_through, :v)",
+                values={"v": pruned},
+            )
+    return pruned
+
+
+# ======================================================
+# 🔁 Follower per worker
+# ======================================================
+def _on_notify(event):
+    if _wakeup is not None:
+        _wakeup.set()
+
+
+async def sync():
+    """Ambil perubahan sejak cursor dan teruskan ke semua subscriber"""
+    global _version
+    changes = await changes_since(_version)
+    if changes["version"] == _version:
+        return
+    _version = changes["version"]
+
+    for callback in _subscribers:
+        try:
+            callback(changes)
+        except Exception:
+            log.exception("Subscriber change log gagal")
+
+
+async def _follow():
+    last_prune = 0.0
+    loop = asyncio.get_running_loop()
+    while True:
+        try:
+            await asyncio.wait_for(_wakeup.wait(), timeout=POLL_INTERVAL)
+        except asyncio.TimeoutError:
+            pass
+        # NOTIFY yang datang selama sync akan memicu putaran berikutnya
+        _wakeup.clear()
+        try:
+            await sync()
+            if loop.time() - last_prune > PRUNE_INTERVAL:
+                last_prune = loop.time()
+                await prune()
+        except Exception:
+            log.exception("Gagal membaca change log data_raw")
+
+
+async def start_follower():
+    """Mulai mengikuti change log (nonaktif jika migrasi belum dijalankan)"""
+    global _version, _wakeup, _task
+    if _task is not None:
+        return
+    try:
+        _version = await current_version()
+    except asyncpg.UndefinedTableError:
+        log.info("Change log data_raw belum ada (jalankan python -m backend.migrate)")
+        return
+    except Exception as e:
+        log.warning("Change log data_raw tidak aktif: %s", e)
+        return
+
+    _wakeup = asyncio.Event()
+    _task = asyncio.create_task(_follow())
+    log.info("Mengikuti change log data_raw dari versi %s", _version)
+
+
+async def stop_follower():
+    global _task
+    if _task is None:
+        return
+    _task.cancel()
+    try:
+        await _task
+    except asyncio.CancelledError:
+        pass
+    _task = None
+
+
+realtime.add_handler(CHANGES_CHANNEL, _on_notify)
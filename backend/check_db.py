@@ -1,43 +1,48 @@
-import asyncio
-from backend.database import database  # import sesuai struktur project
+"""
+Audit kualitas data_raw: jumlah NULL, kosong, dan angka tidak valid per kolom.
 
+Contoh:
+    python -m backend.check_db                         # laporan saja
+    python -m backend.check_db --fill                  # isi teks kosong dengan 'TIDAK ADA'
+    python -m backend.check_db --fill --columns "PUPUK,METODE PANEN"
 
-async def main():
-    # hubungkan ke database
-    await database.connect()
+Semua hitungan dan pengisian dilakukan di database (lihat backend/data_quality.py),
+jadi tabel besar tidak pernah dimuat ke memori.
+"""
 
-    # ambil semua data
-    rows = await database.fetch_all("SELECT * FROM data_raw;")
+import argparse
+import asyncio
 
-    # tampilkan jumlah nilai kosong per kolom sebelum pengisian
-    print("Jumlah nilai kosong per kolom:")
-    for column in rows[0].keys():
-        kosong = sum(1 for row in rows if row[column] in [None, ""])
-        print(f"{column}: {kosong}")
+from backend import data_quality
+from backend.database import database
 
-    # periksa dan isi kolom teks yang kosong dengan 'TIDAK ADA'
-    processed_rows = []
-    for row in rows:
-        row_dict = dict(row)  # ubah Record jadi dict agar bisa diedit
-        for key, value in row_dict.items():
-            if not isinstance(value, (int, float)) and value in [None, ""]:
-                row_dict[key] = "TIDAK ADA"
-        processed_rows.append(row_dict)
 
-    # cek ulang jumlah nilai kosong setelah pengisian
-    print("\nJumlah nilai kosong per kolom setelah pengisian:")
-    for column in processed_rows[0].keys():
-        kosong = sum(1 for row in processed_rows if row[column] in [None, ""])
-        print(f"{column}: {kosong}")
+def print_report(result):
+    print(f"Total baris: {result['total_rows']}")
+    print(f"{'KOLOM':<30} {'NULL':>8} {'KOSONG':>8} {'TIDAK VALID':>12}")
+    for col in result["columns"]:
+        kosong = "-" if col["kosong"] is None else col["kosong"]
+        tidak_valid = "-" if col["tidak_valid"] is None else col["tidak_valid"]
+        print(f"{col['kolom']:<30} {col['null']:>8} {kosong:>8} {tidak_valid:>12}")
 
-    # tampilkan 5 baris pertama untuk dicek
-    print("\nContoh 5 data pertama:")
-    for i, row in enumerate(processed_rows[:5], start=1):
-        print(f"Row {i}: {row}")
 
-    # putuskan koneksi setelah selesai
-    await database.disconnect()
+async def main(args):
+    await database.connect()
+    try:
+        print_report(await data_quality.report(database))
+        if args.fill:
+            columns = [c.strip() for c in args.columns.split(",")] if args.columns else None
+            result = await data_quality.fill_empty(args.value, columns)
+            print(f"\n✅ {result['rows_updated']} baris diisi '{args.value}'")
+            print("\nSetelah pengisian:")
+            print_report(await data_quality.report(database))
+    finally:
+        await database.disconnect()
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--fill", action="store_true", help="Isi NULL/kosong di kolom teks")
+    parser.add_argument("--value", default=data_quality.FILL_VALUE, help="Nilai pengisi")
+    parser.add_argument("--columns", help="Kolom dipisah koma (default semua kolom teks non-angka)")
+    asyncio.run(main(parser.parse_args()))
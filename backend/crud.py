@@ -1,6 +1,8 @@
 from typing import List
-from .database import database
+from .database import database, read_database, mark_write
 from .schemas import PetaniCreate
+from . import cache, dashboard_live, kategori, snapshot
+from .metrics import span
 
 TABLE_NAME = "data_raw"
 
@@ -11,14 +13,18 @@ TABLE_NAME = "data_raw"
 async def get_all_petani(skip: int = 0, limit: int = 100) -> List:
     """Ambil semua data petani dari database"""
     query = f'SELECT * FROM {TABLE_NAME} ORDER BY "NO" LIMIT :limit OFFSET :skip'
-    records = await database.fetch_all(query, values={"limit": limit, "skip": skip})
+    with span("crud.get_all_petani"):
+        records = await read_database().fetch_all(
+            query, values={"limit": limit, "skip": skip}
+        )
     return [dict(row) for row in records]
 
 
 async def get_petani_by_no(petani_no: int):
     """Ambil satu data petani berdasarkan NO"""
     query = f'SELECT * FROM {TABLE_NAME} WHERE "NO" = :no'
-    row = await database.fetch_one(query, values={"no": petani_no})
+    with span("crud.get_petani_by_no"):
+        row = await read_database().fetch_one(query, values={"no": petani_no})
     if not row:
         return None
     return dict(row)
@@ -38,9 +44,13 @@ async def create_petani(petani: PetaniCreate):
     if not data:
         raise ValueError("Tidak ada data valid untuk disimpan")
 
+    # Mulai dari sini baca ulang (get_petani_by_no) harus dari primary
+    mark_write()
+
     # Ambil NO maksimal yang ada di database dan tambah 1
     max_no_query = f'SELECT COALESCE(MAX("NO"), 0) + 1 as next_no FROM {TABLE_NAME}'
-    next_no = await database.fetch_val(max_no_query)
+    with span("crud.create_petani.next_no"):
+        next_no = await database.fetch_val(max_no_query)
 
     # Tambahkan NO baru ke data
     data["NO"] = next_no
@@ -52,21 +62,33 @@ async def create_petani(petani: PetaniCreate):
         for col in data.keys()
     ]
 
-    values_for_query = {
-        col.replace(" ", "_").replace("(", "").replace(")", "").replace("/", "_"): v
-        for col, v in data.items()
-    }
-
     query = f"""
         INSERT INTO {TABLE_NAME} ({', '.join(columns)})
         VALUES ({', '.join(placeholders)})
         RETURNING "NO"
     """
 
-    new_petani_no = await database.fetch_val(query, values=values_for_query)
+    resolved = {}
+    with span("crud.create_petani.insert"):
+        async with database.transaction():
+            # Samakan varian penulisan kategori ("tengkulak" -> "Tengkulak");
+            # varian baru didaftarkan ke kamus dalam transaksi yang sama
+            data = await kategori.canonicalize(data, resolved)
+            values_for_query = {
+                col.replace(" ", "_").replace("(", "").replace(")", "").replace("/", "_"): v
+                for col, v in data.items()
+            }
+            new_petani_no = await database.fetch_val(query, values=values_for_query)
+            created = await get_petani_by_no(new_petani_no)
+            await dashboard_live.publish_change(
+                "created", new_petani_no, None, created
+            )
+    kategori.remember(resolved)
+    cache.invalidate_data_raw()
+    snapshot.mark_changed(new_petani_no)
 
     # Return data yang baru dibuat
-    return await get_petani_by_no(new_petani_no)
+    return created
 
 
 # -----------------------
@@ -87,22 +109,41 @@ async def update_petani(petani_no: int, petani: PetaniCreate):
         for col in data.keys()
     ]
 
-    values_for_query = {
-        col.replace(" ", "_").replace("(", "").replace(")", "").replace("/", "_"): v
-        for col, v in data.items()
-    }
-    values_for_query["no"] = petani_no
-
     query = f"""
         UPDATE {TABLE_NAME}
         SET {', '.join(update_fields)}
         WHERE "NO" = :no
     """
 
-    await database.execute(query, values=values_for_query)
+    resolved = {}
+    mark_write()
+    with span("crud.update_petani"):
+        async with database.transaction():
+            # Kunci baris lama supaya delta dashboard dihitung dari state yang benar
+            old_row = await database.fetch_one(
+                f'SELECT * FROM {TABLE_NAME} WHERE "NO" = :no FOR UPDATE',
+                values={"no": petani_no},
+            )
+            if not old_row:
+                return None
+
+            data = await kategori.canonicalize(data, resolved)
+            values_for_query = {
+                col.replace(" ", "_").replace("(", "").replace(")", "").replace("/", "_"): v
+                for col, v in data.items()
+            }
+            values_for_query["no"] = petani_no
+            await database.execute(query, values=values_for_query)
+            updated = await get_petani_by_no(petani_no)
+            await dashboard_live.publish_change(
+                "updated", petani_no, dict(old_row), updated
+            )
+    kategori.remember(resolved)
+    cache.invalidate_data_raw()
+    snapshot.mark_changed(petani_no)
 
     # Return data yang sudah diupdate
-    return await get_petani_by_no(petani_no)
+    return updated
 
 
 # -----------------------
@@ -110,8 +151,16 @@ async def update_petani(petani_no: int, petani: PetaniCreate):
 # -----------------------
 async def delete_petani(petani_no: int):
     """Hapus data petani"""
-    query = f'DELETE FROM {TABLE_NAME} WHERE "NO" = :no RETURNING "NO"'
-    deleted = await database.fetch_val(query, values={"no": petani_no})
-    if deleted is None:
-        return None
-    return {"status": "deleted", "NO": deleted}
+    query = f'DELETE FROM {TABLE_NAME} WHERE "NO" = :no RETURNING *'
+    mark_write()
+    with span("crud.delete_petani"):
+        async with database.transaction():
+            deleted = await database.fetch_one(query, values={"no": petani_no})
+            if deleted is None:
+                return None
+            await dashboard_live.publish_change(
+                "deleted", petani_no, dict(deleted), None
+            )
+    cache.invalidate_data_raw()
+    snapshot.mark_changed(petani_no)
+    return {"status": "deleted", "NO": deleted["NO"]}
@@ -0,0 +1,146 @@
+from . import cache, changes, realtime, snapshot
+from .database import note_data_change
+
+# ======================================================
+# 📺 Delta dashboard untuk update live (wall display)
+# ======================================================
+# Setiap perubahan data petani dikonversi menjadi selisih agregat dashboard
+# (kontribusi baris baru - kontribusi baris lama), lalu dikirim lewat NOTIFY
+# supaya client di semua worker menerima delta yang sama.
+
+DASHBOARD_CHANNEL = "dashboard"
+
+# Endpoint distribusi -> kolom kategori (sama dengan query di routers/dashboard.py)
+DISTRIBUSI_COLUMNS = {
+    "distribusi-jenis-kopi": "JENIS KOPI",
+    "distribusi-metode-panen": "METODE PANEN",
+    "distribusi-metode-pengolahan": "METODE PENGOLAHAN",
+    "distribusi-proses-pengeringan": "PROSES PENGERINGAN",
+    "distribusi-metode-penjualan": "METODE PENJUALAN",
+    "distribusi-varietas-kopi": "VARIETAS KOPI",
+}
+
+
+def _is_filled(value):
+    return value is not None and value != ""
+
+
+def _is_positive(value):
+    return value is not None and value > 0
+
+
+def _contribution(row):
+    """Kontribusi satu baris ke setiap agregat dashboard, dalam bentuk flat dict"""
+    if not row:
+        return {}
+
+    contrib = {
+        ("summary", "total_petani"): 1,
+        ("summary", "total_lahan_m2"): row.get("TOTAL LAHAN (M2)") or 0,
+        ("summary", "kapasitas_produksi_kg_tahun"): row.get("HASIL PER TAHUN (kg)") or 0,
+    }
+
+    hasil = row.get("HASIL PER TAHUN (kg)")
+    if _is_positive(hasil):
+        contrib[("basis", "hasil_per_tahun", "total")] = hasil
+        contrib[("basis", "hasil_per_tahun", "jumlah")] = 1
+
+    usia = row.get("USIA")
+    if _is_positive(usia):
+        contrib[("basis", "usia", "total")] = usia
+        contrib[("basis", "usia", "jumlah")] = 1
+
+    for endpoint, column in DISTRIBUSI_COLUMNS.items():
+        kategori = row.get(column)
+        if _is_filled(kategori):
+            contrib[(endpoint, kategori)] = 1
+
+    kelompok = row.get("KELOMPOK TANI")
+    if _is_filled(kelompok):
+        contrib[("kelompok-tani-vs-populasi", kelompok)] = 1
+        if _is_positive(hasil):
+            contrib[("kelompok-tani-vs-hasil", kelompok)] = hasil
+        lahan = row.get("TOTAL LAHAN (M2)")
+        if _is_positive(lahan):
+            contrib[("kelompok-tani-vs-lahan", kelompok)] = lahan / 10000
+
+    return contrib
+
+
+def compute_delta(old_row, new_row):
+    """
+    Hitung selisih agregat dari perubahan satu baris.
+    old_row None = insert, new_row None = delete.
+    Hanya agregat/bucket yang berubah yang dimasukkan ke hasil.
+    """
+    old_contrib = _contribution(old_row)
+    new_contrib = _contribution(new_row)
+
+    changes = {}
+    for key in set(old_contrib) | set(new_contrib):
+        diff = new_contrib.get(key, 0) - old_contrib.get(key, 0)
+        if diff:
+            changes[key] = diff
+
+    delta = {}
+    for key, diff in changes.items():
+        if key[0] == "summary":
+            delta.setdefault("summary", {})[key[1]] = diff
+        elif key[0] == "basis":
+            basis = delta.setdefault("basis_rata_rata", {})
+            basis.setdefault(key[1], {"total": 0, "jumlah": 0})[key[2]] = diff
+        elif key[0] in DISTRIBUSI_COLUMNS:
+            field = "varietas" if key[0] == "distribusi-varietas-kopi" else "kategori"
+            delta.setdefault(key[0], []).append({field: key[1], "jumlah": diff})
+        elif key[0] == "kelompok-tani-vs-hasil":
+            delta.setdefault(key[0], []).append({"kelompok": key[1], "total_hasil": diff})
+        elif key[0] == "kelompok-tani-vs-lahan":
+            delta.setdefault(key[0], []).append(
+                {"kelompok": key[1], "total_lahan_ha": round(diff, 4)}
+            )
+        elif key[0] == "kelompok-tani-vs-populasi":
+            delta.setdefault(key[0], []).append(
+                {"kelompok": key[1], "total_populasi": diff}
+            )
+
+    return delta
+
+
+async def publish_change(event, petani_no, old_row, new_row):
+    """
+    Kirim delta ke channel dashboard. Dipanggil di dalam transaksi penulisan.
+    Event tetap dikirim walau delta kosong, karena setiap worker memakainya
+    untuk meng-invalidate cache turunan data_raw (cluster, word cloud).
+    """
+    delta = compute_delta(old_row, new_row)
+    await realtime.notify(
+        DASHBOARD_CHANNEL, {"event": event, "NO": petani_no, "delta": delta}
+    )
+
+
+async def publish_refetch(reason):
+    """
+    Kirim event "refetch" untuk perubahan massal yang tidak bisa dijadikan
+    delta (mis. isi data kosong). Client harus fetch ulang semua endpoint.
+    """
+    await realtime.notify(
+        DASHBOARD_CHANNEL, {"event": "refetch", "reason": reason, "NO": None}
+    )
+
+
+def _on_data_change(event):
+    """Dipanggil di setiap worker saat ada NOTIFY perubahan data petani"""
+    note_data_change()
+    cache.invalidate_data_raw()
+    # Tanpa NO (event lama/manual) -> snapshot dibangun ulang penuh
+    snapshot.mark_changed(event.get("NO") if isinstance(event, dict) else None)
+
+
+def _on_data_raw_changes(changes_set):
+    """Perubahan dari change log (termasuk edit di luar aplikasi)"""
+    note_data_change()
+    cache.invalidate_data_raw()
+
+
+realtime.add_handler(DASHBOARD_CHANNEL, _on_data_change)
+changes.subscribe(_on_data_raw_changes)
@@ -0,0 +1,172 @@
+from .database import database, read_database, mark_write
+from . import cache, dashboard_live, kategori, snapshot
+from .metrics import span
+
+# ======================================================
+# 🩺 Audit kualitas data_raw di sisi SQL
+# ======================================================
+# Satu query agregat dengan COUNT(*) FILTER per kolom: jumlah NULL, string
+# kosong, dan nilai yang tidak bisa di-parse sebagai angka (untuk kolom angka
+# yang disimpan sebagai teks). Tidak ada baris yang dikirim ke Python, jadi
+# biayanya satu scan tabel di database.
+
+TABLE_NAME = "data_raw"
+TEXT_TYPES = {"text", "character varying", "character"}
+FILL_VALUE = "TIDAK ADA"
+
+# Kolom angka bertipe teks -> cara parse, sama dengan parse_number/parse_harga
+# di routers/analysis.py
+NUMERIC_TEXT_COLUMNS = {
+    "LAMA BERTANI": "number",
+    "POPULASI KOPI": "number",
+    "KADAR AIR": "number",
+    "HARGA JUAL PER KG": "harga",
+}
+
+
+def quote_ident(name):
+    return '"' + name.replace('"', '""') + '"'
+
+
+def _parseable_sql(column, kind):
+    """Ekspresi boolean SQL: nilai kolom bisa di-parse jadi angka > 0"""
+    if kind == "harga":
+        # 'Rp 72.000' -> 72000
+        cleaned = f"btrim(replace(replace(replace({column}, 'Rp', ''), '.', ''), ',', ''))"
+        pattern = "^[0-9]+$"
+    else:
+        # '5 tahun' -> 5, '1.5' -> 1.5
+        cleaned = f"regexp_replace({column}, '[^0-9.]', '', 'g')"
+        pattern = r"^([0-9]+\.?[0-9]*|\.[0-9]+)$"
+    return f"(CASE WHEN {cleaned} ~ '{pattern}' THEN CAST({cleaned} AS numeric) > 0 ELSE FALSE END)"
+
+
+async def column_types(db=None):
+    """{kolom: tipe data} data_raw sesuai urutan kolom"""
+    rows = await (db or read_database()).fetch_all(
+        """
+        SELECT column_name, data_type
+        FROM information_schema.columns
+        WHERE table_name = :table
+        ORDER BY ordinal_position
+        """,
+        values={"table": TABLE_NAME},
+    )
+    return {row["column_name"]: row["data_type"] for row in rows}
+
+
+def report_query(types):
+    """SELECT satu baris berisi total + hitungan null/kosong/tidak valid per kolom"""
+    parts = ["COUNT(*) AS total"]
+    for i, (name, kind) in enumerate(types.items()):
+        column = quote_ident(name)
+        parts.append(f"COUNT(*) FILTER (WHERE {column} IS NULL) AS null_{i}")
+        if kind in TEXT_TYPES:
+            parts.append(f"COUNT(*) FILTER (WHERE btrim({column}) = '') AS empty_{i}")
+            if name in NUMERIC_TEXT_COLUMNS:
+                parseable = _parseable_sql(column, NUMERIC_TEXT_COLUMNS[name])
+                parts.append(
+                    f"COUNT(*) FILTER (WHERE btrim({column}) NOT IN ('', '-') "
+                    f"AND NOT {parseable}) AS invalid_{i}"
+                )
+    return f"SELECT {', '.join(parts)} FROM {TABLE_NAME}"
+
+
+async def report(db=None):
+    """
+    Laporan per kolom: {"total_rows", "columns": [{"kolom", "tipe", "null",
+    "kosong", "tidak_valid"}]}. "kosong"/"tidak_valid" None jika tidak
+    berlaku untuk tipe kolomnya.
+    """
+    db = db or read_database()
+    types = await column_types(db)
+    with span("data_quality.report"):
+        row = await db.fetch_one(report_query(types))
+
+    columns = []
+    for i, (name, kind) in enumerate(types.items()):
+        columns.append(
+            {
+                "kolom": name,
+                "tipe": kind,
+                "null": row[f"null_{i}"],
+                "kosong": row[f"empty_{i}"] if kind in TEXT_TYPES else None,
+                "tidak_valid": row[f"invalid_{i}"] if name in NUMERIC_TEXT_COLUMNS else None,
+            }
+        )
+    return {"total_rows": row["total"], "columns": columns}
+
+
+async def _fill_values(value, columns):
+    """
+    Nilai isian per kolom: kolom kategori memakai bentuk kanonik dari
+    kategori_kanonik() (mis. 'TIDAK ADA' -> 'Tidak Ada' di KEMITRAAN), kolom
+    lain nilai apa adanya. Dipanggil di dalam transaksi UPDATE.
+    """
+    kategori_columns = [name for name in columns if name in kategori.KATEGORI_COLUMNS]
+    if not kategori_columns:
+        return [value] * len(columns)
+    if not await database.fetch_val("SELECT to_regproc('kategori_kanonik') IS NOT NULL"):
+        # Migrasi 003 belum dijalankan
+        return [value] * len(columns)
+
+    rows = await database.fetch_all(
+        """
+        SELECT kolom, kategori_kanonik(kolom, :value) AS kanonik
+        FROM unnest(CAST(:kolom AS text[])) AS kolom
+        """,
+        values={"kolom": kategori_columns, "value": value},
+    )
+    canonical = {row["kolom"]: row["kanonik"] for row in rows}
+    return [canonical.get(name, value) for name in columns]
+
+
+async def fill_empty(value=FILL_VALUE, columns=None):
+    """
+    Isi NULL/string kosong di kolom teks dengan `value` dalam satu UPDATE.
+    Default semua kolom teks kecuali kolom angka bertipe teks. Mengembalikan
+    {"rows_updated", "columns"}.
+    """
+    types = await column_types(database)
+    if columns is None:
+        columns = [
+            name
+            for name, kind in types.items()
+            if kind in TEXT_TYPES and name not in NUMERIC_TEXT_COLUMNS
+        ]
+    else:
+        unknown = [name for name in columns if types.get(name) not in TEXT_TYPES]
+        if unknown:
+            raise ValueError(f"Bukan kolom teks data_raw: {', '.join(unknown)}")
+    if not columns:
+        return {"rows_updated": 0, "columns": []}
+
+    empty = {}
+    for name in columns:
+        column = quote_ident(name)
+        empty[column] = f"({column} IS NULL OR btrim({column}) = '')"
+    assignments = ", ".join(
+        f"{column} = CASE WHEN {condition} THEN :value_{i} ELSE {column} END"
+        for i, (column, condition) in enumerate(empty.items())
+    )
+    query = f"""
+        UPDATE {TABLE_NAME}
+        SET {assignments}
+        WHERE {' OR '.join(empty.values())}
+    """
+
+    mark_write()
+    with span("data_quality.fill"):
+        async with database.transaction():
+            values = await _fill_values(value, columns)
+            updated = await database.fetch_val(
+                f"WITH updated AS ({query} RETURNING 1) SELECT COUNT(*) FROM updated",
+                values={f"value_{i}": v for i, v in enumerate(values)},
+            )
+            if updated:
+                # Tanpa NO -> setiap worker membangun ulang snapshot & cache
+                await dashboard_live.publish_refetch("data_quality_fill")
+    if updated:
+        cache.invalidate_data_raw()
+        snapshot.mark_changed(None)
+    return {"rows_updated": updated, "columns": columns}
@@ -1,7 +1,12 @@
 import os
+import time
 import asyncio
+import itertools
+import contextvars
 from databases import Database
 from dotenv import load_dotenv
+from .logger import get_logger
+from . import metrics
 
 # Load .env supaya os.getenv() kebaca
 env_path = os.path.join(os.path.dirname(__file__), ".env")
@@ -16,8 +21,157 @@ DB_PASSWORD = os.getenv("DB_PASSWORD", "")
 
 DATABASE_URL = f"postgresql://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
 
-# Inisialisasi objek database dengan timeout settings
-database = Database(DATABASE_URL, statement_cache_size=0, min_size=1, max_size=10)
+log = get_logger(__name__)
+
+
+# ======================================================
+# ⚙️ Konfigurasi pool
+# ======================================================
+# DB_POOL_MODE=transaction  -> lewat PgBouncer mode transaction (mis. pooler
+#                              Supabase port 6543): prepared statement cache
+#                              wajib 0 karena statement tidak terikat koneksi.
+# DB_POOL_MODE=session/direct -> cache prepared statement asyncpg aktif, query
+#                              dashboard yang sama tidak di-parse/plan ulang.
+# Jika DB_POOL_MODE tidak diisi, port 6543 dianggap pooler mode transaction.
+#
+# Ukuran pool: DB_POOL_MIN / DB_POOL_MAX. Jika DB_POOL_MAX kosong tapi
+# DB_MAX_CONNECTIONS (jatah koneksi di server/pooler) diisi, max dibagi rata
+# ke jumlah worker (WEB_CONCURRENCY).
+def _env_int(name, default=None):
+    value = os.getenv(name)
+    return int(value) if value not in (None, "") else default
+
+
+def _env_float(name, default=None):
+    value = os.getenv(name)
+    return float(value) if value not in (None, "") else default
+
+
+DB_POOL_MODE = os.getenv("DB_POOL_MODE") or ("transaction" if DB_PORT == 6543 else "session")
+WEB_CONCURRENCY = _env_int("WEB_CONCURRENCY", 1)
+DB_MAX_CONNECTIONS = _env_int("DB_MAX_CONNECTIONS")
+
+DB_POOL_MAX = _env_int("DB_POOL_MAX")
+if DB_POOL_MAX is None:
+    DB_POOL_MAX = max(1, DB_MAX_CONNECTIONS // WEB_CONCURRENCY) if DB_MAX_CONNECTIONS else 10
+DB_POOL_MIN = min(_env_int("DB_POOL_MIN", 1), DB_POOL_MAX)
+DB_COMMAND_TIMEOUT = _env_float("DB_COMMAND_TIMEOUT")
+
+DB_STATEMENT_CACHE_SIZE = _env_int("DB_STATEMENT_CACHE_SIZE", 100)
+if DB_POOL_MODE == "transaction" and DB_STATEMENT_CACHE_SIZE:
+    DB_STATEMENT_CACHE_SIZE = 0
+
+POOL_OPTIONS = {
+    "min_size": DB_POOL_MIN,
+    "max_size": DB_POOL_MAX,
+    "statement_cache_size": DB_STATEMENT_CACHE_SIZE,
+}
+if DB_COMMAND_TIMEOUT is not None:
+    POOL_OPTIONS["command_timeout"] = DB_COMMAND_TIMEOUT
+
+# Inisialisasi objek database dengan setting pool dari env
+database = Database(DATABASE_URL, **POOL_OPTIONS)
+
+
+# ======================================================
+# 🔀 Routing baca ke read replica
+# ======================================================
+# DB_REPLICA_URLS (dipisah koma) opsional. Query baca analitik (dashboard,
+# analysis, GET petani) memakai read_database(): replica round-robin, atau
+# primary jika:
+#   - tidak ada replica yang terhubung,
+#   - request ini sudah menulis (mark_write), supaya langsung melihat tulisannya,
+#   - ada penulisan data dalam DB_STICKY_SECONDS terakhir di worker ini (termasuk
+#     penulisan worker lain yang diterima lewat NOTIFY), supaya cache yang baru
+#     di-invalidate tidak diisi ulang dari replica yang masih tertinggal,
+#   - client mengirim header X-Read-Primary: 1.
+# Penulisan selalu memakai `database` (primary).
+DB_REPLICA_URLS = [url.strip() for url in os.getenv("DB_REPLICA_URLS", "").split(",") if url.strip()]
+DB_STICKY_SECONDS = _env_float("DB_STICKY_SECONDS", 5.0)
+READ_PRIMARY_HEADER = "X-Read-Primary"
+
+replicas = [Database(url, **POOL_OPTIONS) for url in DB_REPLICA_URLS]
+
+_use_primary = contextvars.ContextVar("use_primary", default=False)
+_primary_until = 0.0
+_replica_cycle = itertools.count()
+
+
+def read_database():
+    """Database untuk query baca (replica jika aman, selain itu primary)"""
+    if not replicas or _use_primary.get() or time.monotonic() < _primary_until:
+        return database
+
+    for _ in range(len(replicas)):
+        replica = replicas[next(_replica_cycle) % len(replicas)]
+        if replica.is_connected:
+            return replica
+    return database
+
+
+def note_data_change():
+    """Arahkan baca ke primary selama DB_STICKY_SECONDS (replica mungkin tertinggal)"""
+    global _primary_until
+    _primary_until = time.monotonic() + DB_STICKY_SECONDS
+
+
+def mark_write():
+    """Panggil sebelum menulis: sisa request ini dan sticky window membaca dari primary"""
+    _use_primary.set(True)
+    note_data_change()
+
+
+async def read_routing_middleware(request, call_next):
+    """Paksa baca ke primary jika client meminta lewat header X-Read-Primary"""
+    if request.headers.get(READ_PRIMARY_HEADER) != "1":
+        return await call_next(request)
+
+    token = _use_primary.set(True)
+    try:
+        return await call_next(request)
+    finally:
+        _use_primary.reset(token)
+
+
+def _get_pool():
+    return getattr(getattr(database, "_backend", None), "_pool", None)
+
+
+def _pool_connections():
+    """Statistik pool asyncpg milik `databases` (None jika belum terhubung)"""
+    pool = _get_pool()
+    if pool is None:
+        return None
+    size, idle = pool.get_size(), pool.get_idle_size()
+    return {
+        ("size",): size,
+        ("idle",): idle,
+        ("in_use",): size - idle,
+        ("max",): pool.get_max_size(),
+        # Coroutine yang sedang menunggu koneksi bebas (pool penuh)
+        ("waiting",): len(getattr(pool._queue, "_getters", ())),
+    }
+
+
+def _pool_saturation():
+    """Rasio koneksi terpakai terhadap max_size (1.0 = pool penuh)"""
+    pool = _get_pool()
+    if pool is None:
+        return None
+    return round((pool.get_size() - pool.get_idle_size()) / pool.get_max_size(), 3)
+
+
+metrics.Gauge(
+    "db_pool_connections",
+    "Jumlah koneksi pool database per state",
+    ["state"],
+    function=_pool_connections,
+)
+metrics.Gauge(
+    "db_pool_saturation",
+    "Rasio koneksi pool yang sedang dipakai terhadap max_size",
+    function=_pool_saturation,
+)
 
 
 async def connect_to_db():
@@ -28,19 +182,43 @@ async def connect_to_db():
     for attempt in range(1, max_retries + 1):
         try:
             await database.connect()
-            print(f"✅ Berhasil terhubung ke database (attempt {attempt}).")
-            return
+            log.info(
+                "Berhasil terhubung ke database (attempt %d, mode %s, pool %d-%d, statement cache %d).",
+                attempt,
+                DB_POOL_MODE,
+                DB_POOL_MIN,
+                DB_POOL_MAX,
+                DB_STATEMENT_CACHE_SIZE,
+            )
+            break
         except Exception as e:
-            print(f"⚠️ Gagal koneksi database (attempt {attempt}/{max_retries}): {e}")
+            log.warning(
+                "Gagal koneksi database (attempt %d/%d): %s", attempt, max_retries, e
+            )
             if attempt < max_retries:
-                print(f"🔄 Mencoba lagi dalam {retry_delay} detik...")
+                log.info("Mencoba lagi dalam %d detik...", retry_delay)
                 await asyncio.sleep(retry_delay)
             else:
-                print("❌ Gagal terhubung ke database setelah beberapa percobaan.")
+                log.error("Gagal terhubung ke database setelah beberapa percobaan.")
                 raise
 
+    await connect_replicas()
+
+
+async def connect_replicas():
+    """Hubungkan read replica; replica yang gagal dilewati (baca jatuh ke primary)."""
+    for index, replica in enumerate(replicas):
+        try:
+            await replica.connect()
+            log.info("Terhubung ke read replica #%d.", index)
+        except Exception as e:
+            log.warning("Gagal koneksi read replica #%d: %s", index, e)
+
 
 async def close_db_connection():
     """Memutus koneksi database saat aplikasi berhenti."""
+    for replica in replicas:
+        if replica.is_connected:
+            await replica.disconnect()
     await database.disconnect()
-    print("🛑 Koneksi database ditutup.")
+    log.info("Koneksi database ditutup.")
@@ -0,0 +1,222 @@
+import bisect
+from collections import Counter
+
+from .lazy import lazy_import
+
+np = lazy_import("numpy")
+
+# ======================================================
+# 📉 Monitor drift fitur model terhadap data training
+# ======================================================
+# model_metadata.joblib tidak menyimpan statistik training, jadi referensi
+# diambil dari atribut pipeline yang sudah di-fit:
+#   - MinMaxScaler data_min_/data_max_ dan median SimpleImputer (numerik)
+#   - kategori OneHotEncoder dan modus SimpleImputer (kategori)
+#   - untuk KMeans: rata-rata training = rata-rata cluster_centers_ berbobot
+#     jumlah anggota (labels_), sehingga mean numerik dan frekuensi kategori
+#     training bisa dihitung persis.
+# Statistik live disimpan per NO dan diperbarui hanya untuk baris yang berubah.
+# Nilai kosong dihitung sebagai nilai imputasi (seperti yang dilihat model).
+
+PSI_FLOOR = 1e-4
+PSI_MODERATE = 0.1
+PSI_SIGNIFICANT = 0.25
+UNSEEN_LIMIT = 0.25  # porsi kategori yang tidak dikenal encoder -> stale
+BULK_INSERT = 64  # batch lebih besar: extend + sort, bukan insort per nilai
+
+
+def psi(expected, actual):
+    """Population Stability Index antara dua distribusi proporsi"""
+    expected = np.maximum(np.asarray(expected, dtype=float), PSI_FLOOR)
+    actual = np.maximum(np.asarray(actual, dtype=float), PSI_FLOOR)
+    return float(np.sum((actual - expected) * np.log(actual / expected)))
+
+
+def psi_level(score):
+    if score is None:
+        return None
+    if score >= PSI_SIGNIFICANT:
+        return "signifikan"
+    if score >= PSI_MODERATE:
+        return "sedang"
+    return "stabil"
+
+
+def reference_from_pipeline(pipeline):
+    """Statistik training per fitur dari atribut pipeline (preprocessor + model)"""
+    preprocessor = pipeline.named_steps["preprocessor"]
+    model = pipeline.named_steps.get("model")
+
+    means = None
+    if hasattr(model, "cluster_centers_") and hasattr(model, "labels_"):
+        centers = model.cluster_centers_
+        weights = np.bincount(model.labels_, minlength=len(centers)) / len(model.labels_)
+        means = weights @ centers
+
+    reference = {"numeric": {}, "categorical": {}, "n_training": None}
+    offset = 0
+    for name, transformer, columns in preprocessor.transformers_:
+        if name == "num":
+            imputer = transformer.named_steps["imputer"]
+            scaler = transformer.named_steps["scaler"]
+            reference["n_training"] = int(scaler.n_samples_seen_)
+            for i, col in enumerate(columns):
+                low, high = float(scaler.data_min_[i]), float(scaler.data_max_[i])
+                reference["numeric"][col] = {
+                    "min": low,
+                    "median": float(imputer.statistics_[i]),
+                    "max": high,
+                    "mean": None if means is None else low + means[offset] * (high - low),
+                }
+                offset += 1
+        elif name == "cat":
+            imputer = transformer.named_steps["imputer"]
+            onehot = transformer.named_steps["onehot"]
+            for i, (col, categories) in enumerate(zip(columns, onehot.categories_)):
+                frequencies = None
+                if means is not None:
+                    share = means[offset : offset + len(categories)]
+                    frequencies = {str(c): float(f) for c, f in zip(categories, share)}
+                reference["categorical"][col] = {
+                    "mode": str(imputer.statistics_[i]),
+                    "categories": [str(c) for c in categories],
+                    "frequencies": frequencies,
+                }
+                offset += len(categories)
+    return reference
+
+
+class DriftMonitor:
+    """Statistik berjalan fitur live (per NO) + perbandingan dengan referensi"""
+
+    def __init__(self, reference):
+        self.reference = reference
+        self.numeric = list(reference["numeric"])
+        self.categorical = list(reference["categorical"])
+        self.rows = {}  # NO -> (nilai numerik, nilai kategori, kolom kosong)
+        self.values = {col: [] for col in self.numeric}  # terurut, untuk kuantil
+        self.sums = dict.fromkeys(self.numeric, 0.0)
+        self.counts = {col: Counter() for col in self.categorical}
+        self.missing = Counter()
+
+    def __len__(self):
+        return len(self.rows)
+
+    def _row(self, numeric, categorical):
+        missing = []
+        values = []
+        for col, value in zip(self.numeric, numeric):
+            if value is None or value != value:
+                missing.append(col)
+                value = self.reference["numeric"][col]["median"]
+            values.append(float(value))
+        labels = []
+        for col, value in zip(self.categorical, categorical):
+            if value is None or value != value:
+                missing.append(col)
+                value = self.reference["categorical"][col]["mode"]
+            labels.append(str(value))
+        return tuple(values), tuple(labels), tuple(missing)
+
+    def _count(self, row, sign):
+        values, labels, missing = row
+        for col, value in zip(self.numeric, values):
+            self.sums[col] += sign * value
+        for col, label in zip(self.categorical, labels):
+            self.counts[col][label] += sign
+        for col in missing:
+            self.missing[col] += sign
+
+    def upsert(self, petani_nos, numeric_rows, categorical_rows):
+        """Tambah/ganti baris: `numeric_rows`/`categorical_rows` urut sesuai fitur"""
+        petani_nos = list(petani_nos)
+        self.delete(petani_nos)
+        added = []
+        for no, numeric, categorical in zip(petani_nos, numeric_rows, categorical_rows):
+            row = self._row(numeric, categorical)
+            self.rows[no] = row
+            self._count(row, +1)
+            added.append(row[0])
+
+        for i, col in enumerate(self.numeric):
+            ordered = self.values[col]
+            if len(added) > BULK_INSERT:
+                ordered.extend(values[i] for values in added)
+                ordered.sort()
+            else:
+                for values in added:
+                    bisect.insort(ordered, values[i])
+
+    def delete(self, petani_nos):
+        for no in petani_nos:
+            row = self.rows.pop(no, None)
+            if row is None:
+                continue
+            self._count(row, -1)
+            for col, value in zip(self.numeric, row[0]):
+                ordered = self.values[col]
+                del ordered[bisect.bisect_left(ordered, value)]
+
+    def _numeric_report(self, col):
+        ref = self.reference["numeric"][col]
+        ordered = self.values[col]
+        n = len(ordered)
+        # Fungsi distribusi live di titik min/median/max training
+        below_min = bisect.bisect_left(ordered, ref["min"]) / n
+        upto_median = bisect.bisect_right(ordered, ref["median"]) / n
+        upto_max = bisect.bisect_right(ordered, ref["max"]) / n
+        # Bin: <min, [min, median], (median, max], >max; training ~ (0, .5, .5, 0)
+        actual = [below_min, upto_median - below_min, upto_max - upto_median, 1 - upto_max]
+        score = psi([0, 0.5, 0.5, 0], actual)
+        return {
+            "live": {
+                "mean": round(self.sums[col] / n, 4),
+                "p25": ordered[int(0.25 * (n - 1))],
+                "median": ordered[int(0.5 * (n - 1))],
+                "p75": ordered[int(0.75 * (n - 1))],
+                "di_luar_rentang_training": round(below_min + 1 - upto_max, 4),
+            },
+            "training": ref,
+            "psi": round(score, 4),
+            "ks": round(max(below_min, abs(upto_median - 0.5), 1 - upto_max), 4),
+            "status": psi_level(score),
+            "kosong": self.missing[col],
+        }
+
+    def _categorical_report(self, col):
+        ref = self.reference["categorical"][col]
+        n = len(self.rows)
+        known = ref["categories"]
+        live = {c: self.counts[col][c] / n for c in known}
+        unseen = 1 - sum(live.values())
+        score = None
+        if ref["frequencies"] is not None:
+            expected = [ref["frequencies"][c] for c in known] + [0]
+            score = psi(expected, [live[c] for c in known] + [unseen])
+        top = {c: round(count / n, 4) for c, count in self.counts[col].most_common(10) if count}
+        return {
+            "live": top,
+            "training": ref["frequencies"],
+            "kategori_baru": round(unseen, 4),
+            "psi": None if score is None else round(score, 4),
+            "status": psi_level(score) if score is not None else None,
+            "kosong": self.missing[col],
+        }
+
+    def report(self):
+        """Skor drift per fitur + ringkasan (stale jika ada fitur bergeser signifikan)"""
+        if not self.rows:
+            return {"rows": 0, "features": {}, "stale": None}
+        features = {col: self._numeric_report(col) for col in self.numeric}
+        features.update({col: self._categorical_report(col) for col in self.categorical})
+        scores = [f["psi"] for f in features.values() if f["psi"] is not None]
+        max_psi = max(scores) if scores else None
+        unseen = max((f.get("kategori_baru", 0) for f in features.values()), default=0)
+        return {
+            "rows": len(self.rows),
+            "n_training": self.reference["n_training"],
+            "max_psi": max_psi,
+            "stale": (max_psi is not None and max_psi >= PSI_SIGNIFICANT)
+            or unseen >= UNSEEN_LIMIT,
+            "features": features,
+        }
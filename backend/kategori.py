@@ -0,0 +1,113 @@
+import re
+import time
+
+from .database import database
+from .logger import get_logger
+
+# ======================================================
+# 🏷️ Kanonikalisasi nilai kategori (lihat migrations/003_kategori_dictionary.sql)
+# ======================================================
+# Nilai kolom kategori dipetakan ke bentuk kanonik dari tabel kamus
+# (kategori_nilai/kategori_alias) sebelum ditulis ke data_raw, supaya GROUP BY
+# dashboard dan encoder clustering melihat satu kategori per makna.
+# Kamus disalin ke memori; varian yang belum dikenal diselesaikan (dan
+# didaftarkan) oleh fungsi kategori_kanonik() di database.
+
+# Harus sama dengan daftar kolom di migrasi 003
+KATEGORI_COLUMNS = (
+    "JENIS KELAMIN",
+    "KELOMPOK TANI",
+    "STATUS KEPEMILIKAN",
+    "JENIS KOPI",
+    "VARIETAS KOPI",
+    "VARIETAS UNGGUL",
+    "METODE BUDIDAYA",
+    "PUPUK",
+    "SISTEM IRIGASI",
+    "METODE PANEN",
+    "METODE PENGOLAHAN",
+    "ALAT PENGOLAHAN",
+    "LAMA FERMENTASI",
+    "PROSES PENGERINGAN",
+    "BENTUK PENYIMPANAN",
+    "SISTEM PENYIMPANAN",
+    "METODE PENJUALAN",
+    "KEMITRAAN",
+)
+RELOAD_INTERVAL = 3600  # detik, ambil ulang kamus (mis. setelah admin menggabung varian)
+
+log = get_logger(__name__)
+
+_aliases = {}  # (kolom, varian) -> nilai kanonik
+_loaded_at = None
+_enabled = True
+
+
+def normalize_key(value):
+    """Kunci varian, sama dengan kategori_kunci() di SQL"""
+    return re.sub(r"\s+", " ", value.strip()).lower()
+
+
+async def _load():
+    global _aliases, _loaded_at, _enabled
+    _loaded_at = time.monotonic()
+    # Cek lewat to_regclass, bukan menangkap error: canonicalize dipanggil di
+    # dalam transaksi penulisan dan error apa pun akan membatalkannya
+    if not await database.fetch_val("SELECT to_regclass('kategori_alias') IS NOT NULL"):
+        if _enabled:
+            log.info("Tabel kamus kategori belum ada, kanonikalisasi dilewati")
+        _enabled = False
+        return
+    rows = await database.fetch_all(
+        """
+        SELECT a.kolom, a.varian, n.nilai
+        FROM kategori_alias a
+        JOIN kategori_nilai n ON n.kode = a.kode
+        """
+    )
+    _enabled = True
+    _aliases = {(row["kolom"], row["varian"]): row["nilai"] for row in rows}
+
+
+async def canonicalize(data, resolved):
+    """
+    Ganti nilai kolom kategori di `data` (dict alias kolom -> nilai) dengan
+    bentuk kanonik. Varian baru didaftarkan ke kamus dalam satu query;
+    panggil di dalam transaksi INSERT/UPDATE supaya ikut commit/rollback.
+    Varian baru dicatat ke `resolved` dan baru masuk cache lewat remember()
+    setelah transaksi commit.
+    """
+    if _loaded_at is None or time.monotonic() - _loaded_at > RELOAD_INTERVAL:
+        await _load()
+    if not _enabled:
+        return data
+
+    unknown = {}
+    for column in KATEGORI_COLUMNS:
+        value = data.get(column)
+        if not isinstance(value, str) or not value.strip():
+            continue
+        canonical = _aliases.get((column, normalize_key(value)))
+        if canonical is None:
+            unknown[column] = value
+        else:
+            data[column] = canonical
+
+    if unknown:
+        rows = await database.fetch_all(
+            """
+            SELECT kolom, kategori_kanonik(kolom, nilai) AS kanonik
+            FROM unnest(CAST(:kolom AS text[]), CAST(:nilai AS text[])) AS v (kolom, nilai)
+            """,
+            values={"kolom": list(unknown), "nilai": list(unknown.values())},
+        )
+        for row in rows:
+            data[row["kolom"]] = row["kanonik"]
+            resolved[(row["kolom"], normalize_key(unknown[row["kolom"]]))] = row["kanonik"]
+
+    return data
+
+
+def remember(resolved):
+    """Masukkan varian dari canonicalize() ke cache (panggil setelah commit)"""
+    _aliases.update(resolved)
@@ -0,0 +1,52 @@
+import importlib
+import threading
+
+# ======================================================
+# 💤 Import modul berat secara lazy
+# ======================================================
+# `pd = lazy_import("pandas")` tidak mengimpor pandas sampai atribut pertama
+# diakses (mis. pd.DataFrame). Dipakai supaya route CRUD/dashboard bisa
+# melayani request tanpa menunggu pandas/numpy/sklearn/Gemini SDK dimuat.
+
+
+class LazyModule:
+    """Proxy modul yang baru diimpor saat pertama kali dipakai"""
+
+    def __init__(self, name):
+        self.__dict__["_lazy_name"] = name
+        self.__dict__["_lazy_module"] = None
+        self.__dict__["_lazy_lock"] = threading.Lock()
+
+    def _load(self):
+        module = self.__dict__["_lazy_module"]
+        if module is None:
+            with self.__dict__["_lazy_lock"]:
+                module = self.__dict__["_lazy_module"]
+                if module is None:
+                    module = importlib.import_module(self.__dict__["_lazy_name"])
+                    self.__dict__["_lazy_module"] = module
+        return module
+
+    def __getattr__(self, attr):
+        value = getattr(self._load(), attr)
+        # Simpan supaya akses berikutnya tidak lewat __getattr__ lagi
+        self.__dict__[attr] = value
+        return value
+
+    def __setattr__(self, attr, value):
+        setattr(self._load(), attr, value)
+
+    def __repr__(self):
+        state = "loaded" if self.__dict__["_lazy_module"] is not None else "not loaded"
+        return f"<lazy module '{self.__dict__['_lazy_name']}' ({state})>"
+
+
+def lazy_import(name):
+    return LazyModule(name)
+
+
+def is_loaded(module):
+    """True jika proxy sudah memuat modulnya (atau bukan proxy)"""
+    if isinstance(module, LazyModule):
+        return module.__dict__["_lazy_module"] is not None
+    return True
@@ -0,0 +1,75 @@
+import os
+import uuid
+import atexit
+import logging
+import contextvars
+from queue import SimpleQueue
+from logging.handlers import QueueHandler, QueueListener
+
+# ======================================================
+# 📝 Logging terstruktur dengan level & correlation ID
+# ======================================================
+# Level diatur lewat env LOG_LEVEL (default INFO). Dump dataframe hanya
+# dihitung jika DEBUG aktif (cek dengan is_debug()), dan penulisan ke stdout
+# dilakukan thread terpisah lewat QueueListener supaya tidak memblok event loop.
+
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+LOG_FORMAT = "%(asctime)s %(levelname)s [%(request_id)s] %(name)s: %(message)s"
+REQUEST_ID_HEADER = "X-Request-ID"
+
+request_id_var = contextvars.ContextVar("request_id", default="-")
+
+_listener = None
+
+
+class RequestIdFilter(logging.Filter):
+    """Sisipkan correlation ID request aktif ke setiap log record"""
+
+    def filter(self, record):
+        record.request_id = request_id_var.get()
+        return True
+
+
+def setup_logging():
+    """Konfigurasi logger 'backend' sekali saat aplikasi diimpor"""
+    global _listener
+    if _listener is not None:
+        return
+
+    stream_handler = logging.StreamHandler()
+    stream_handler.setFormatter(logging.Formatter(LOG_FORMAT))
+
+    queue = SimpleQueue()
+    queue_handler = QueueHandler(queue)
+    queue_handler.addFilter(RequestIdFilter())
+
+    root = logging.getLogger("backend")
+    root.setLevel(LOG_LEVEL)
+    root.addHandler(queue_handler)
+    root.propagate = False
+
+    _listener = QueueListener(queue, stream_handler)
+    _listener.start()
+    atexit.register(_listener.stop)
+
+
+def get_logger(name):
+    """Ambil logger modul, mis. get_logger(__name__)"""
+    return logging.getLogger(name)
+
+
+def is_debug(log):
+    """True jika level DEBUG aktif; pakai untuk membungkus dump yang mahal"""
+    return log.isEnabledFor(logging.DEBUG)
+
+
+async def request_id_middleware(request, call_next):
+    """Set correlation ID per request (dari header X-Request-ID atau dibuat baru)"""
+    request_id = request.headers.get(REQUEST_ID_HEADER) or uuid.uuid4().hex[:12]
+    token = request_id_var.set(request_id)
+    try:
+        response = await call_next(request)
+    finally:
+        request_id_var.reset(token)
+    response.headers[REQUEST_ID_HEADER] = request_id
+    return response
@@ -1,9 +1,15 @@
 from fastapi import FastAPI
+from fastapi.responses import JSONResponse, PlainTextResponse
 from dotenv import load_dotenv
 
 load_dotenv()
-from .database import connect_to_db, close_db_connection, database
-from .routers import authentication, petani, dashboard, analysis
+from .logger import setup_logging, request_id_middleware
+
+setup_logging()
+
+from .database import connect_to_db, close_db_connection, database, read_routing_middleware
+from .routers import authentication, petani, dashboard, analysis, admin
+from . import realtime, changes, metrics, profiler, watchdog, warmup
 from fastapi.middleware.cors import CORSMiddleware
 
 
@@ -14,8 +20,22 @@ app = FastAPI(
 )
 
 # Event handlers untuk koneksi database
+app.add_event_handler("startup", watchdog.start_watchdog)
 app.add_event_handler("startup", connect_to_db)
+app.add_event_handler("startup", realtime.start_listener)
+app.add_event_handler("startup", changes.start_follower)
+app.add_event_handler("startup", warmup.start_warmup)
+app.add_event_handler("shutdown", warmup.stop_warmup)
+app.add_event_handler("shutdown", changes.stop_follower)
+app.add_event_handler("shutdown", realtime.stop_listener)
 app.add_event_handler("shutdown", close_db_connection)
+app.add_event_handler("shutdown", watchdog.stop_watchdog)
+
+app.middleware("http")(read_routing_middleware)
+app.middleware("http")(profiler.profiling_middleware)
+app.middleware("http")(watchdog.inflight_middleware)
+app.middleware("http")(metrics.metrics_middleware)
+app.middleware("http")(request_id_middleware)
 
 app.add_middleware(
     CORSMiddleware,
@@ -30,6 +50,7 @@ app.include_router(authentication.router, tags=["Authentication"])
 app.include_router(petani.router)
 app.include_router(dashboard.router)
 app.include_router(analysis.router)
+app.include_router(admin.router)
 
 
 @app.get("/", tags=["Root"])
@@ -37,6 +58,25 @@ async def read_root():
     return {"message": "Selamat datang di API Smart Dashboard Kopi."}
 
 
+@app.get("/ready", tags=["Root"])
+async def read_ready():
+    """Readiness: database terhubung dan warm-up selesai. Liveness cukup GET /."""
+    state = warmup.readiness()
+    ready = database.is_connected and state["done"]
+    return JSONResponse(
+        status_code=200 if ready else 503,
+        content={"ready": ready, "database": database.is_connected, "warmup": state},
+    )
+
+
+@app.get("/metrics", tags=["Monitoring"], response_class=PlainTextResponse)
+async def read_metrics():
+    """Metrics aplikasi dalam format teks Prometheus."""
+    return PlainTextResponse(
+        metrics.render(), media_type="text/plain; version=0.0.4; charset=utf-8"
+    )
+
+
 @app.get("/db-test", tags=["Database"])
 async def db_test():
     try:
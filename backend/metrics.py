@@ -0,0 +1,194 @@
+import time
+from contextlib import contextmanager
+
+from .logger import get_logger
+
+# ======================================================
+# 📈 Metrics ringan (format teks Prometheus)
+# ======================================================
+# Nilai disimpan per proses; jika uvicorn jalan dengan banyak worker,
+# scrape setiap worker atau jumlahkan di sisi Prometheus.
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+log = get_logger(__name__)
+_registry = []
+
+
+def _format_labels(labels):
+    if not labels:
+        return ""
+    parts = []
+    for name, value in labels:
+        escaped = str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+        parts.append(f'{name}="{escaped}"')
+    return "{" + ",".join(parts) + "}"
+
+
+class _Metric:
+    metric_type = "untyped"
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        _registry.append(self)
+
+    def _key(self, labels):
+        return tuple((name, labels.get(name, "")) for name in self.labelnames)
+
+    def samples(self):
+        for key, value in self._values.items():
+            yield self.name, key, value
+
+    def render(self):
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.metric_type}",
+        ]
+        for name, labels, value in self.samples():
+            lines.append(f"{name}{_format_labels(labels)} {value}")
+        return "\n".join(lines)
+
+
+class Counter(_Metric):
+    metric_type = "counter"
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels):
+        return self._values.get(self._key(labels), 0)
+
+
+class Gauge(_Metric):
+    metric_type = "gauge"
+
+    def __init__(self, name, documentation, labelnames=(), function=None):
+        super().__init__(name, documentation, labelnames)
+        self._function = function
+
+    def set(self, value, **labels):
+        self._values[self._key(labels)] = value
+
+    def set_function(self, function):
+        """function() -> angka, atau dict {tuple label: angka} untuk gauge berlabel"""
+        self._function = function
+
+    def samples(self):
+        if self._function is None:
+            yield from super().samples()
+            return
+
+        try:
+            result = self._function()
+        except Exception:
+            log.debug("Gauge %s gagal dihitung", self.name, exc_info=True)
+            return
+
+        if isinstance(result, dict):
+            for label_values, value in result.items():
+                yield self.name, tuple(zip(self.labelnames, label_values)), value
+        elif result is not None:
+            yield self.name, (), result
+
+
+class Histogram(_Metric):
+    metric_type = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        state = self._values.get(key)
+        if state is None:
+            state = self._values[key] = [[0] * len(self.buckets), 0.0, 0]
+
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                state[0][i] += 1
+        state[1] += value
+        state[2] += 1
+
+    def samples(self):
+        for key, (bucket_counts, total, count) in self._values.items():
+            for bound, bucket_count in zip(self.buckets, bucket_counts):
+                yield f"{self.name}_bucket", key + (("le", bound),), bucket_count
+            yield f"{self.name}_bucket", key + (("le", "+Inf"),), count
+            yield f"{self.name}_sum", key, total
+            yield f"{self.name}_count", key, count
+
+
+def render():
+    """Semua metric dalam format teks Prometheus"""
+    return "\n".join(metric.render() for metric in _registry) + "\n"
+
+
+# ======================================================
+# 📊 Metric bawaan aplikasi
+# ======================================================
+REQUEST_LATENCY = Histogram(
+    "http_request_duration_seconds",
+    "Latensi request HTTP per route",
+    ["method", "route", "status"],
+)
+STAGE_DURATION = Histogram(
+    "stage_duration_seconds",
+    "Durasi tiap tahap pemrosesan (span)",
+    ["stage"],
+)
+CACHE_REQUESTS = Counter(
+    "cache_requests_total",
+    "Jumlah akses cache in-process",
+    ["group", "result"],
+)
+MODEL_INFERENCE = Counter(
+    "model_inference_total",
+    "Jumlah pemanggilan model ML",
+    ["model"],
+)
+MODEL_INFERENCE_ROWS = Counter(
+    "model_inference_rows_total",
+    "Jumlah baris yang diproses model ML",
+    ["model"],
+)
+
+
+@contextmanager
+def span(stage):
+    """Ukur durasi satu tahap: `with span("cluster.fetch"): ...`"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        STAGE_DURATION.observe(elapsed, stage=stage)
+        log.debug("span %s selesai dalam %.2f ms", stage, elapsed * 1000)
+
+
+def record_inference(model, rows):
+    """Catat satu pemanggilan model beserta jumlah baris input"""
+    MODEL_INFERENCE.inc(model=model)
+    MODEL_INFERENCE_ROWS.inc(rows, model=model)
+
+
+async def metrics_middleware(request, call_next):
+    """Catat latensi setiap request berdasarkan template route (bukan URL mentah)"""
+    start = time.perf_counter()
+    status_code = 500
+    try:
+        response = await call_next(request)
+        status_code = response.status_code
+        return response
+    finally:
+        route = request.scope.get("route")
+        REQUEST_LATENCY.observe(
+            time.perf_counter() - start,
+            method=request.method,
+            route=getattr(route, "path", "unmatched"),
+            status=status_code,
+        )
@@ -0,0 +1,77 @@
+"""
+Jalankan migrasi SQL di backend/migrations secara berurutan.
+
+Contoh:
+    python -m backend.migrate            # terapkan yang belum
+    python -m backend.migrate --list     # status setiap migrasi
+
+Setiap file dijalankan dalam satu transaksi dan dicatat di schema_migrations,
+jadi aman dijalankan ulang. Pakai koneksi langsung (bukan pooler mode
+transaction) karena DDL + trigger.
+"""
+
+import argparse
+import asyncio
+import os
+
+import asyncpg
+
+from backend.database import DATABASE_URL
+
+MIGRATIONS_DIR = os.path.join(os.path.dirname(__file__), "migrations")
+MIGRATE_URL = os.getenv("DB_MIGRATE_URL", DATABASE_URL)
+
+TRACKING_DDL = """
+CREATE TABLE IF NOT EXISTS schema_migrations (
+    name TEXT PRIMARY KEY,
+    applied_at TIMESTAMPTZ NOT NULL DEFAULT now()
+)
+"""
+
+
+def migration_files():
+    """Nama file migrasi .sql, urut berdasarkan nama (001_, 002_, ...)"""
+    return sorted(name for name in os.listdir(MIGRATIONS_DIR) if name.endswith(".sql"))
+
+
+async def applied_migrations(conn):
+    await conn.execute(TRACKING_DDL)
+    rows = await conn.fetch("SELECT name, applied_at FROM schema_migrations")
+    return {row["name"]: row["applied_at"] for row in rows}
+
+
+async def migrate(conn):
+    applied = await applied_migrations(conn)
+    pending = [name for name in migration_files() if name not in applied]
+    if not pending:
+        print("Tidak ada migrasi baru.")
+        return
+
+    for name in pending:
+        with open(os.path.join(MIGRATIONS_DIR, name), encoding="utf-8") as f:
+            sql = f.read()
+        async with conn.transaction():
+            await conn.execute(sql)
+            await conn.execute("INSERT INTO schema_migrations (name) VALUES ($1)", name)
+        print(f"✅ {name}")
+
+
+async def main(list_only):
+    conn = await asyncpg.connect(MIGRATE_URL)
+    try:
+        if list_only:
+            applied = await applied_migrations(conn)
+            for name in migration_files():
+                status = applied[name].isoformat() if name in applied else "pending"
+                print(f"{name}: {status}")
+        else:
+            await migrate(conn)
+    finally:
+        await conn.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--list", action="store_true", help="Tampilkan status migrasi saja")
+    args = parser.parse_args()
+    asyncio.run(main(args.list))
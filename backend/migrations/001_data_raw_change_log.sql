@@ -0,0 +1,108 @@
+-- ======================================================
+-- Change tracking untuk data_raw
+-- ======================================================
+-- * updated_at diisi otomatis saat INSERT/UPDATE.
+-- * Setiap statement INSERT/UPDATE/DELETE menaikkan data_raw_version (satu
+--   baris, dikunci sampai commit -> versi selalu commit berurutan) dan
+--   mencatat NO yang berubah di data_raw_changes dengan versi tersebut.
+-- * TRUNCATE dicatat dengan "NO" NULL (konsumen harus bangun ulang penuh).
+-- * Setelah commit dikirim NOTIFY data_raw_changes {"version", "op"}.
+-- Trigger level statement + transition table: COPY/UPDATE massal tetap satu
+-- NOTIFY dan satu INSERT ... SELECT, bukan satu per baris.
+
+ALTER TABLE data_raw
+    ADD COLUMN IF NOT EXISTS updated_at TIMESTAMPTZ NOT NULL DEFAULT now();
+
+CREATE TABLE IF NOT EXISTS data_raw_version (
+    id BOOLEAN PRIMARY KEY DEFAULT TRUE CHECK (id),
+    version BIGINT NOT NULL DEFAULT 0,
+    -- Versi terakhir yang sudah dihapus dari data_raw_changes (lihat prune)
+    pruned_through BIGINT NOT NULL DEFAULT 0
+);
+INSERT INTO data_raw_version (id) VALUES (TRUE) ON CONFLICT DO NOTHING;
+
+CREATE TABLE IF NOT EXISTS data_raw_changes (
+    id BIGSERIAL PRIMARY KEY,
+    version BIGINT NOT NULL,
+    "NO" INTEGER,
+    op CHAR(1) NOT NULL CHECK (op IN ('I', 'U', 'D', 'T')),
+    changed_at TIMESTAMPTZ NOT NULL DEFAULT now()
+);
+CREATE INDEX IF NOT EXISTS data_raw_changes_version_idx ON data_raw_changes (version);
+CREATE INDEX IF NOT EXISTS data_raw_changes_changed_at_idx ON data_raw_changes (changed_at);
+
+
+CREATE OR REPLACE FUNCTION data_raw_touch_updated_at() RETURNS trigger AS $$
+BEGIN
+    NEW.updated_at := now();
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+
+CREATE OR REPLACE FUNCTION data_raw_log_changes() RETURNS trigger AS $$
+DECLARE
+    new_version BIGINT;
+BEGIN
+    -- Statement tanpa baris terdampak (mis. UPDATE ... WHERE tidak cocok) diabaikan
+    IF TG_OP = 'DELETE' THEN
+        IF NOT EXISTS (SELECT 1 FROM old_rows) THEN RETURN NULL; END IF;
+    ELSIF TG_OP <> 'TRUNCATE' THEN
+        IF NOT EXISTS (SELECT 1 FROM new_rows) THEN RETURN NULL; END IF;
+    END IF;
+
+    UPDATE data_raw_version SET version = version + 1 RETURNING version INTO new_version;
+
+    IF TG_OP = 'INSERT' THEN
+        INSERT INTO data_raw_changes (version, "NO", op)
+        SELECT DISTINCT new_version, "NO", 'I' FROM new_rows;
+    ELSIF TG_OP = 'UPDATE' THEN
+        INSERT INTO data_raw_changes (version, "NO", op)
+        SELECT DISTINCT new_version, "NO", 'U' FROM new_rows;
+        -- NO yang diganti: NO lama tercatat sebagai dihapus
+        INSERT INTO data_raw_changes (version, "NO", op)
+        SELECT DISTINCT new_version, o."NO", 'D' FROM old_rows o
+        WHERE NOT EXISTS (SELECT 1 FROM new_rows n WHERE n."NO" = o."NO");
+    ELSIF TG_OP = 'DELETE' THEN
+        INSERT INTO data_raw_changes (version, "NO", op)
+        SELECT DISTINCT new_version, "NO", 'D' FROM old_rows;
+    ELSE
+        INSERT INTO data_raw_changes (version, "NO", op) VALUES (new_version, NULL, 'T');
+    END IF;
+
+    PERFORM pg_notify(
+        'data_raw_changes',
+        json_build_object('version', new_version, 'op', left(TG_OP, 1))::text
+    );
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+
+DROP TRIGGER IF EXISTS data_raw_touch_updated_at ON data_raw;
+CREATE TRIGGER data_raw_touch_updated_at
+    BEFORE UPDATE ON data_raw
+    FOR EACH ROW EXECUTE FUNCTION data_raw_touch_updated_at();
+
+DROP TRIGGER IF EXISTS data_raw_log_insert ON data_raw;
+CREATE TRIGGER data_raw_log_insert
+    AFTER INSERT ON data_raw
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION data_raw_log_changes();
+
+DROP TRIGGER IF EXISTS data_raw_log_update ON data_raw;
+CREATE TRIGGER data_raw_log_update
+    AFTER UPDATE ON data_raw
+    REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION data_raw_log_changes();
+
+DROP TRIGGER IF EXISTS data_raw_log_delete ON data_raw;
+CREATE TRIGGER data_raw_log_delete
+    AFTER DELETE ON data_raw
+    REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION data_raw_log_changes();
+
+DROP TRIGGER IF EXISTS data_raw_log_truncate ON data_raw;
+CREATE TRIGGER data_raw_log_truncate
+    AFTER TRUNCATE ON data_raw
+    FOR EACH STATEMENT EXECUTE FUNCTION data_raw_log_changes();
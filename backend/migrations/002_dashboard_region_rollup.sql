@@ -0,0 +1,151 @@
+-- ======================================================
+-- Rollup dashboard per wilayah (KECAMATAN -> DESA -> DUSUN)
+-- ======================================================
+-- Satu baris per (kecamatan, desa, dusun, dimensi, kategori) berisi jumlah
+-- petani, lahan, produksi, usia dan harga. Dimensi 'ringkasan' (kategori '')
+-- untuk /dashboard/summary, dimensi lain = kolom yang dipakai grafik
+-- distribusi & kelompok tani. Level desa/kecamatan dijawab dengan SUM di atas
+-- tabel kecil ini, bukan scan data_raw.
+--
+-- Trigger level statement menerapkan selisih (-baris lama +baris baru) dari
+-- transition table, jadi biaya update sebanding dengan jumlah baris berubah.
+-- Nama wilayah dinormalisasi upper(btrim()) supaya variasi penulisan menyatu.
+
+CREATE TABLE IF NOT EXISTS dashboard_region_rollup (
+    kecamatan TEXT NOT NULL,
+    desa TEXT NOT NULL,
+    dusun TEXT NOT NULL,
+    dimensi TEXT NOT NULL,
+    kategori TEXT NOT NULL,
+    jumlah BIGINT NOT NULL DEFAULT 0,
+    total_lahan_m2 NUMERIC NOT NULL DEFAULT 0,
+    lahan_positif_m2 NUMERIC NOT NULL DEFAULT 0,
+    total_hasil_kg NUMERIC NOT NULL DEFAULT 0,
+    hasil_total NUMERIC NOT NULL DEFAULT 0,
+    hasil_jumlah BIGINT NOT NULL DEFAULT 0,
+    usia_total NUMERIC NOT NULL DEFAULT 0,
+    usia_jumlah BIGINT NOT NULL DEFAULT 0,
+    harga_total NUMERIC NOT NULL DEFAULT 0,
+    harga_jumlah BIGINT NOT NULL DEFAULT 0,
+    PRIMARY KEY (kecamatan, desa, dusun, dimensi, kategori)
+);
+CREATE INDEX IF NOT EXISTS dashboard_region_rollup_dimensi_idx
+    ON dashboard_region_rollup (dimensi, kecamatan, desa);
+
+
+-- Query upsert selisih dari `source` (data_raw / new_rows / old_rows).
+-- Dijalankan lewat EXECUTE di fungsi trigger karena transition table hanya
+-- terlihat di fungsi trigger itu sendiri.
+CREATE OR REPLACE FUNCTION dashboard_region_rollup_query(source TEXT, direction INTEGER)
+RETURNS TEXT AS $$
+    SELECT format($q$
+        INSERT INTO dashboard_region_rollup AS t (
+            kecamatan, desa, dusun, dimensi, kategori, jumlah,
+            total_lahan_m2, lahan_positif_m2, total_hasil_kg, hasil_total, hasil_jumlah,
+            usia_total, usia_jumlah, harga_total, harga_jumlah
+        )
+        SELECT
+            upper(btrim(COALESCE(r."KECAMATAN", ''))),
+            upper(btrim(COALESCE(r."DESA", ''))),
+            upper(btrim(COALESCE(r."DUSUN", ''))),
+            d.dimensi,
+            d.kategori,
+            %2$s * COUNT(*),
+            %2$s * COALESCE(SUM(r."TOTAL LAHAN (M2)"), 0),
+            %2$s * COALESCE(SUM(r."TOTAL LAHAN (M2)") FILTER (WHERE r."TOTAL LAHAN (M2)" > 0), 0),
+            %2$s * COALESCE(SUM(r."HASIL PER TAHUN (kg)"), 0),
+            %2$s * COALESCE(SUM(r."HASIL PER TAHUN (kg)") FILTER (WHERE r."HASIL PER TAHUN (kg)" > 0), 0),
+            %2$s * COUNT(*) FILTER (WHERE r."HASIL PER TAHUN (kg)" > 0),
+            %2$s * COALESCE(SUM(r."USIA") FILTER (WHERE r."USIA" > 0), 0),
+            %2$s * COUNT(*) FILTER (WHERE r."USIA" > 0),
+            %2$s * COALESCE(SUM(h.harga), 0),
+            %2$s * COUNT(h.harga)
+        FROM %1$I r
+        -- 'Rp 72.000' -> 72000, sama dengan parse_harga di routers/analysis.py
+        CROSS JOIN LATERAL (
+            SELECT NULLIF(CASE WHEN x ~ '^[0-9]+$' THEN x::numeric END, 0) AS harga
+            FROM (
+                SELECT btrim(replace(replace(replace(r."HARGA JUAL PER KG", 'Rp', ''), '.', ''), ',', '')) AS x
+            ) s
+        ) h
+        CROSS JOIN LATERAL (VALUES
+            ('ringkasan', ''),
+            ('JENIS KOPI', r."JENIS KOPI"),
+            ('METODE PANEN', r."METODE PANEN"),
+            ('METODE PENGOLAHAN', r."METODE PENGOLAHAN"),
+            ('PROSES PENGERINGAN', r."PROSES PENGERINGAN"),
+            ('METODE PENJUALAN', r."METODE PENJUALAN"),
+            ('VARIETAS KOPI', r."VARIETAS KOPI"),
+            ('KELOMPOK TANI', r."KELOMPOK TANI")
+        ) d (dimensi, kategori)
+        WHERE d.kategori IS NOT NULL AND (d.dimensi = 'ringkasan' OR d.kategori <> '')
+        GROUP BY 1, 2, 3, d.dimensi, d.kategori
+        ON CONFLICT (kecamatan, desa, dusun, dimensi, kategori) DO UPDATE SET
+            jumlah = t.jumlah + EXCLUDED.jumlah,
+            total_lahan_m2 = t.total_lahan_m2 + EXCLUDED.total_lahan_m2,
+            lahan_positif_m2 = t.lahan_positif_m2 + EXCLUDED.lahan_positif_m2,
+            total_hasil_kg = t.total_hasil_kg + EXCLUDED.total_hasil_kg,
+            hasil_total = t.hasil_total + EXCLUDED.hasil_total,
+            hasil_jumlah = t.hasil_jumlah + EXCLUDED.hasil_jumlah,
+            usia_total = t.usia_total + EXCLUDED.usia_total,
+            usia_jumlah = t.usia_jumlah + EXCLUDED.usia_jumlah,
+            harga_total = t.harga_total + EXCLUDED.harga_total,
+            harga_jumlah = t.harga_jumlah + EXCLUDED.harga_jumlah
+    $q$, source, direction)
+$$ LANGUAGE sql IMMUTABLE;
+
+
+CREATE OR REPLACE FUNCTION dashboard_region_rollup_rebuild() RETURNS void AS $$
+BEGIN
+    DELETE FROM dashboard_region_rollup;
+    EXECUTE dashboard_region_rollup_query('data_raw', 1);
+END;
+$$ LANGUAGE plpgsql;
+
+
+CREATE OR REPLACE FUNCTION dashboard_region_rollup_sync() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP = 'TRUNCATE' THEN
+        DELETE FROM dashboard_region_rollup;
+        RETURN NULL;
+    END IF;
+
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        EXECUTE dashboard_region_rollup_query('old_rows', -1);
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        EXECUTE dashboard_region_rollup_query('new_rows', 1);
+    END IF;
+
+    IF TG_OP <> 'INSERT' THEN
+        DELETE FROM dashboard_region_rollup WHERE jumlah <= 0;
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+
+DROP TRIGGER IF EXISTS dashboard_region_rollup_insert ON data_raw;
+CREATE TRIGGER dashboard_region_rollup_insert
+    AFTER INSERT ON data_raw
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION dashboard_region_rollup_sync();
+
+DROP TRIGGER IF EXISTS dashboard_region_rollup_update ON data_raw;
+CREATE TRIGGER dashboard_region_rollup_update
+    AFTER UPDATE ON data_raw
+    REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION dashboard_region_rollup_sync();
+
+DROP TRIGGER IF EXISTS dashboard_region_rollup_delete ON data_raw;
+CREATE TRIGGER dashboard_region_rollup_delete
+    AFTER DELETE ON data_raw
+    REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION dashboard_region_rollup_sync();
+
+DROP TRIGGER IF EXISTS dashboard_region_rollup_truncate ON data_raw;
+CREATE TRIGGER dashboard_region_rollup_truncate
+    AFTER TRUNCATE ON data_raw
+    FOR EACH STATEMENT EXECUTE FUNCTION dashboard_region_rollup_sync();
+
+SELECT dashboard_region_rollup_rebuild();
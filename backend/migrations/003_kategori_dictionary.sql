@@ -0,0 +1,178 @@
+-- ======================================================
+-- Kamus nilai kategori (dictionary encoding) untuk kolom survei
+-- ======================================================
+-- kategori_nilai: satu kode integer per nilai kanonik per kolom.
+-- kategori_alias: kunci normalisasi (lower + spasi dirapikan) -> kode, jadi
+--   "tengkulak", " Tengkulak " dan "TENGKULAK" jatuh ke nilai yang sama.
+-- Kanonik awal = ejaan paling sering di data; alias khusus (mis. KEMITRAAN
+-- "0" -> "Tidak Ada", sama dengan ai_utils.transform_replace_kemitraan) dan
+-- ejaan yang dikenal OneHotEncoder model di-seed lebih dulu. Backfill di akhir menulis ulang data_raw ke nilai
+-- kanonik (trigger change log & rollup ikut memperbarui turunannya).
+--
+-- Daftar kolom harus sama dengan KATEGORI_COLUMNS di backend/kategori.py.
+
+CREATE TABLE IF NOT EXISTS kategori_nilai (
+    kode SERIAL PRIMARY KEY,
+    kolom TEXT NOT NULL,
+    nilai TEXT NOT NULL,
+    UNIQUE (kolom, nilai)
+);
+
+CREATE TABLE IF NOT EXISTS kategori_alias (
+    kolom TEXT NOT NULL,
+    varian TEXT NOT NULL,
+    kode INTEGER NOT NULL REFERENCES kategori_nilai (kode) ON DELETE CASCADE,
+    PRIMARY KEY (kolom, varian)
+);
+
+
+CREATE OR REPLACE FUNCTION kategori_kunci(nilai TEXT) RETURNS TEXT AS $$
+    SELECT lower(regexp_replace(btrim(nilai), '\s+', ' ', 'g'))
+$$ LANGUAGE sql IMMUTABLE;
+
+
+-- Nilai kanonik untuk (kolom, nilai); nilai baru didaftarkan sebagai kanonik
+CREATE OR REPLACE FUNCTION kategori_kanonik(p_kolom TEXT, p_nilai TEXT) RETURNS TEXT AS $$
+DECLARE
+    v_kunci TEXT := kategori_kunci(p_nilai);
+    v_hasil TEXT;
+    v_kode INTEGER;
+BEGIN
+    IF v_kunci IS NULL OR v_kunci = '' THEN
+        RETURN p_nilai;
+    END IF;
+
+    SELECT n.nilai INTO v_hasil
+    FROM kategori_alias a JOIN kategori_nilai n ON n.kode = a.kode
+    WHERE a.kolom = p_kolom AND a.varian = v_kunci;
+    IF FOUND THEN
+        RETURN v_hasil;
+    END IF;
+
+    INSERT INTO kategori_nilai (kolom, nilai)
+    VALUES (p_kolom, regexp_replace(btrim(p_nilai), '\s+', ' ', 'g'))
+    ON CONFLICT (kolom, nilai) DO UPDATE SET nilai = EXCLUDED.nilai
+    RETURNING kode INTO v_kode;
+    -- Request lain mungkin mendaftarkan varian yang sama bersamaan: alias yang
+    -- sudah ada menang, lalu dibaca ulang
+    INSERT INTO kategori_alias (kolom, varian, kode)
+    VALUES (p_kolom, v_kunci, v_kode)
+    ON CONFLICT DO NOTHING;
+
+    SELECT n.nilai INTO v_hasil
+    FROM kategori_alias a JOIN kategori_nilai n ON n.kode = a.kode
+    WHERE a.kolom = p_kolom AND a.varian = v_kunci;
+    RETURN v_hasil;
+END;
+$$ LANGUAGE plpgsql;
+
+
+-- Seed alias khusus KEMITRAAN
+INSERT INTO kategori_nilai (kolom, nilai) VALUES
+    ('KEMITRAAN', 'Tidak Ada'),
+    ('KEMITRAAN', 'Tengkulak'),
+    ('KEMITRAAN', 'User')
+ON CONFLICT DO NOTHING;
+
+INSERT INTO kategori_alias (kolom, varian, kode)
+SELECT 'KEMITRAAN', v.varian, n.kode
+FROM (VALUES
+    ('0', 'Tidak Ada'),
+    ('tidak ada', 'Tidak Ada'),
+    ('tengkulak', 'Tengkulak'),
+    ('user', 'User')
+) v (varian, nilai)
+JOIN kategori_nilai n ON n.kolom = 'KEMITRAAN' AND n.nilai = v.nilai
+ON CONFLICT DO NOTHING;
+
+
+-- Seed ejaan kategori yang dikenal model (categories_ OneHotEncoder di
+-- models_ai/full_pipeline_*.joblib). Encoder peka huruf besar/kecil dan
+-- mengabaikan kategori asing, jadi kanonik kolom fitur harus ejaan ini;
+-- kalau tidak, backfill bisa menulis ulang data ke ejaan yang tidak dikenal
+-- model dan assignment cluster bergeser.
+INSERT INTO kategori_nilai (kolom, nilai) VALUES
+    ('METODE BUDIDAYA', 'kombinasi'),
+    ('METODE BUDIDAYA', 'organik'),
+    ('PUPUK', 'kimia'),
+    ('PUPUK', 'kombinasi'),
+    ('PUPUK', 'organik'),
+    ('METODE PANEN', 'Petik selektif'),
+    ('METODE PANEN', 'petik merah'),
+    ('SISTEM IRIGASI', 'Tadah hujan'),
+    ('LAMA FERMENTASI', '10 hari'),
+    ('LAMA FERMENTASI', '5 hari'),
+    ('LAMA FERMENTASI', 'Tanpa Fermentasi'),
+    ('PROSES PENGERINGAN', 'lantai'),
+    ('PROSES PENGERINGAN', 'lantai dan terpal'),
+    ('PROSES PENGERINGAN', 'terpal'),
+    ('PROSES PENGERINGAN', 'widek'),
+    ('PROSES PENGERINGAN', 'widek, terpal'),
+    ('METODE PENJUALAN', 'Tengkulak'),
+    ('METODE PENJUALAN', 'langsung'),
+    ('BENTUK PENYIMPANAN', 'gelondong'),
+    ('BENTUK PENYIMPANAN', 'green bean'),
+    ('BENTUK PENYIMPANAN', 'sesek'),
+    ('SISTEM PENYIMPANAN', 'Karung'),
+    ('SISTEM PENYIMPANAN', 'plastik (iner)'),
+    ('METODE PENGOLAHAN', 'Honey'),
+    ('METODE PENGOLAHAN', 'natural')
+ON CONFLICT DO NOTHING;
+
+INSERT INTO kategori_alias (kolom, varian, kode)
+SELECT n.kolom, kategori_kunci(n.nilai), n.kode
+FROM kategori_nilai n
+WHERE n.kolom <> 'KEMITRAAN'
+ON CONFLICT DO NOTHING;
+
+
+-- Backfill kamus dari data yang ada, lalu tulis ulang data_raw ke nilai kanonik
+DO $$
+DECLARE
+    kolom_kategori TEXT;
+BEGIN
+    FOREACH kolom_kategori IN ARRAY ARRAY[
+        'JENIS KELAMIN', 'KELOMPOK TANI', 'STATUS KEPEMILIKAN', 'JENIS KOPI',
+        'VARIETAS KOPI', 'VARIETAS UNGGUL', 'METODE BUDIDAYA', 'PUPUK',
+        'SISTEM IRIGASI', 'METODE PANEN', 'METODE PENGOLAHAN', 'ALAT PENGOLAHAN',
+        'LAMA FERMENTASI', 'PROSES PENGERINGAN', 'BENTUK PENYIMPANAN',
+        'SISTEM PENYIMPANAN', 'METODE PENJUALAN', 'KEMITRAAN'
+    ] LOOP
+        EXECUTE format($q$
+            INSERT INTO kategori_nilai (kolom, nilai)
+            SELECT DISTINCT ON (s.kunci) %2$L, s.ejaan
+            FROM (
+                SELECT kategori_kunci(%1$I) AS kunci,
+                       regexp_replace(btrim(%1$I), '\s+', ' ', 'g') AS ejaan,
+                       COUNT(*) AS jumlah
+                FROM data_raw
+                WHERE %1$I IS NOT NULL
+                GROUP BY 1, 2
+            ) s
+            WHERE s.kunci <> ''
+              AND NOT EXISTS (
+                  SELECT 1 FROM kategori_alias a
+                  WHERE a.kolom = %2$L AND a.varian = s.kunci
+              )
+            ORDER BY s.kunci, s.jumlah DESC, s.ejaan
+            ON CONFLICT (kolom, nilai) DO NOTHING
+        $q$, kolom_kategori, kolom_kategori);
+
+        INSERT INTO kategori_alias (kolom, varian, kode)
+        SELECT n.kolom, kategori_kunci(n.nilai), n.kode
+        FROM kategori_nilai n
+        WHERE n.kolom = kolom_kategori
+        ON CONFLICT DO NOTHING;
+
+        EXECUTE format($q$
+            UPDATE data_raw d
+            SET %1$I = n.nilai
+            FROM kategori_alias a
+            JOIN kategori_nilai n ON n.kode = a.kode
+            WHERE a.kolom = %2$L
+              AND a.varian = kategori_kunci(d.%1$I)
+              AND d.%1$I IS DISTINCT FROM n.nilai
+        $q$, kolom_kategori, kolom_kategori);
+    END LOOP;
+END;
+$$;
@@ -0,0 +1,94 @@
+from .lazy import lazy_import
+
+pd = lazy_import("pandas")
+np = lazy_import("numpy")
+
+# ======================================================
+# 🚩 Deteksi outlier hasil & lahan per kelompok tani
+# ======================================================
+# Dihitung vektor (groupby pandas) di atas snapshot kolumnar data_raw. Setiap
+# metrik dibandingkan dengan sesama anggota KELOMPOK TANI yang sama:
+#   - mad: robust z = 0.6745 * (x - median) / MAD, outlier jika |z| > 3.5
+#   - iqr: outlier jika di luar [Q1 - 3*IQR, Q3 + 3*IQR]
+# Salah ketik seperti kelebihan satu nol (x10) jauh melewati kedua batas.
+
+KELOMPOK_COLUMN = "KELOMPOK TANI"
+HASIL_COLUMN = "HASIL PER TAHUN (kg)"
+LAHAN_COLUMN = "TOTAL LAHAN (M2)"
+METRICS = ("hasil_per_tahun_kg", "total_lahan_m2", "hasil_per_m2")
+METHODS = ("mad", "iqr")
+MAD_THRESHOLD = 3.5
+IQR_FACTOR = 3.0
+MIN_GROUP_SIZE = 5  # kelompok lebih kecil tidak dinilai
+MAD_SCALE = 0.6745
+MEAN_AD_SCALE = 1.2533  # pengganti MAD jika MAD = 0 (banyak nilai kembar)
+
+
+def _long_frame(df):
+    """Satu baris per (NO, metrik) dengan nilai > 0"""
+    hasil = pd.to_numeric(df[HASIL_COLUMN], errors="coerce")
+    lahan = pd.to_numeric(df[LAHAN_COLUMN], errors="coerce")
+    values = {
+        "hasil_per_tahun_kg": hasil,
+        "total_lahan_m2": lahan,
+        "hasil_per_m2": hasil / lahan.where(lahan > 0),
+    }
+    kelompok = df[KELOMPOK_COLUMN].astype(object)
+    valid = kelompok.notna() & (kelompok.astype(str).str.strip() != "")
+
+    parts = []
+    for metric, series in values.items():
+        keep = valid & (series > 0)
+        parts.append(
+            pd.DataFrame(
+                {
+                    "NO": df.loc[keep, "NO"],
+                    "NAMA": (
+                        df.loc[keep, "NAMA"].astype(object) if "NAMA" in df.columns else None
+                    ),
+                    "kelompok": kelompok[keep],
+                    "metrik": metric,
+                    "nilai": series[keep].astype(float),
+                }
+            )
+        )
+    return pd.concat(parts, ignore_index=True)
+
+
+def score(df, method="mad"):
+    """
+    Skor outlier untuk DataFrame snapshot (butuh NO, KELOMPOK TANI, HASIL PER
+    TAHUN (kg), TOTAL LAHAN (M2); NAMA opsional). Hasil: satu baris per
+    (NO, metrik) dengan median, robust_z, batas_bawah, batas_atas, outlier.
+    """
+    scored = _long_frame(df)
+    groups = scored.groupby(["kelompok", "metrik"])["nilai"]
+    scored["n"] = groups.transform("size")
+    scored["median"] = groups.transform("median")
+    q1 = groups.transform("quantile", 0.25)
+    q3 = groups.transform("quantile", 0.75)
+
+    deviation = (scored["nilai"] - scored["median"]).abs()
+    deviations = deviation.groupby([scored["kelompok"], scored["metrik"]])
+    mad = deviations.transform("median")
+    mad = mad.where(mad > 0, deviations.transform("mean") * MEAN_AD_SCALE * MAD_SCALE)
+    mad = mad.where(mad > 0)
+    scored["robust_z"] = MAD_SCALE * (scored["nilai"] - scored["median"]) / mad
+
+    if method == "iqr":
+        spread = q3 - q1
+        scored["batas_bawah"] = q1 - IQR_FACTOR * spread
+        scored["batas_atas"] = q3 + IQR_FACTOR * spread
+    else:
+        scored["batas_bawah"] = scored["median"] - MAD_THRESHOLD * mad / MAD_SCALE
+        scored["batas_atas"] = scored["median"] + MAD_THRESHOLD * mad / MAD_SCALE
+
+    outside = (scored["nilai"] < scored["batas_bawah"]) | (scored["nilai"] > scored["batas_atas"])
+    scored["outlier"] = outside.fillna(False) & (scored["n"] >= MIN_GROUP_SIZE)
+    return scored
+
+
+def flagged_nos(scored, metrics=METRICS):
+    """Set NO yang ditandai outlier pada salah satu `metrics`"""
+    flagged = scored[scored["outlier"] & scored["metrik"].isin(metrics)]
+    return set(flagged["NO"].astype(int))
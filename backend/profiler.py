@@ -0,0 +1,124 @@
+import os
+import re
+import uuid
+import pstats
+import asyncio
+import cProfile
+import tempfile
+from io import StringIO
+
+from fastapi import HTTPException
+from fastapi.responses import JSONResponse
+
+from . import auth
+from .logger import get_logger
+
+# ======================================================
+# 🔬 Profiling on-demand per request
+# ======================================================
+# Kirim header `X-Profile: 1` + `Authorization: Bearer <token admin>` ke
+# endpoint mana pun. Handler dijalankan di bawah cProfile, hasilnya disimpan
+# sebagai file .prof di PROFILE_DIR dan ID-nya dikembalikan lewat header
+# X-Profile-Id (unduh via /admin/profiles/{id}). Tanpa header, middleware
+# langsung meneruskan request (hanya satu lookup header).
+#
+# cProfile merekam seluruh thread event loop, jadi request lain yang berjalan
+# bersamaan ikut tercatat; karena itu hanya satu profil yang aktif dalam satu
+# waktu.
+
+PROFILE_HEADER = "X-Profile"
+PROFILE_DIR = os.getenv(
+    "PROFILE_DIR", os.path.join(tempfile.gettempdir(), "kopintar-profiles")
+)
+PROFILE_KEEP = int(os.getenv("PROFILE_KEEP", "50"))
+
+PROFILE_ID_PATTERN = re.compile(r"^[0-9a-f]{32}$")
+
+log = get_logger(__name__)
+_lock = asyncio.Lock()
+
+
+def profile_path(profile_id):
+    """Path file .prof, None jika ID tidak valid"""
+    if not PROFILE_ID_PATTERN.match(profile_id):
+        return None
+    return os.path.join(PROFILE_DIR, f"{profile_id}.prof")
+
+
+def list_profiles():
+    """Daftar profil tersimpan, terbaru dulu"""
+    if not os.path.isdir(PROFILE_DIR):
+        return []
+
+    profiles = []
+    for name in os.listdir(PROFILE_DIR):
+        if not name.endswith(".prof"):
+            continue
+        path = os.path.join(PROFILE_DIR, name)
+        stat = os.stat(path)
+        profiles.append(
+            {"id": name[:-5], "size_bytes": stat.st_size, "created_at": stat.st_mtime}
+        )
+    return sorted(profiles, key=lambda p: p["created_at"], reverse=True)
+
+
+def render_text(profile_id, sort="cumulative", limit=50):
+    """Ringkasan pstats dalam bentuk teks"""
+    output = StringIO()
+    stats = pstats.Stats(profile_path(profile_id), stream=output)
+    stats.strip_dirs().sort_stats(sort).print_stats(limit)
+    return output.getvalue()
+
+
+def _save(profiler, profile_id, method, path):
+    os.makedirs(PROFILE_DIR, exist_ok=True)
+    profiler.dump_stats(profile_path(profile_id))
+
+    # Buang profil lama supaya disk tidak penuh
+    for old in list_profiles()[PROFILE_KEEP:]:
+        os.remove(profile_path(old["id"]))
+    log.info("Profil %s disimpan untuk %s %s", profile_id, method, path)
+
+
+async def _is_admin(request):
+    authorization = request.headers.get("Authorization", "")
+    scheme, _, token = authorization.partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return False
+    try:
+        await auth.get_current_user(token)
+    except HTTPException:
+        return False
+    return True
+
+
+async def profiling_middleware(request, call_next):
+    """Jalankan request di bawah cProfile jika header X-Profile dikirim admin"""
+    if PROFILE_HEADER not in request.headers:
+        return await call_next(request)
+
+    if not await _is_admin(request):
+        return JSONResponse(
+            status_code=401,
+            content={"detail": "Profiling hanya untuk admin"},
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
+    if _lock.locked():
+        response = await call_next(request)
+        response.headers["X-Profile-Status"] = "busy"
+        return response
+
+    async with _lock:
+        profile_id = uuid.uuid4().hex
+        profiler = cProfile.Profile()
+        profiler.enable()
+        try:
+            response = await call_next(request)
+        finally:
+            profiler.disable()
+        await asyncio.to_thread(_save, profiler, profile_id, request.method, request.url.path)
+
+    response.headers["X-Profile-Id"] = profile_id
+    response.headers["X-Profile-Url"] = f"/admin/profiles/{profile_id}"
+    return response
@@ -0,0 +1,180 @@
+import os
+import json
+import asyncio
+import asyncpg
+from fastapi import WebSocket, WebSocketDisconnect
+
+from .database import database, DATABASE_URL
+from .logger import get_logger
+
+log = get_logger(__name__)
+
+# LISTEN butuh koneksi sesi penuh. PgBouncer mode transaction (mis. pooler
+# Supabase port 6543) tidak meneruskan notifikasi, jadi arahkan DB_LISTEN_URL
+# ke koneksi langsung jika aplikasi lewat pooler.
+LISTEN_URL = os.getenv("DB_LISTEN_URL", DATABASE_URL)
+RECONNECT_DELAY = 5  # detik
+QUEUE_SIZE = 100
+NOTIFY_MAX_BYTES = 7900  # batas payload NOTIFY Postgres 8000 byte
+
+# Channel Postgres yang didengarkan oleh listener bersama
+CHANNELS = ["laporan_masalah", "dashboard", "data_raw_changes"]
+
+
+# ======================================================
+# 📡 Broadcaster (fan-out ke client di worker ini)
+# ======================================================
+class Broadcaster:
+    """Menyalurkan event dari satu listener ke banyak client yang subscribe"""
+
+    def __init__(self):
+        self._subscribers = {}
+
+    def subscribe(self, channel):
+        queue = asyncio.Queue(maxsize=QUEUE_SIZE)
+        self._subscribers.setdefault(channel, set()).add(queue)
+        return queue
+
+    def unsubscribe(self, channel, queue):
+        self._subscribers.get(channel, set()).discard(queue)
+
+    def subscriber_count(self, channel=None):
+        if channel is not None:
+            return len(self._subscribers.get(channel, ()))
+        return sum(len(queues) for queues in self._subscribers.values())
+
+    def publish(self, channel, payload):
+        for queue in list(self._subscribers.get(channel, ())):
+            if queue.full():
+                # Client lambat: buang event paling lama, jangan blok listener
+                queue.get_nowait()
+            queue.put_nowait(payload)
+
+
+broadcaster = Broadcaster()
+
+# Callback lokal per channel (mis. invalidasi cache di setiap worker)
+_handlers = {}
+_listener_conn = None
+_reconnect_task = None
+
+
+def add_handler(channel, handler):
+    """Daftarkan fungsi yang dipanggil untuk setiap event di channel"""
+    _handlers.setdefault(channel, []).append(handler)
+
+
+def _on_notification(connection, pid, channel, payload):
+    try:
+        data = json.loads(payload)
+    except (TypeError, ValueError):
+        data = {"raw": payload}
+
+    for handler in _handlers.get(channel, []):
+        try:
+            handler(data)
+        except Exception:
+            log.exception("Handler notifikasi '%s' gagal", channel)
+
+    broadcaster.publish(channel, data)
+
+
+def _on_termination(connection):
+    global _listener_conn
+    _listener_conn = None
+    log.warning("Koneksi listener notifikasi terputus, mencoba lagi...")
+    _schedule_reconnect()
+
+
+def _schedule_reconnect():
+    global _reconnect_task
+    if _reconnect_task is None or _reconnect_task.done():
+        _reconnect_task = asyncio.ensure_future(_reconnect())
+
+
+async def _reconnect():
+    while True:
+        await asyncio.sleep(RECONNECT_DELAY)
+        if await _connect():
+            return
+
+
+async def _connect():
+    global _listener_conn
+    try:
+        conn = await asyncpg.connect(LISTEN_URL)
+        for channel in CHANNELS:
+            await conn.add_listener(channel, _on_notification)
+        conn.add_termination_listener(_on_termination)
+        _listener_conn = conn
+        log.info("Listener notifikasi aktif untuk channel: %s", CHANNELS)
+        return True
+    except Exception as e:
+        log.warning("Listener notifikasi tidak aktif: %s", e)
+        return False
+
+
+# ======================================================
+# 🔌 Listener bersama (satu koneksi per worker)
+# ======================================================
+async def start_listener():
+    """Buka satu koneksi LISTEN untuk semua channel. Gagal = dicoba lagi di background."""
+    if _listener_conn is not None:
+        return
+    if not await _connect():
+        _schedule_reconnect()
+
+
+async def stop_listener():
+    """Tutup koneksi listener saat aplikasi berhenti"""
+    global _listener_conn
+    if _reconnect_task is not None:
+        _reconnect_task.cancel()
+
+    conn, _listener_conn = _listener_conn, None
+    if conn is not None:
+        conn.remove_termination_listener(_on_termination)
+        await conn.close()
+
+
+async def notify(channel, payload):
+    """
+    Kirim NOTIFY. Jika dipanggil di dalam transaksi, terkirim saat commit.
+    Payload yang melewati batas Postgres diganti {"event", "truncated": true}
+    (pg_notify akan error dan membatalkan transaksi penulisnya); handler
+    memperlakukan event tanpa detail sebagai perubahan penuh.
+    """
+    encoded = json.dumps(payload, default=str)
+    if len(encoded.encode()) > NOTIFY_MAX_BYTES:
+        log.warning("Payload NOTIFY %s terlalu besar (%d byte), dipotong", channel, len(encoded))
+        encoded = json.dumps({"event": payload.get("event"), "truncated": True})
+    await database.execute(
+        "SELECT pg_notify(:channel, :payload)",
+        values={"channel": channel, "payload": encoded},
+    )
+
+
+async def stream_to_websocket(websocket: WebSocket, channel):
+    """Kirim semua event channel ke websocket sampai client menutup koneksi"""
+    queue = broadcaster.subscribe(channel)
+    receiver = asyncio.ensure_future(websocket.receive_text())
+    try:
+        while True:
+            getter = asyncio.ensure_future(queue.get())
+            done, _ = await asyncio.wait(
+                {getter, receiver}, return_when=asyncio.FIRST_COMPLETED
+            )
+            if getter in done:
+                await websocket.send_json(getter.result())
+            else:
+                getter.cancel()
+
+            if receiver in done:
+                # Pesan dari client diabaikan; disconnect akan raise di sini
+                receiver.result()
+                receiver = asyncio.ensure_future(websocket.receive_text())
+    except WebSocketDisconnect:
+        pass
+    finally:
+        receiver.cancel()
+        broadcaster.unsubscribe(channel, queue)
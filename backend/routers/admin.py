@@ -0,0 +1,63 @@
+from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import FileResponse, PlainTextResponse
+import os
+
+from .. import auth, data_quality, profiler
+
+router = APIRouter(
+    prefix="/admin", tags=["Admin"], dependencies=[Depends(auth.get_current_user)]
+)
+
+
+# ==================================
+# 🔬 Hasil profiling request
+# ==================================
+@router.get("/profiles")
+async def read_profiles():
+    """Daftar profil yang tersimpan (terbaru dulu)."""
+    return profiler.list_profiles()
+
+
+@router.get("/profiles/{profile_id}")
+async def download_profile(profile_id: str, format: str = "prof", sort: str = "cumulative"):
+    """
+    Unduh profil. format=prof -> file cProfile (buka dengan snakeviz/pstats),
+    format=txt -> ringkasan pstats diurutkan berdasarkan `sort`.
+    """
+    path = profiler.profile_path(profile_id)
+    if path is None or not os.path.exists(path):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Profil tidak ditemukan"
+        )
+
+    if format == "txt":
+        try:
+            return PlainTextResponse(profiler.render_text(profile_id, sort=sort))
+        except KeyError:
+            raise HTTPException(status_code=400, detail=f"sort '{sort}' tidak dikenal")
+
+    return FileResponse(
+        path, media_type="application/octet-stream", filename=f"{profile_id}.prof"
+    )
+
+
+# ==================================
+# 🩺 Kualitas data data_raw
+# ==================================
+@router.get("/data-quality")
+async def read_data_quality():
+    """Jumlah NULL, kosong, dan angka tidak valid per kolom (satu query SQL)."""
+    return await data_quality.report()
+
+
+@router.post("/data-quality/fill")
+async def fill_data_quality(value: str = data_quality.FILL_VALUE, columns: str = None):
+    """
+    Isi NULL/kosong di kolom teks dengan `value` langsung di database.
+    `columns` = daftar kolom dipisah koma (default semua kolom teks non-angka).
+    """
+    selected = [c.strip() for c in columns.split(",") if c.strip()] if columns else None
+    try:
+        return await data_quality.fill_empty(value, selected)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
@@ -2,22 +2,30 @@ import os
 import sys
 import re
 import json
-import joblib
-import pandas as pd
-import numpy as np
-from fastapi import APIRouter, HTTPException
+import asyncio
+import threading
+from fastapi import APIRouter, HTTPException, WebSocket, status
 from fastapi.responses import JSONResponse
 from fastapi.encoders import jsonable_encoder
 from collections import Counter
-import google.generativeai as genai
 
 from ..schemas import (
     RecommendationRequest,
     LaporanMasalahRequest,
     ValidateLaporanRequest,
+    BulkValidateLaporanRequest,
 )
-from ..database import database
-from .. import ai_utils
+from ..database import database, read_database, mark_write, note_data_change
+from .. import ai_utils, auth, cache, drift, realtime, similarity, snapshot
+from ..metrics import span, record_inference
+from ..logger import get_logger, is_debug
+from ..lazy import lazy_import
+
+# Modul berat dimuat saat pertama dipakai (lihat backend/lazy.py)
+pd = lazy_import("pandas")
+np = lazy_import("numpy")
+joblib = lazy_import("joblib")
+genai = lazy_import("google.generativeai")
 
 # Registrasi fungsi custom
 sys.modules["__main__"].transform_clean_harga = ai_utils.transform_clean_harga
@@ -31,6 +39,7 @@ sys.modules["__main__"].transform_clean_lama_bertani = (
 sys.modules["__main__"].transform_impute_missing = ai_utils.transform_impute_missing
 
 router = APIRouter(prefix="/analysis", tags=["Analysis & AI"])
+log = get_logger(__name__)
 
 
 # ======================================================
@@ -40,32 +49,70 @@ def load_model(path, name):
     """Load model ML dengan error handling"""
     try:
         model = joblib.load(path)
-        print(f"✅ {name} berhasil dimuat.")
+        log.info("%s berhasil dimuat.", name)
         return model
     except FileNotFoundError:
-        print(f"⚠️ File '{path}' tidak ditemukan.")
+        log.warning("File '%s' tidak ditemukan.", path)
         return None
-    except Exception as e:
-        print(f"❌ Gagal memuat {name}: {e}")
+    except Exception:
+        log.exception("Gagal memuat %s", name)
         return None
 
 
-# Load models - HANYA DUA PIPELINE UTAMA (TANPA PROXY)
-FULL_PIPELINE_PRODUK_BUDIDAYA = load_model(
-    "backend/models_ai/full_pipeline_produk_budidaya.joblib", "Pipeline Produk Budidaya"
-)
+def load_gemini():
+    """Konfigurasi Gemini, None jika gagal"""
+    try:
+        genai.configure(api_key=os.getenv("GOOGLE_API_KEY"))
+        model = genai.GenerativeModel("gemini-2.0-flash-exp")
+        log.info("Gemini siap.")
+        return model
+    except Exception:
+        log.exception("Gagal menyiapkan Gemini")
+        return None
 
-FULL_PIPELINE_PROFIL_PASAR = load_model(
-    "backend/models_ai/full_pipeline_profil_pasar.joblib", "Pipeline Profil Pasar"
-)
 
-# Gemini
-try:
-    genai.configure(api_key=os.getenv("GOOGLE_API_KEY"))
-    GEMINI_MODEL = genai.GenerativeModel("gemini-2.0-flash-exp")
-    print("✅ Gemini siap.")
-except:
-    GEMINI_MODEL = None
+# Model dimuat sekali saat pertama dipakai atau oleh warm-up setelah startup,
+# bukan saat modul diimpor - HANYA DUA PIPELINE UTAMA (TANPA PROXY)
+MODEL_LOADERS = {
+    "produk_budidaya": lambda: load_model(
+        "backend/models_ai/full_pipeline_produk_budidaya.joblib",
+        "Pipeline Produk Budidaya",
+    ),
+    "profil_pasar": lambda: load_model(
+        "backend/models_ai/full_pipeline_profil_pasar.joblib", "Pipeline Profil Pasar"
+    ),
+    "gemini": load_gemini,
+}
+
+_models = {}
+_models_lock = threading.Lock()
+
+
+def get_model(key):
+    """Ambil model (memuat jika belum); None jika gagal dimuat"""
+    if key not in _models:
+        with _models_lock:
+            if key not in _models:
+                _models[key] = MODEL_LOADERS[key]()
+    return _models[key]
+
+
+async def ensure_model(key):
+    """Seperti get_model, tapi pemuatan pertama dijalankan di thread agar loop tidak terblok"""
+    if key in _models:
+        return _models[key]
+    return await asyncio.to_thread(get_model, key)
+
+
+def model_status():
+    """Status tiap model: 'loaded', 'failed', atau 'not_loaded'"""
+    status_map = {}
+    for key in MODEL_LOADERS:
+        if key not in _models:
+            status_map[key] = "not_loaded"
+        else:
+            status_map[key] = "loaded" if _models[key] is not None else "failed"
+    return status_map
 
 
 # ======================================================
@@ -150,19 +197,26 @@ def get_nama_column(df):
     """Cari kolom NAMA dengan berbagai variasi"""
     for col_name in ["NAMA", "nama", "Nama"]:
         if col_name in df.columns:
-            print(f"✅ Kolom NAMA ditemukan: '{col_name}'")
             return col_name
 
     for col in df.columns:
         col_upper = str(col).upper()
         if "NAMA" in col_upper:
-            print(f"✅ Kolom NAMA ditemukan (parsial): '{col}'")
+            log.debug("Kolom NAMA ditemukan (parsial): '%s'", col)
             return col
 
-    print("⚠️ Kolom NAMA tidak ditemukan")
+    log.warning("Kolom NAMA tidak ditemukan")
     return None
 
 
+HEADER_KEY_COLUMNS = [
+    "NAMA",
+    "HASIL PER TAHUN (kg)",
+    "HARGA JUAL PER KG",
+    "POPULASI KOPI",
+]
+
+
 def remove_header_rows(df):
     """Deteksi dan hapus baris yang berisi header sebagai data"""
     if len(df) == 0:
@@ -172,15 +226,9 @@ def remove_header_rows(df):
 
     for idx in range(min(3, len(df))):
         row = df.iloc[idx]
-        key_columns = [
-            "NAMA",
-            "HASIL PER TAHUN (kg)",
-            "HARGA JUAL PER KG",
-            "POPULASI KOPI",
-        ]
         matching = 0
 
-        for col in key_columns:
+        for col in HEADER_KEY_COLUMNS:
             if col in df.columns:
                 cell_value = str(row[col]).strip().upper()
                 col_name = str(col).strip().upper()
@@ -189,25 +237,38 @@ def remove_header_rows(df):
 
         if matching >= 3:
             rows_to_drop.append(idx)
-            print(f"⚠️ Terdeteksi baris header di index {idx}")
 
     if rows_to_drop:
         df = df.drop(df.index[rows_to_drop]).reset_index(drop=True)
-        print(f"📊 {len(rows_to_drop)} baris header dihapus. Data tersisa: {len(df)}")
+        log.info(
+            "%d baris header dihapus (index %s). Data tersisa: %d",
+            len(rows_to_drop),
+            rows_to_drop,
+            len(df),
+        )
 
     return df
 
 
-def clean_numeric_columns(df, numeric_cols):
-    """Bersihkan kolom numerik dengan logging detail"""
+def clean_numeric_columns(df, numeric_cols, medians=None):
+    """
+    Bersihkan kolom numerik (detail sebelum/sesudah hanya di level DEBUG).
+    `medians` opsional {kolom: median}: kolom yang ada di dict diisi dengan
+    nilai itu, kolom lain dihitung dari df lalu dicatat ke dict.
+    """
+    debug = is_debug(log)
     for col in numeric_cols:
         if col not in df.columns:
-            print(f"⚠️ Kolom '{col}' tidak ditemukan, skip")
+            log.debug("Kolom '%s' tidak ditemukan, skip", col)
             continue
 
-        print(f"\n🔧 Membersihkan kolom: {col}")
-        print(f"   Sebelum - Sample: {df[col].head(3).tolist()}")
-        print(f"   Sebelum - Type: {df[col].dtype}")
+        if debug:
+            log.debug(
+                "Membersihkan kolom %s - sebelum: sample=%s dtype=%s",
+                col,
+                df[col].head(3).tolist(),
+                df[col].dtype,
+            )
 
         if "HARGA" in col:
             df[col] = df[col].apply(parse_harga)
@@ -215,27 +276,37 @@ def clean_numeric_columns(df, numeric_cols):
             df[col] = df[col].apply(parse_number)
 
         valid_count = df[col].notna().sum()
-        print(f"   Nilai valid: {valid_count}/{len(df)}")
 
-        if valid_count > 0:
+        if medians is not None and col in medians:
+            median_val = medians[col]
+        elif valid_count > 0:
             median_val = df[col].median()
-            print(f"   Median: {median_val}")
-            df[col].fillna(median_val, inplace=True)
         else:
-            print(f"   ⚠️ Tidak ada nilai valid, isi dengan 0")
-            df[col].fillna(0, inplace=True)
-
-        print(f"   Sesudah - Sample: {df[col].head(3).tolist()}")
+            log.warning("Kolom '%s' tidak punya nilai valid, isi dengan 0", col)
+            median_val = 0
+        df[col] = df[col].fillna(median_val)
+        if medians is not None:
+            medians[col] = median_val
+
+        if debug:
+            log.debug(
+                "Membersihkan kolom %s - valid=%d/%d median=%s sesudah: sample=%s",
+                col,
+                valid_count,
+                len(df),
+                median_val,
+                df[col].head(3).tolist(),
+            )
 
     return df
 
 
-def summarize_cluster(df, group_col, numeric_cols, categorical_cols, nama_col):
-    """Ringkasan tiap cluster"""
+def summarize_cluster(df, group_col, numeric_cols, categorical_cols):
+    """Ringkasan tiap cluster (hanya agregat; anggota lewat /clusters/.../members)"""
     summary_rows = []
 
     if group_col not in df.columns:
-        print(f"⚠️ Kolom group '{group_col}' tidak ditemukan")
+        log.warning("Kolom group '%s' tidak ditemukan", group_col)
         return pd.DataFrame()
 
     grouped = df.groupby(group_col)
@@ -252,28 +323,44 @@ def summarize_cluster(df, group_col, numeric_cols, categorical_cols, nama_col):
             if col in group.columns:
                 summary[col] = get_mode_value(group[col])
 
-        if nama_col and nama_col in group.columns:
-            names = group[nama_col].dropna().astype(str).unique().tolist()
-            summary["daftar_petani"] = [
-                n.strip()
-                for n in names
-                if n.strip()
-                and n.strip().upper() != "NAMA"
-                and n.strip() != ""
-                and n.strip() != "-"
-                and not any(
-                    keyword in n.upper()
-                    for keyword in ["HASIL", "HARGA", "LAHAN", "METODE"]
-                )
-            ]
-        else:
-            summary["daftar_petani"] = []
-
         summary_rows.append(summary)
 
     return pd.DataFrame(summary_rows)
 
 
+async def load_data_raw(*column_groups):
+    """
+    DataFrame data_raw dari snapshot kolumnar (backend/snapshot.py), hanya
+    kolom yang dipakai analisis + kolom yang dibutuhkan remove_header_rows dan
+    get_nama_column.
+    """
+    available = await snapshot.columns()
+    wanted = [col for group in column_groups for col in group]
+    wanted += HEADER_KEY_COLUMNS
+    wanted += [col for col in available if "NAMA" in str(col).upper()]
+    return snapshot.decode_text(await snapshot.get_frame(wanted))
+
+
+# Kolom anggota cluster yang disimpan untuk /clusters/{type}/{cluster_id}/members
+MEMBER_COLUMNS = ["NO", "KELOMPOK TANI", "DESA"]
+MEMBER_SORT_FIELDS = ["NO", "NAMA", "KELOMPOK TANI", "DESA"]
+
+
+def store_cluster_members(cluster_type, df, nama_col):
+    """Simpan penugasan cluster per petani (grup cache "cluster", ikut di-invalidate)"""
+    members = pd.DataFrame(
+        {
+            "NO": df.get("NO"),
+            "NAMA": df.get(nama_col) if nama_col else None,
+            "KELOMPOK TANI": df.get("KELOMPOK TANI"),
+            "DESA": df.get("DESA"),
+            "cluster": df["cluster"].astype(int),
+        }
+    )
+    members = members.astype(object).where(members.notna(), None)
+    cache.set(f"cluster:{cluster_type}:members", members, ttl=cache.DATA_TTL)
+
+
 def inspect_pipeline_features(pipeline):
     """Inspeksi fitur yang dibutuhkan pipeline"""
     try:
@@ -290,12 +377,15 @@ def inspect_pipeline_features(pipeline):
                 categorical_features = list(columns)
 
         all_features = numeric_features + categorical_features
-        print(f"📋 Fitur numerik: {numeric_features}")
-        print(f"📋 Fitur kategori: {categorical_features}")
+        log.debug(
+            "Fitur numerik: %s, fitur kategori: %s",
+            numeric_features,
+            categorical_features,
+        )
 
         return all_features, numeric_features, categorical_features
-    except Exception as e:
-        print(f"⚠️ Gagal inspeksi pipeline: {e}")
+    except Exception:
+        log.exception("Gagal inspeksi pipeline")
         return None, None, None
 
 
@@ -323,139 +413,194 @@ def get_cluster_label_profil_pasar(cluster_id):
 # ======================================================
 # 🟢 CLUSTER PRODUK BUDIDAYA (MENGGUNAKAN MODEL ML)
 # ======================================================
+# Kolom untuk summary (lebih lengkap)
+PRODUK_BUDIDAYA_NUMERIC = [
+    "HASIL PER TAHUN (kg)",
+    "TOTAL LAHAN (M2)",
+    "JUMLAH LAHAN",
+    "HARGA JUAL PER KG",
+    "POPULASI KOPI",
+    "LAMA BERTANI",
+]
+PRODUK_BUDIDAYA_CATEGORICAL = [
+    "METODE BUDIDAYA",
+    "PUPUK",
+    "METODE PANEN",
+    "SISTEM IRIGASI",
+    "SISTEM PENYIMPANAN",
+    "METODE PENGOLAHAN",
+]
+PRODUK_BUDIDAYA_FILL_KEY = "cluster:produk_budidaya:fill"
+
+
+def clean_produk_budidaya(df, features_ml, numeric_features_ml, fill):
+    """
+    Bersihkan input model produk budidaya; dipakai clustering dan explain
+    supaya vektor satu petani sama di keduanya. `fill` = {kolom: median/modus}:
+    saat clustering dict kosong diisi dari seluruh tabel, explain memakai
+    ulang dict tersimpan untuk satu baris.
+    """
+    df = clean_numeric_columns(df, PRODUK_BUDIDAYA_NUMERIC, fill)
+    for col in PRODUK_BUDIDAYA_CATEGORICAL:
+        if col not in df.columns:
+            df[col] = "N/A"
+        else:
+            if col not in fill:
+                fill[col] = get_mode_value(df[col])
+            df[col] = df[col].fillna(fill[col])
+
+    # Pastikan semua fitur model ada
+    for col in features_ml:
+        if col not in df.columns:
+            df[col] = 0.0 if col in numeric_features_ml else "N/A"
+    return df
+
+
 @router.get("/cluster-produk-budidaya")
 async def cluster_produk_budidaya():
     """Clustering Produk Budidaya dengan KMeans (4 clusters)"""
-    if not FULL_PIPELINE_PRODUK_BUDIDAYA:
-        raise HTTPException(status_code=503, detail="Model tidak tersedia.")
-
-    try:
-        query = "SELECT * FROM data_raw;"
-        rows = await database.fetch_all(query)
-        if not rows:
-            return {"message": "Tidak ada data.", "clusters": [], "total_petani": 0}
-
-        df = pd.DataFrame([dict(row) for row in rows])
-        print(f"\n📊 Total data awal: {len(df)}")
+    return await cache.get_or_set(
+        "cluster:produk_budidaya", _compute_cluster_produk_budidaya, ttl=cache.DATA_TTL
+    )
 
-        df = remove_header_rows(df)
-        if len(df) == 0:
-            return {
-                "message": "Tidak ada data valid.",
-                "clusters": [],
-                "total_petani": 0,
-            }
 
-        nama_col = get_nama_column(df)
+async def _compute_cluster_produk_budidaya():
+    pipeline_produk_budidaya = await ensure_model("produk_budidaya")
+    if not pipeline_produk_budidaya:
+        raise HTTPException(status_code=503, detail="Model tidak tersedia.")
 
+    try:
         # Inspeksi fitur model
         features_ml, numeric_features_ml, categorical_features_ml = (
-            inspect_pipeline_features(FULL_PIPELINE_PRODUK_BUDIDAYA)
+            inspect_pipeline_features(pipeline_produk_budidaya)
         )
         if not features_ml:
             raise HTTPException(
                 status_code=500, detail="Gagal mendapatkan fitur dari model"
             )
 
-        print(f"✅ Model butuh {len(features_ml)} fitur: {features_ml}")
+        numeric_cols_summary = PRODUK_BUDIDAYA_NUMERIC
+        categorical_cols_summary = PRODUK_BUDIDAYA_CATEGORICAL
 
-        # Kolom untuk summary (lebih lengkap)
-        numeric_cols_summary = [
-            "HASIL PER TAHUN (kg)",
-            "TOTAL LAHAN (M2)",
-            "JUMLAH LAHAN",
-            "HARGA JUAL PER KG",
-            "POPULASI KOPI",
-            "LAMA BERTANI",
-        ]
-        categorical_cols_summary = [
-            "METODE BUDIDAYA",
-            "PUPUK",
-            "METODE PANEN",
-            "SISTEM IRIGASI",
-            "SISTEM PENYIMPANAN",
-            "METODE PENGOLAHAN",
-        ]
+        with span("cluster_produk_budidaya.fetch"):
+            df = await load_data_raw(
+                MEMBER_COLUMNS,
+                features_ml,
+                numeric_cols_summary,
+                categorical_cols_summary,
+            )
+        if len(df) == 0:
+            return {"message": "Tidak ada data.", "clusters": [], "total_petani": 0}
+        log.debug("Total data awal: %d", len(df))
 
-        # Clean data
-        df = clean_numeric_columns(df, numeric_cols_summary)
-        for col in categorical_cols_summary:
-            if col not in df.columns:
-                df[col] = "N/A"
-            else:
-                df[col].fillna(get_mode_value(df[col]), inplace=True)
+        df = remove_header_rows(df)
+        if len(df) == 0:
+            return {
+                "message": "Tidak ada data valid.",
+                "clusters": [],
+                "total_petani": 0,
+            }
 
-        # Pastikan semua fitur model ada
-        for col in features_ml:
-            if col not in df.columns:
-                df[col] = 0.0 if col in numeric_features_ml else "N/A"
+        # Bagian CPU (pandas/sklearn) di thread supaya event loop tetap bebas
+        return await asyncio.to_thread(
+            _cluster_produk_budidaya_result,
+            pipeline_produk_budidaya,
+            df,
+            features_ml,
+            numeric_features_ml,
+            numeric_cols_summary,
+            categorical_cols_summary,
+        )
 
-        # Prepare features untuk model
-        X_features = df[features_ml].copy()
-        print(f"\n📊 Data untuk model: {X_features.shape}")
+    except Exception as e:
+        log.exception("Error clustering")
+        raise HTTPException(status_code=500, detail=f"Error clustering: {str(e)}")
 
-        # PREDIKSI dengan model (KMeans punya .predict())
-        print("\n🤖 Prediksi dengan KMeans model...")
-        cluster_labels = FULL_PIPELINE_PRODUK_BUDIDAYA.predict(X_features)
-        df["cluster"] = cluster_labels
 
-        print(f"🎯 Hasil: {sorted(df['cluster'].unique())} clusters")
-        print(f"📊 Distribusi: {df['cluster'].value_counts().sort_index().to_dict()}")
+def _cluster_produk_budidaya_result(
+    pipeline_produk_budidaya,
+    df,
+    features_ml,
+    numeric_features_ml,
+    numeric_cols_summary,
+    categorical_cols_summary,
+):
+    nama_col = get_nama_column(df)
+
+    # Clean data (median/modus dicatat untuk endpoint explain)
+    fill = {}
+    with span("cluster_produk_budidaya.clean"):
+        df = clean_produk_budidaya(df, features_ml, numeric_features_ml, fill)
+
+    # Prepare features untuk model
+    X_features = df[features_ml].copy()
+
+    # PREDIKSI dengan model (KMeans punya .predict())
+    with span("cluster_produk_budidaya.predict"):
+        cluster_labels = pipeline_produk_budidaya.predict(X_features)
+    record_inference("produk_budidaya_kmeans", len(X_features))
+    df["cluster"] = cluster_labels
+    store_cluster_members("produk_budidaya", df, nama_col)
+    cache.set(PRODUK_BUDIDAYA_FILL_KEY, fill, ttl=cache.DATA_TTL)
+
+    if is_debug(log):
+        log.debug(
+            "Prediksi KMeans untuk %s data, distribusi: %s",
+            X_features.shape,
+            df["cluster"].value_counts().sort_index().to_dict(),
+        )
 
-        # Karakteristik cluster
+    # Karakteristik cluster
+    with span("cluster_produk_budidaya.summarize"):
         cluster_characteristics = summarize_cluster(
-            df, "cluster", numeric_cols_summary, categorical_cols_summary, nama_col
+            df, "cluster", numeric_cols_summary, categorical_cols_summary
         )
 
-        # Format output
-        clusters_data = []
-        petani_count = df["cluster"].value_counts().to_dict()
-
-        for _, char_row in cluster_characteristics.iterrows():
-            cid = int(char_row["cluster"])
-            char_dict = char_row.to_dict()
-
-            clusters_data.append(
-                {
-                    "cluster_id": cid,
-                    "label": get_cluster_label_produk_budidaya(cid),
-                    "petani_count": petani_count.get(cid, 0),
-                    "persentase": round((petani_count.get(cid, 0) / len(df)) * 100, 1),
-                    "karakteristik": {
-                        "avg_produktivitas_kg": round(
-                            safe_float(char_dict.get("HASIL PER TAHUN (kg)", 0), 0), 2
-                        ),
-                        "avg_luas_lahan_m2": round(
-                            safe_float(char_dict.get("TOTAL LAHAN (M2)", 0), 0), 2
-                        ),
-                        "avg_lama_bertani_tahun": round(
-                            safe_float(char_dict.get("LAMA BERTANI", 0), 0), 1
-                        ),
-                        "avg_populasi_kopi": round(
-                            safe_float(char_dict.get("POPULASI KOPI", 0), 0), 0
-                        ),
-                        "metode_budidaya": char_dict.get("METODE BUDIDAYA", "N/A"),
-                        "pupuk": char_dict.get("PUPUK", "N/A"),
-                        "metode_panen": char_dict.get("METODE PANEN", "N/A"),
-                        "sistem_irigasi": char_dict.get("SISTEM IRIGASI", "N/A"),
-                    },
-                    "petani_names": char_dict.get("daftar_petani", []),
-                }
-            )
-
-        # Sort by produktivitas (untuk tampilan, bukan untuk labeling)
-        clusters_data = sorted(
-            clusters_data,
-            key=lambda x: x["karakteristik"]["avg_produktivitas_kg"],
-            reverse=True,
+    # Format output
+    clusters_data = []
+    petani_count = df["cluster"].value_counts().to_dict()
+
+    for _, char_row in cluster_characteristics.iterrows():
+        cid = int(char_row["cluster"])
+        char_dict = char_row.to_dict()
+
+        clusters_data.append(
+            {
+                "cluster_id": cid,
+                "label": get_cluster_label_produk_budidaya(cid),
+                "petani_count": petani_count.get(cid, 0),
+                "persentase": round((petani_count.get(cid, 0) / len(df)) * 100, 1),
+                "karakteristik": {
+                    "avg_produktivitas_kg": round(
+                        safe_float(char_dict.get("HASIL PER TAHUN (kg)", 0), 0), 2
+                    ),
+                    "avg_luas_lahan_m2": round(
+                        safe_float(char_dict.get("TOTAL LAHAN (M2)", 0), 0), 2
+                    ),
+                    "avg_lama_bertani_tahun": round(
+                        safe_float(char_dict.get("LAMA BERTANI", 0), 0), 1
+                    ),
+                    "avg_populasi_kopi": round(
+                        safe_float(char_dict.get("POPULASI KOPI", 0), 0), 0
+                    ),
+                    "metode_budidaya": char_dict.get("METODE BUDIDAYA", "N/A"),
+                    "pupuk": char_dict.get("PUPUK", "N/A"),
+                    "metode_panen": char_dict.get("METODE PANEN", "N/A"),
+                    "sistem_irigasi": char_dict.get("SISTEM IRIGASI", "N/A"),
+                },
+            }
         )
 
-        print(f"\n✅ Berhasil membuat {len(clusters_data)} cluster")
-        for cluster in clusters_data:
-            print(
-                f"   Cluster {cluster['cluster_id']}: {cluster['label']} - {cluster['petani_count']} petani"
-            )
+    # Sort by produktivitas (untuk tampilan, bukan untuk labeling)
+    clusters_data = sorted(
+        clusters_data,
+        key=lambda x: x["karakteristik"]["avg_produktivitas_kg"],
+        reverse=True,
+    )
 
+    log.debug("Berhasil membuat %d cluster", len(clusters_data))
+
+    with span("cluster_produk_budidaya.encode"):
         return JSONResponse(
             content=jsonable_encoder(
                 {
@@ -467,13 +612,6 @@ async def cluster_produk_budidaya():
             )
         )
 
-    except Exception as e:
-        print(f"❌ Error: {e}")
-        import traceback
-
-        traceback.print_exc()
-        raise HTTPException(status_code=500, detail=f"Error clustering: {str(e)}")
-
 
 # ======================================================
 # 🟣 CLUSTER PROFIL PASAR (MENGGUNAKAN LABELS ASLI MODEL)
@@ -481,21 +619,17 @@ async def cluster_produk_budidaya():
 @router.get("/cluster-profil-pasar")
 async def cluster_profil_pasar():
     """Clustering Profil Pasar dengan Agglomerative (3 clusters) - Menggunakan labels asli dari model"""
-    if not FULL_PIPELINE_PROFIL_PASAR:
-        raise HTTPException(status_code=503, detail="Model tidak tersedia.")
+    return await cache.get_or_set(
+        "cluster:profil_pasar", _compute_cluster_profil_pasar, ttl=cache.DATA_TTL
+    )
 
-    try:
-        query = "SELECT * FROM data_raw;"
-        rows = await database.fetch_all(query)
-        if not rows:
-            return {"message": "Tidak ada data.", "clusters": [], "total_petani": 0}
 
-        df = pd.DataFrame([dict(row) for row in rows])
-        print(f"\n📊 Total data awal: {len(df)}")
-
-        df = remove_header_rows(df)
-        nama_col = get_nama_column(df)
+async def _compute_cluster_profil_pasar():
+    pipeline_profil_pasar = await ensure_model("profil_pasar")
+    if not pipeline_profil_pasar:
+        raise HTTPException(status_code=503, detail="Model tidak tersedia.")
 
+    try:
         # Kolom untuk summary
         numeric_cols = ["HARGA JUAL PER KG"]
         categorical_cols = [
@@ -507,163 +641,628 @@ async def cluster_profil_pasar():
             "METODE PENGOLAHAN",
         ]
 
-        # Clean data
-        print("\n🔧 Cleaning data...")
+        with span("cluster_profil_pasar.fetch"):
+            df = await load_data_raw(MEMBER_COLUMNS, numeric_cols, categorical_cols)
+        if len(df) == 0:
+            return {"message": "Tidak ada data.", "clusters": [], "total_petani": 0}
+        log.debug("Total data awal: %d", len(df))
+
+        df = remove_header_rows(df)
+        # Bagian CPU (pandas/sklearn) di thread supaya event loop tetap bebas
+        return await asyncio.to_thread(
+            _cluster_profil_pasar_result,
+            pipeline_profil_pasar,
+            df,
+            numeric_cols,
+            categorical_cols,
+        )
+
+    except Exception as e:
+        log.exception("Error clustering")
+        raise HTTPException(status_code=500, detail=f"Error clustering: {str(e)}")
+
+
+def _cluster_profil_pasar_result(pipeline_profil_pasar, df, numeric_cols, categorical_cols):
+    nama_col = get_nama_column(df)
+
+    # Clean data
+    with span("cluster_profil_pasar.clean"):
         df = clean_numeric_columns(df, numeric_cols)
         for col in categorical_cols:
             if col not in df.columns:
                 df[col] = "N/A"
             else:
-                df[col].fillna(get_mode_value(df[col]), inplace=True)
+                df[col] = df[col].fillna(get_mode_value(df[col]))
 
-        # GUNAKAN LABELS ASLI DARI MODEL (AgglomerativeClustering tidak punya .predict())
-        print("\n🤖 Mengambil cluster labels dari model yang sudah di-fit...")
+    # GUNAKAN LABELS ASLI DARI MODEL (AgglomerativeClustering tidak punya .predict())
 
-        # Cek apakah model memiliki atribut labels_
-        # Coba beberapa kemungkinan nama step dalam pipeline
-        clusterer = None
-        for step_name in ["clusterer", "model", "agglomerative"]:
-            if step_name in FULL_PIPELINE_PROFIL_PASAR.named_steps:
-                clusterer = FULL_PIPELINE_PROFIL_PASAR.named_steps[step_name]
-                print(f"   ✅ Menemukan clusterer di step: '{step_name}'")
-                break
+    # Cek apakah model memiliki atribut labels_
+    # Coba beberapa kemungkinan nama step dalam pipeline
+    clusterer = None
+    for step_name in ["clusterer", "model", "agglomerative"]:
+        if step_name in pipeline_profil_pasar.named_steps:
+            clusterer = pipeline_profil_pasar.named_steps[step_name]
+            break
 
-        if clusterer is None:
-            raise HTTPException(
-                status_code=500,
-                detail="Tidak dapat menemukan komponen clusterer dalam pipeline",
-            )
+    if clusterer is None:
+        raise HTTPException(
+            status_code=500,
+            detail="Tidak dapat menemukan komponen clusterer dalam pipeline",
+        )
 
-        if not hasattr(clusterer, "labels_"):
-            raise HTTPException(
-                status_code=500,
-                detail="Model belum di-fit atau tidak memiliki atribut labels_",
-            )
+    if not hasattr(clusterer, "labels_"):
+        raise HTTPException(
+            status_code=500,
+            detail="Model belum di-fit atau tidak memiliki atribut labels_",
+        )
 
-        # Ambil labels dari model yang sudah di-fit
-        cluster_labels = clusterer.labels_
-        print(f"   📊 Total labels dari model: {len(cluster_labels)}")
-        print(f"   🎯 Unique clusters: {sorted(np.unique(cluster_labels))}")
+    # Ambil labels dari model yang sudah di-fit. labels_ dipasang berdasarkan
+    # posisi baris; snapshot urut NO (urutan import data training), bukan
+    # urutan heap SELECT * yang bisa bergeser setelah UPDATE.
+    cluster_labels = clusterer.labels_
+    record_inference("profil_pasar_agglomerative", len(df))
+
+    # VALIDASI: Pastikan jumlah data sama
+    if len(cluster_labels) != len(df):
+        # Kemungkinan data di database berbeda dengan data training,
+        # atau remove_header_rows menghapus baris yang berbeda
+        log.warning(
+            "Jumlah labels model (%d) != jumlah data runtime (%d), labels %s",
+            len(cluster_labels),
+            len(df),
+            "dipotong" if len(cluster_labels) > len(df) else "di-padding",
+        )
 
-        # VALIDASI: Pastikan jumlah data sama
-        if len(cluster_labels) != len(df):
-            print(
-                f"\n⚠️ WARNING: Jumlah labels ({len(cluster_labels)}) != jumlah data runtime ({len(df)})"
-            )
-            print("   Kemungkinan penyebab:")
-            print("   1. Data di database berbeda dengan data training")
-            print("   2. Ada data yang ditambah/dikurangi setelah model di-train")
-            print("   3. Fungsi remove_header_rows menghapus baris yang berbeda")
+        # Gunakan strategi: gunakan labels sesuai panjang data
+        if len(cluster_labels) > len(df):
+            cluster_labels = cluster_labels[: len(df)]
+        else:
+            last_cluster = cluster_labels[-1]
+            padding = np.full(len(df) - len(cluster_labels), last_cluster)
+            cluster_labels = np.concatenate([cluster_labels, padding])
+
+    # Assign cluster ke dataframe
+    df["cluster"] = cluster_labels
+    store_cluster_members("profil_pasar", df, nama_col)
+
+    unique_clusters = sorted(df["cluster"].unique())
+    if is_debug(log):
+        log.debug(
+            "Distribusi cluster profil pasar: %s",
+            df["cluster"].value_counts().sort_index().to_dict(),
+        )
 
-            # Gunakan strategi: gunakan labels sesuai panjang data
-            if len(cluster_labels) > len(df):
-                print(f"   📌 Menggunakan {len(df)} labels pertama dari model")
-                cluster_labels = cluster_labels[: len(df)]
-            else:
-                print(f"   📌 Padding labels dengan cluster terakhir untuk sisa data")
-                last_cluster = cluster_labels[-1]
-                padding = np.full(len(df) - len(cluster_labels), last_cluster)
-                cluster_labels = np.concatenate([cluster_labels, padding])
+    # VALIDASI: Periksa jumlah cluster
+    expected_clusters = 3
+    actual_clusters = len(unique_clusters)
+
+    if actual_clusters != expected_clusters:
+        log.warning(
+            "Diharapkan %d cluster, tapi dapat %d (model mungkin perlu di-retrain)",
+            expected_clusters,
+            actual_clusters,
+        )
+
+    # Karakteristik cluster
+    with span("cluster_profil_pasar.summarize"):
+        cluster_characteristics = summarize_cluster(
+            df, "cluster", numeric_cols, categorical_cols
+        )
+
+    # Format output
+    clusters_data = []
+    petani_count = df["cluster"].value_counts().to_dict()
+
+    for _, char_row in cluster_characteristics.iterrows():
+        cid = int(char_row["cluster"])
+        char_dict = char_row.to_dict()
+
+        clusters_data.append(
+            {
+                "cluster_id": cid,
+                "label": get_cluster_label_profil_pasar(cid),
+                "petani_count": petani_count.get(cid, 0),
+                "persentase": round((petani_count.get(cid, 0) / len(df)) * 100, 1),
+                "karakteristik": {
+                    "avg_harga_jual": round(
+                        safe_float(char_dict.get("HARGA JUAL PER KG", 0), 0), 2
+                    ),
+                    "lama_fermentasi": char_dict.get("LAMA FERMENTASI", "N/A"),
+                    "proses_pengeringan": char_dict.get(
+                        "PROSES PENGERINGAN", "N/A"
+                    ),
+                    "metode_penjualan": char_dict.get("METODE PENJUALAN", "N/A"),
+                    "bentuk_penyimpanan": char_dict.get(
+                        "BENTUK PENYIMPANAN", "N/A"
+                    ),
+                    "sistem_penyimpanan": char_dict.get(
+                        "SISTEM PENYIMPANAN", "N/A"
+                    ),
+                    "metode_pengolahan": char_dict.get("METODE PENGOLAHAN", "N/A"),
+                },
+            }
+        )
 
-        # Assign cluster ke dataframe
-        df["cluster"] = cluster_labels
+    # Sort by harga (untuk tampilan)
+    clusters_data = sorted(
+        clusters_data,
+        key=lambda x: x["karakteristik"]["avg_harga_jual"],
+        reverse=True,
+    )
+
+    log.debug("Berhasil membuat %d cluster", len(clusters_data))
+
+    # Tambahkan warning jika cluster kurang dari expected
+    response_data = {
+        "clustering_type": "Profil Pasar",
+        "model": "Agglomerative (n_clusters=3, linkage=complete)",
+        "total_petani": len(df),
+        "clusters": clusters_data,
+    }
 
-        unique_clusters = sorted(df["cluster"].unique())
-        print(f"\n🎯 Cluster yang terpakai: {unique_clusters}")
-        print(f"📊 Distribusi cluster:")
-        cluster_counts = df["cluster"].value_counts().sort_index()
-        for cluster_id, count in cluster_counts.items():
-            print(f"   Cluster {cluster_id}: {count} petani ({count/len(df)*100:.1f}%)")
+    if actual_clusters != expected_clusters:
+        response_data["warning"] = (
+            f"Model menghasilkan {actual_clusters} cluster, "
+            f"berbeda dari {expected_clusters} cluster yang diharapkan. "
+            f"Data runtime mungkin berbeda dari data training."
+        )
 
-        # VALIDASI: Periksa jumlah cluster
-        expected_clusters = 3
-        actual_clusters = len(unique_clusters)
+    with span("cluster_profil_pasar.encode"):
+        return JSONResponse(content=jsonable_encoder(response_data))
 
-        if actual_clusters != expected_clusters:
-            print(
-                f"\n⚠️ WARNING: Diharapkan {expected_clusters} cluster, tapi dapat {actual_clusters}!"
-            )
-            print("   Kemungkinan penyebab:")
-            print("   1. Data di database berbeda dengan data training")
-            print("   2. Beberapa cluster tidak memiliki anggota dalam data saat ini")
-            print("   3. Model perlu di-retrain dengan data terbaru")
 
-        # Karakteristik cluster
-        cluster_characteristics = summarize_cluster(
-            df, "cluster", numeric_cols, categorical_cols, nama_col
+# ======================================================
+# 👥 ANGGOTA CLUSTER (PAGINASI)
+# ======================================================
+CLUSTER_TYPES = {
+    "produk_budidaya": (
+        "cluster:produk_budidaya",
+        _compute_cluster_produk_budidaya,
+        get_cluster_label_produk_budidaya,
+    ),
+    "profil_pasar": (
+        "cluster:profil_pasar",
+        _compute_cluster_profil_pasar,
+        get_cluster_label_profil_pasar,
+    ),
+}
+MEMBERS_MAX_PAGE_SIZE = 200
+
+
+async def load_cluster_members(cluster_type):
+    """Penugasan cluster tersimpan; dihitung ulang (bersama ringkasannya) jika belum ada"""
+    key = f"cluster:{cluster_type}:members"
+    members = cache.get(key)
+    if members is None:
+        summary_key, compute, _ = CLUSTER_TYPES[cluster_type]
+        cache.set(summary_key, await compute(), ttl=cache.DATA_TTL)
+        members = cache.get(key)
+    return members
+
+
+@router.get("/clusters/{cluster_type}/{cluster_id}/members")
+async def cluster_members(
+    cluster_type: str,
+    cluster_id: int,
+    page: int = 1,
+    page_size: int = 50,
+    search: str = None,
+    sort: str = "NAMA",
+    order: str = "asc",
+):
+    """Anggota satu cluster: paginasi, cari nama, urut per kolom"""
+    cluster_type = cluster_type.replace("-", "_")
+    if cluster_type not in CLUSTER_TYPES:
+        raise HTTPException(status_code=404, detail="Tipe cluster tidak dikenal.")
+    if sort not in MEMBER_SORT_FIELDS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"sort harus salah satu dari: {', '.join(MEMBER_SORT_FIELDS)}",
         )
+    page = max(1, page)
+    page_size = max(1, min(page_size, MEMBERS_MAX_PAGE_SIZE))
+
+    members = await load_cluster_members(cluster_type)
+    if members is None:
+        return {"message": "Tidak ada data.", "total": 0, "members": []}
+    if cluster_id not in set(members["cluster"]):
+        raise HTTPException(status_code=404, detail="Cluster tidak ditemukan.")
+
+    selected = members[members["cluster"] == cluster_id]
+    if search:
+        names = selected["NAMA"].astype(str)
+        selected = selected[
+            selected["NAMA"].notna() & names.str.contains(search, case=False, regex=False)
+        ]
+    key = (lambda col: col.str.lower()) if sort != "NO" else None
+    selected = selected.sort_values(
+        sort, ascending=order != "desc", na_position="last", key=key, kind="stable"
+    )
+
+    start = (page - 1) * page_size
+    rows = selected.iloc[start : start + page_size].drop(columns="cluster")
+    return jsonable_encoder(
+        {
+            "cluster_type": cluster_type,
+            "cluster_id": cluster_id,
+            "label": CLUSTER_TYPES[cluster_type][2](cluster_id),
+            "total": len(selected),
+            "page": page,
+            "page_size": page_size,
+            "members": rows.to_dict("records"),
+        }
+    )
+
+
+# ======================================================
+# 🧭 PETANI SERUPA (k-NN DI RUANG FITUR PIPELINE)
+# ======================================================
+# Semua baris di-transform sekali dengan step `preprocessor` pipeline produk
+# budidaya lalu diindeks BallTree (backend/similarity.py). Snapshot memberi
+# tahu NO yang berubah; hanya baris itu yang di-transform ulang pada akses
+# berikutnya. Index disimpan per worker.
 
-        # Format output
-        clusters_data = []
-        petani_count = df["cluster"].value_counts().to_dict()
+SIMILAR_MAX_K = 50
 
-        for _, char_row in cluster_characteristics.iterrows():
-            cid = int(char_row["cluster"])
-            char_dict = char_row.to_dict()
+_feature_index = None
+_feature_dirty = set()
+_feature_reset = True
+_feature_lock = asyncio.Lock()
 
-            clusters_data.append(
+
+def _on_snapshot_change(petani_nos):
+    global _feature_reset
+    if petani_nos is None:
+        _feature_reset = True
+    else:
+        _feature_dirty.update(petani_nos)
+
+
+def _parse_column(series, parse):
+    """parse per nilai; kolom Categorical snapshot cukup di-parse per kategori"""
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        # NaN tambahan di akhir untuk kode -1 (NULL)
+        parsed = np.append(series.cat.categories.map(parse).to_numpy(dtype=float), np.nan)
+        return pd.Series(parsed[series.cat.codes.to_numpy()], index=series.index)
+    return series.apply(parse).astype(float)
+
+
+def prepare_features(df, numeric_features, categorical_features):
+    """
+    Fitur pipeline yang dibersihkan per baris (tanpa median/modus seluruh
+    tabel) supaya hasil transform baris yang berubah sama dengan build penuh.
+    Nilai kosong diisi imputer di dalam preprocessor.
+    """
+    X = pd.DataFrame(index=df.index)
+    for col in numeric_features:
+        parse = parse_harga if "HARGA" in col else parse_number
+        X[col] = _parse_column(df[col], parse) if col in df.columns else np.nan
+    for col in categorical_features:
+        if col in df.columns:
+            X[col] = df[col].astype(object).where(df[col].notna(), np.nan)
+        else:
+            X[col] = np.nan
+    return X
+
+
+def transform_features(pipeline, df):
+    """Matriks fitur (hasil preprocessor) untuk baris `df`"""
+    _, numeric_features, categorical_features = inspect_pipeline_features(pipeline)
+    X = prepare_features(df, numeric_features, categorical_features)
+    matrix = pipeline.named_steps["preprocessor"].transform(X)
+    if hasattr(matrix, "toarray"):
+        matrix = matrix.toarray()
+    return np.asarray(matrix, dtype=float)
+
+
+def _build_feature_index(pipeline, df):
+    return similarity.NeighborIndex(df["NO"].tolist(), transform_features(pipeline, df))
+
+
+async def get_feature_index():
+    """Index fitur produk budidaya per NO, diperbarui dari baris yang berubah"""
+    global _feature_index, _feature_reset
+    pipeline = await ensure_model("produk_budidaya")
+    if not pipeline:
+        raise HTTPException(status_code=503, detail="Model tidak tersedia.")
+    features, _, _ = inspect_pipeline_features(pipeline)
+    if not features:
+        raise HTTPException(status_code=500, detail="Gagal mendapatkan fitur dari model")
+    columns = ["NO"] + features + HEADER_KEY_COLUMNS
+
+    # Terapkan perubahan snapshot dulu supaya listener sudah mencatat NO-nya
+    await snapshot.columns()
+    async with _feature_lock:
+        if _feature_index is None or _feature_reset:
+            _feature_reset = False
+            _feature_dirty.clear()
+            with span("feature_index.build"):
+                df = remove_header_rows(await snapshot.get_frame(columns))
+                _feature_index = await asyncio.to_thread(
+                    _build_feature_index, pipeline, df
+                )
+            log.info("Index fitur petani dibangun: %d baris", len(_feature_index))
+        elif _feature_dirty:
+            changed = set(_feature_dirty)
+            _feature_dirty.difference_update(changed)
+            with span("feature_index.update"):
+                df = remove_header_rows(await snapshot.get_rows(changed, columns))
+                if len(df):
+                    matrix = await asyncio.to_thread(transform_features, pipeline, df)
+                    _feature_index.upsert(df["NO"].tolist(), matrix)
+                _feature_index.delete(changed.difference(df["NO"].tolist()))
+                if _feature_index.needs_compact():
+                    _feature_index = await asyncio.to_thread(_feature_index.compact)
+        return _feature_index
+
+
+@router.get("/similar/{petani_no}")
+async def similar_petani(petani_no: int, k: int = 5):
+    """k petani paling mirip (jarak Euclid di ruang fitur pipeline produk budidaya)"""
+    k = max(1, min(k, SIMILAR_MAX_K))
+    index = await get_feature_index()
+
+    vector = index.vector(petani_no)
+    if vector is None:
+        raise HTTPException(status_code=404, detail="Petani tidak ditemukan.")
+    with span("similar.query"):
+        neighbors = index.query(vector, k, exclude=petani_no)
+
+    info = await snapshot.get_rows(
+        [no for no, _ in neighbors], ["NO", "NAMA", "KELOMPOK TANI", "DESA"]
+    )
+    info = info.astype(object).where(info.notna(), None)
+    info = {row["NO"]: row for row in info.to_dict("records")}
+    similar = []
+    for no, distance in neighbors:
+        row = info.get(no, {})
+        similar.append(
+            {
+                "NO": no,
+                "NAMA": row.get("NAMA"),
+                "KELOMPOK TANI": row.get("KELOMPOK TANI"),
+                "DESA": row.get("DESA"),
+                "jarak": round(distance, 4),
+            }
+        )
+    return jsonable_encoder({"petani_no": petani_no, "k": k, "similar": similar})
+
+
+# ======================================================
+# 🧩 PENJELASAN CLUSTER PER PETANI
+# ======================================================
+def feature_groups(preprocessor):
+    """
+    [(fitur asli, "num"/"cat", slice kolom hasil transform, kategori)] sesuai
+    urutan output preprocessor (satu kolom per fitur numerik, satu kolom per
+    kategori one-hot).
+    """
+    groups = []
+    start = 0
+    for name, transformer, columns in preprocessor.transformers_:
+        if name == "num":
+            for col in columns:
+                groups.append((col, "num", slice(start, start + 1), None))
+                start += 1
+        elif name == "cat":
+            onehot = transformer.named_steps["onehot"]
+            for col, categories in zip(columns, onehot.categories_):
+                groups.append((col, "cat", slice(start, start + len(categories)), categories))
+                start += len(categories)
+    return groups
+
+
+def explain_vector(pipeline, vector, raw=None):
+    """
+    Jarak ke tiap centroid KMeans + kontribusi fitur (porsi jarak kuadrat)
+    terhadap centroid cluster sendiri. `raw` = nilai asli baris, dipakai untuk
+    kategori yang tidak dikenal encoder.
+    """
+    raw = raw or {}
+    preprocessor = pipeline.named_steps["preprocessor"]
+    centers = pipeline.named_steps["model"].cluster_centers_
+    distances = np.linalg.norm(centers - vector, axis=1)
+    cluster_id = int(np.argmin(distances))
+    center = centers[cluster_id]
+
+    squared = (vector - center) ** 2
+    total = float(squared.sum()) or 1.0
+    scaler = preprocessor.named_transformers_["num"].named_steps["scaler"]
+
+    kontribusi = []
+    num_index = 0
+    for col, kind, cols, categories in feature_groups(preprocessor):
+        item = {"fitur": col, "kontribusi": round(float(squared[cols].sum()) / total, 4)}
+        if kind == "num":
+            # Kembalikan ke satuan asli (MinMaxScaler: min + x * range)
+            low = scaler.data_min_[num_index]
+            value_range = scaler.data_range_[num_index]
+            item["nilai"] = round(float(low + vector[cols][0] * value_range), 2)
+            item["rata_cluster"] = round(float(low + center[cols][0] * value_range), 2)
+            item["selisih_skala"] = round(float(vector[cols][0] - center[cols][0]), 4)
+            num_index += 1
+        else:
+            chosen = vector[cols]
+            if chosen.max() > 0:
+                item["nilai"] = str(categories[int(np.argmax(chosen))])
+            else:
+                item["nilai"] = raw.get(col)
+            item["modus_cluster"] = str(categories[int(np.argmax(center[cols]))])
+            item["proporsi_cluster"] = {
+                str(category): round(float(weight), 3)
+                for category, weight in zip(categories, center[cols])
+            }
+        kontribusi.append(item)
+
+    kontribusi.sort(key=lambda item: item["kontribusi"], reverse=True)
+    return {
+        "cluster_id": cluster_id,
+        "label": get_cluster_label_produk_budidaya(cluster_id),
+        "jarak_centroid": sorted(
+            (
                 {
                     "cluster_id": cid,
-                    "label": get_cluster_label_profil_pasar(cid),
-                    "petani_count": petani_count.get(cid, 0),
-                    "persentase": round((petani_count.get(cid, 0) / len(df)) * 100, 1),
-                    "karakteristik": {
-                        "avg_harga_jual": round(
-                            safe_float(char_dict.get("HARGA JUAL PER KG", 0), 0), 2
-                        ),
-                        "lama_fermentasi": char_dict.get("LAMA FERMENTASI", "N/A"),
-                        "proses_pengeringan": char_dict.get(
-                            "PROSES PENGERINGAN", "N/A"
-                        ),
-                        "metode_penjualan": char_dict.get("METODE PENJUALAN", "N/A"),
-                        "bentuk_penyimpanan": char_dict.get(
-                            "BENTUK PENYIMPANAN", "N/A"
-                        ),
-                        "sistem_penyimpanan": char_dict.get(
-                            "SISTEM PENYIMPANAN", "N/A"
-                        ),
-                        "metode_pengolahan": char_dict.get("METODE PENGOLAHAN", "N/A"),
-                    },
-                    "petani_names": char_dict.get("daftar_petani", []),
+                    "label": get_cluster_label_produk_budidaya(cid),
+                    "jarak": round(float(distance), 4),
                 }
-            )
+                for cid, distance in enumerate(distances)
+            ),
+            key=lambda item: item["jarak"],
+        ),
+        "kontribusi": kontribusi,
+    }
 
-        # Sort by harga (untuk tampilan)
-        clusters_data = sorted(
-            clusters_data,
-            key=lambda x: x["karakteristik"]["avg_harga_jual"],
-            reverse=True,
-        )
 
-        print(f"\n✅ Berhasil membuat {len(clusters_data)} cluster")
-        for cluster in clusters_data:
-            print(
-                f"   Cluster {cluster['cluster_id']}: {cluster['label']} - {cluster['petani_count']} petani"
-            )
+@router.get("/cluster-produk-budidaya/explain/{petani_no}")
+async def explain_cluster_produk_budidaya(petani_no: int):
+    """
+    Kenapa petani masuk cluster tertentu: jarak centroid + kontribusi fitur.
+    Vektor dibersihkan persis seperti /cluster-produk-budidaya (median/modus
+    yang sama), lalu dibandingkan dengan penugasan cluster tersimpan.
+    """
+    pipeline = await ensure_model("produk_budidaya")
+    if not pipeline:
+        raise HTTPException(status_code=503, detail="Model tidak tersedia.")
+    features, numeric_features, _ = inspect_pipeline_features(pipeline)
+
+    members = await load_cluster_members("produk_budidaya")
+    fill = cache.get(PRODUK_BUDIDAYA_FILL_KEY)
+    if members is None or fill is None:
+        raise HTTPException(status_code=503, detail="Hasil clustering belum tersedia.")
+
+    columns = ["NAMA"] + features + PRODUK_BUDIDAYA_NUMERIC + PRODUK_BUDIDAYA_CATEGORICAL
+    info = snapshot.decode_text(await snapshot.get_rows([petani_no], columns))
+    if len(info) == 0:
+        raise HTTPException(status_code=404, detail="Petani tidak ditemukan.")
+    raw = info.astype(object).where(info.notna(), None).to_dict("records")[0]
+
+    with span("cluster_explain.compute"):
+        X = clean_produk_budidaya(info, features, numeric_features, dict(fill))[features]
+        vector = np.asarray(
+            pipeline.named_steps["preprocessor"].transform(X), dtype=float
+        )[0]
+        result = explain_vector(pipeline, vector, raw)
+
+    stored = members.loc[members["NO"] == petani_no, "cluster"]
+    stored_id = int(stored.iloc[0]) if len(stored) else None
+    return jsonable_encoder(
+        {
+            "petani_no": petani_no,
+            "NAMA": raw.get("NAMA"),
+            **result,
+            "cluster_tersimpan": stored_id,
+            "sesuai_cluster_tersimpan": stored_id == result["cluster_id"],
+        }
+    )
+
+
+snapshot.add_listener(_on_snapshot_change)
+
+
+# ======================================================
+# 📉 DRIFT FITUR MODEL (lihat backend/drift.py)
+# ======================================================
+DRIFT_MODELS = ("produk_budidaya", "profil_pasar")
+
+_drift_monitors = {}
+_drift_dirty = {key: set() for key in DRIFT_MODELS}
+_drift_reset = set(DRIFT_MODELS)
+_drift_lock = asyncio.Lock()
+
+
+def _on_snapshot_change_drift(petani_nos):
+    for key in DRIFT_MODELS:
+        if petani_nos is None:
+            _drift_reset.add(key)
+        else:
+            _drift_dirty[key].update(petani_nos)
+
+
+def _drift_rows(monitor, df):
+    X = prepare_features(df, monitor.numeric, monitor.categorical)
+    return (
+        df["NO"].tolist(),
+        X[monitor.numeric].to_numpy(dtype=float).tolist(),
+        X[monitor.categorical].to_numpy(dtype=object).tolist(),
+    )
+
+
+def _build_drift_monitor(pipeline, df):
+    monitor = drift.DriftMonitor(drift.reference_from_pipeline(pipeline))
+    monitor.upsert(*_drift_rows(monitor, df))
+    return monitor
 
-        # Tambahkan warning jika cluster kurang dari expected
-        response_data = {
-            "clustering_type": "Profil Pasar",
-            "model": "Agglomerative (n_clusters=3, linkage=complete)",
-            "total_petani": len(df),
-            "clusters": clusters_data,
+
+async def get_drift_monitor(key):
+    """Monitor drift fitur model `key`, diperbarui dari baris yang berubah"""
+    pipeline = await ensure_model(key)
+    if not pipeline:
+        return None
+    features, _, _ = inspect_pipeline_features(pipeline)
+    columns = ["NO"] + features + HEADER_KEY_COLUMNS
+
+    # Terapkan perubahan snapshot dulu supaya listener sudah mencatat NO-nya
+    await snapshot.columns()
+    async with _drift_lock:
+        monitor = _drift_monitors.get(key)
+        if monitor is None or key in _drift_reset:
+            _drift_reset.discard(key)
+            _drift_dirty[key].clear()
+            with span("drift.build"):
+                df = remove_header_rows(await snapshot.get_frame(columns))
+                monitor = await asyncio.to_thread(_build_drift_monitor, pipeline, df)
+            _drift_monitors[key] = monitor
+        elif _drift_dirty[key]:
+            changed = set(_drift_dirty[key])
+            _drift_dirty[key].difference_update(changed)
+            with span("drift.update"):
+                df = remove_header_rows(await snapshot.get_rows(changed, columns))
+                monitor.delete(changed.difference(df["NO"].tolist()))
+                monitor.upsert(*_drift_rows(monitor, df))
+        return monitor
+
+
+async def drift_report():
+    """Skor drift per model (error per model tidak menggagalkan laporan)"""
+    report = {}
+    for key in DRIFT_MODELS:
+        try:
+            monitor = await get_drift_monitor(key)
+            report[key] = monitor.report() if monitor is not None else None
+        except Exception as e:
+            log.exception("Gagal menghitung drift %s", key)
+            report[key] = {"error": str(e)}
+    return report
+
+
+def drift_summary():
+    """
+    Ringkasan drift untuk /health dari monitor yang sudah dibangun saja
+    (tidak memuat model atau membaca snapshot). None = belum pernah dihitung.
+    """
+    summary = {}
+    for key in DRIFT_MODELS:
+        monitor = _drift_monitors.get(key)
+        if monitor is None:
+            summary[key] = None
+            continue
+        report = monitor.report()
+        summary[key] = {
+            "rows": report["rows"],
+            "max_psi": report.get("max_psi"),
+            "stale": report["stale"],
+            "perlu_update": key in _drift_reset or bool(_drift_dirty[key]),
         }
+    return summary
 
-        if actual_clusters != expected_clusters:
-            response_data["warning"] = (
-                f"Model menghasilkan {actual_clusters} cluster, "
-                f"berbeda dari {expected_clusters} cluster yang diharapkan. "
-                f"Data runtime mungkin berbeda dari data training."
-            )
 
-        return JSONResponse(content=jsonable_encoder(response_data))
+@router.get("/drift")
+async def get_drift():
+    """Laporan drift fitur lengkap per model (membangun monitor jika belum ada)"""
+    return jsonable_encoder(await drift_report())
 
-    except Exception as e:
-        print(f"❌ Error: {e}")
-        import traceback
 
-        traceback.print_exc()
-        raise HTTPException(status_code=500, detail=f"Error clustering: {str(e)}")
+snapshot.add_listener(_on_snapshot_change_drift)
 
 
 # ======================================================
@@ -673,15 +1272,16 @@ async def cluster_profil_pasar():
 async def check_model_labels():
     """Endpoint debugging: Periksa cluster labels dari model asli"""
     try:
-        if not FULL_PIPELINE_PROFIL_PASAR:
+        pipeline_profil_pasar = await ensure_model("profil_pasar")
+        if not pipeline_profil_pasar:
             return {"error": "Pipeline profil pasar tidak tersedia"}
 
         # Ambil clusterer dari pipeline
         clusterer = None
         step_name_found = None
         for step_name in ["clusterer", "model", "agglomerative"]:
-            if step_name in FULL_PIPELINE_PROFIL_PASAR.named_steps:
-                clusterer = FULL_PIPELINE_PROFIL_PASAR.named_steps[step_name]
+            if step_name in pipeline_profil_pasar.named_steps:
+                clusterer = pipeline_profil_pasar.named_steps[step_name]
                 step_name_found = step_name
                 break
 
@@ -718,10 +1318,17 @@ async def check_model_labels():
 async def debug_profil_pasar_analysis():
     """Endpoint untuk debugging: analisis distribusi data profil pasar"""
     try:
-        query = "SELECT * FROM data_raw;"
-        rows = await database.fetch_all(query)
+        pipeline_profil_pasar = await ensure_model("profil_pasar")
+        categorical_cols = [
+            "LAMA FERMENTASI",
+            "PROSES PENGERINGAN",
+            "METODE PENJUALAN",
+            "BENTUK PENYIMPANAN",
+            "SISTEM PENYIMPANAN",
+            "METODE PENGOLAHAN",
+        ]
 
-        df = pd.DataFrame([dict(row) for row in rows])
+        df = await load_data_raw(["HARGA JUAL PER KG"], categorical_cols)
         original_len = len(df)
 
         df = remove_header_rows(df)
@@ -729,7 +1336,7 @@ async def debug_profil_pasar_analysis():
 
         # Clean data
         df["HARGA JUAL PER KG"] = df["HARGA JUAL PER KG"].apply(parse_harga)
-        df["HARGA JUAL PER KG"].fillna(df["HARGA JUAL PER KG"].median(), inplace=True)
+        df["HARGA JUAL PER KG"] = df["HARGA JUAL PER KG"].fillna(df["HARGA JUAL PER KG"].median())
 
         # Analisis distribusi harga
         harga_stats = {
@@ -744,15 +1351,6 @@ async def debug_profil_pasar_analysis():
 
         # Analisis fitur kategorikal
         categorical_analysis = {}
-        categorical_cols = [
-            "LAMA FERMENTASI",
-            "PROSES PENGERINGAN",
-            "METODE PENJUALAN",
-            "BENTUK PENYIMPANAN",
-            "SISTEM PENYIMPANAN",
-            "METODE PENGOLAHAN",
-        ]
-
         for col in categorical_cols:
             if col in df.columns:
                 value_counts = df[col].value_counts().to_dict()
@@ -765,8 +1363,8 @@ async def debug_profil_pasar_analysis():
         # Ambil labels dari model
         clusterer = None
         for step_name in ["clusterer", "model", "agglomerative"]:
-            if step_name in FULL_PIPELINE_PROFIL_PASAR.named_steps:
-                clusterer = FULL_PIPELINE_PROFIL_PASAR.named_steps[step_name]
+            if step_name in pipeline_profil_pasar.named_steps:
+                clusterer = pipeline_profil_pasar.named_steps[step_name]
                 break
 
         if clusterer and hasattr(clusterer, "labels_"):
@@ -872,7 +1470,8 @@ async def get_clustering_summary():
 @router.post("/recommendation")
 async def get_recommendation(request: RecommendationRequest):
     """Memberikan rekomendasi berbasis AI menggunakan Gemini"""
-    if not GEMINI_MODEL:
+    gemini_model = await ensure_model("gemini")
+    if not gemini_model:
         raise HTTPException(
             status_code=503, detail="Model rekomendasi (Gemini) tidak tersedia."
         )
@@ -920,15 +1519,17 @@ PENTING:
 - Gunakan bahasa Indonesia yang mudah dipahami"""
 
     try:
-        response = GEMINI_MODEL.generate_content(
-            prompt,
-            generation_config=genai.types.GenerationConfig(
-                temperature=0.3,
-                top_p=0.8,
-                top_k=40,
-                max_output_tokens=2048,
-            ),
-        )
+        record_inference("gemini", 1)
+        with span("recommendation.gemini"):
+            response = gemini_model.generate_content(
+                prompt,
+                generation_config=genai.types.GenerationConfig(
+                    temperature=0.3,
+                    top_p=0.8,
+                    top_k=40,
+                    max_output_tokens=2048,
+                ),
+            )
 
         cleaned_text = response.text.strip()
         cleaned_text = re.sub(r"^```json\s*", "", cleaned_text)
@@ -953,8 +1554,8 @@ PENTING:
             return {"recommendation": json.dumps(json_response, ensure_ascii=False)}
 
         except json.JSONDecodeError as e:
-            print(f"JSON Decode Error: {e}")
-            print(f"Raw response: {cleaned_text}")
+            log.warning("JSON Decode Error: %s", e)
+            log.debug("Raw response: %s", cleaned_text)
 
             fallback = {
                 "masalah_utama": request.masalah,
@@ -977,7 +1578,7 @@ PENTING:
             return {"recommendation": json.dumps(fallback, ensure_ascii=False)}
 
     except Exception as e:
-        print(f"Gemini API Error: {e}")
+        log.exception("Gemini API Error")
         raise HTTPException(
             status_code=500, detail=f"Error saat menghubungi Gemini API: {e}"
         )
@@ -989,20 +1590,31 @@ PENTING:
 @router.get("/wordcloud-data")
 async def get_wordcloud_data():
     """Word cloud dari kolom masalah petani + laporan masalah yang VALID."""
+    return await cache.get_or_set(
+        "wordcloud:masalah", _compute_wordcloud_masalah, ttl=cache.DATA_TTL
+    )
 
-    query1 = 'SELECT "MASALAH" as text FROM data_raw WHERE "MASALAH" IS NOT NULL AND "MASALAH" <> \'\';'
-    rows1 = await database.fetch_all(query1)
 
-    query2 = "SELECT masalah as text FROM laporan_masalah WHERE masalah IS NOT NULL AND status = 'valid';"
-    rows2 = await database.fetch_all(query2)
+def count_words(text_counts, stopwords):
+    """Hitung kata dari {teks: jumlah baris}; tiap teks unik ditokenisasi sekali"""
+    word_counts = Counter()
+    for text, count in text_counts.items():
+        for word in re.findall(r"\b[a-zA-Z]{3,}\b", text.lower()):
+            if word not in stopwords:
+                word_counts[word] += count
+    return word_counts
 
-    all_rows = list(rows1) + list(rows2)
 
-    if not all_rows:
-        return []
+async def _compute_wordcloud_masalah():
+    # Teks MASALAH dari snapshot sudah terkelompok (Categorical)
+    text_counts = Counter(await snapshot.text_value_counts("MASALAH"))
 
-    all_text = " ".join([row["text"] for row in all_rows])
-    words = re.findall(r"\b[a-zA-Z]{3,}\b", all_text.lower())
+    query = "SELECT masalah as text FROM laporan_masalah WHERE masalah IS NOT NULL AND status = 'valid';"
+    rows = await read_database().fetch_all(query)
+    text_counts.update(row["text"] for row in rows)
+
+    if not text_counts:
+        return []
 
     stopwords = {
         "dan",
@@ -1037,8 +1649,7 @@ async def get_wordcloud_data():
         "lagi",
     }
 
-    filtered_words = [word for word in words if word not in stopwords]
-    word_counts = Counter(filtered_words)
+    word_counts = count_words(text_counts, stopwords)
 
     return [
         {"text": word, "value": count} for word, count in word_counts.most_common(50)
@@ -1048,19 +1659,16 @@ async def get_wordcloud_data():
 @router.get("/wordcloud-pelatihan")
 async def get_wordcloud_pelatihan():
     """Word cloud dari kolom pelatihan yang diperlukan."""
-    query = """
-        SELECT "PELATIHAN YANG DIPERLUKAN" as text
-        FROM data_raw
-        WHERE "PELATIHAN YANG DIPERLUKAN" IS NOT NULL
-          AND "PELATIHAN YANG DIPERLUKAN" <> '';
-    """
-    rows = await database.fetch_all(query)
+    return await cache.get_or_set(
+        "wordcloud:pelatihan", _compute_wordcloud_pelatihan, ttl=cache.DATA_TTL
+    )
 
-    if not rows:
-        return []
 
-    all_text = " ".join([row["text"] for row in rows])
-    words = re.findall(r"\b[a-zA-Z]{3,}\b", all_text.lower())
+async def _compute_wordcloud_pelatihan():
+    text_counts = await snapshot.text_value_counts("PELATIHAN YANG DIPERLUKAN")
+
+    if not text_counts:
+        return []
 
     stopwords = {
         "dan",
@@ -1088,8 +1696,7 @@ async def get_wordcloud_pelatihan():
         "kepada",
     }
 
-    filtered_words = [word for word in words if word not in stopwords]
-    word_counts = Counter(filtered_words)
+    word_counts = count_words(text_counts, stopwords)
 
     return [
         {"text": word, "value": count} for word, count in word_counts.most_common(50)
@@ -1099,6 +1706,20 @@ async def get_wordcloud_pelatihan():
 # ======================================================
 # 📝 LAPORAN MASALAH
 # ======================================================
+LAPORAN_CHANNEL = "laporan_masalah"
+LAPORAN_NOTIFY_MAX_IDS = 200  # sisanya cukup diwakili "count" (batas NOTIFY 8000 byte)
+
+
+def _on_laporan_event(event):
+    """Dipanggil di setiap worker saat ada NOTIFY laporan masalah"""
+    if event.get("event") == "validated":
+        note_data_change()
+        cache.invalidate("wordcloud:masalah")
+
+
+realtime.add_handler(LAPORAN_CHANNEL, _on_laporan_event)
+
+
 @router.post("/laporan-masalah")
 async def create_laporan_masalah(request: LaporanMasalahRequest):
     """Membuat laporan masalah baru dari petani"""
@@ -1111,14 +1732,28 @@ async def create_laporan_masalah(request: LaporanMasalahRequest):
         detail_json = (
             json.dumps(request.detail_petani) if request.detail_petani else "{}"
         )
-        result = await database.fetch_one(
-            query=query,
-            values={
-                "nama_petani": request.nama_petani,
-                "masalah": request.masalah,
-                "detail_petani": detail_json,
-            },
-        )
+        mark_write()
+        async with database.transaction():
+            result = await database.fetch_one(
+                query=query,
+                values={
+                    "nama_petani": request.nama_petani,
+                    "masalah": request.masalah,
+                    "detail_petani": detail_json,
+                },
+            )
+            await realtime.notify(
+                LAPORAN_CHANNEL,
+                {
+                    "event": "created",
+                    "id": result["id"],
+                    "nama_petani": request.nama_petani,
+                    # Payload NOTIFY dibatasi 8000 byte, kirim potongan saja
+                    "masalah": request.masalah[:200],
+                    "status": result["status"],
+                    "created_at": result["created_at"],
+                },
+            )
 
         return {
             "success": True,
@@ -1144,7 +1779,7 @@ async def get_laporan_masalah(limit: int = 50, status: str = None):
         ORDER BY created_at DESC
         LIMIT :limit;
         """
-        rows = await database.fetch_all(
+        rows = await read_database().fetch_all(
             query=query, values={"status": status, "limit": limit}
         )
     else:
@@ -1154,7 +1789,7 @@ async def get_laporan_masalah(limit: int = 50, status: str = None):
         ORDER BY created_at DESC
         LIMIT :limit;
         """
-        rows = await database.fetch_all(query=query, values={"limit": limit})
+        rows = await read_database().fetch_all(query=query, values={"limit": limit})
 
     return [dict(row) for row in rows]
 
@@ -1168,10 +1803,21 @@ async def get_pending_laporan():
     WHERE status = 'pending'
     ORDER BY created_at ASC;
     """
-    rows = await database.fetch_all(query)
+    rows = await read_database().fetch_all(query)
     return [dict(row) for row in rows]
 
 
+@router.websocket("/laporan-masalah/ws")
+async def laporan_masalah_ws(websocket: WebSocket, token: str = ""):
+    """Push laporan baru & hasil validasi ke admin (token JWT via query ?token=)."""
+    if auth.get_username_from_token(token) is None:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+
+    await websocket.accept()
+    await realtime.stream_to_websocket(websocket, LAPORAN_CHANNEL)
+
+
 @router.post("/laporan-masalah/validate")
 async def validate_laporan(request: ValidateLaporanRequest):
     """Endpoint untuk validasi laporan (sistem internal/admin)."""
@@ -1190,18 +1836,32 @@ async def validate_laporan(request: ValidateLaporanRequest):
         RETURNING id, status, validated_by, validated_at;
         """
 
-        result = await database.fetch_one(
-            query=query,
-            values={
-                "status": request.status,
-                "validator_name": request.validator_name,
-                "laporan_id": request.laporan_id,
-            },
-        )
+        mark_write()
+        async with database.transaction():
+            result = await database.fetch_one(
+                query=query,
+                values={
+                    "status": request.status,
+                    "validator_name": request.validator_name,
+                    "laporan_id": request.laporan_id,
+                },
+            )
+            if result:
+                await realtime.notify(
+                    LAPORAN_CHANNEL,
+                    {
+                        "event": "validated",
+                        "ids": [result["id"]],
+                        "status": result["status"],
+                        "validated_by": result["validated_by"],
+                    },
+                )
 
         if not result:
             raise HTTPException(status_code=404, detail="Laporan tidak ditemukan")
 
+        cache.invalidate("wordcloud:masalah")
+
         return {
             "success": True,
             "message": f"Laporan berhasil divalidasi sebagai '{request.status}'",
@@ -1213,21 +1873,100 @@ async def validate_laporan(request: ValidateLaporanRequest):
         )
 
 
+@router.post("/laporan-masalah/validate-bulk")
+async def validate_laporan_bulk(request: BulkValidateLaporanRequest):
+    """Validasi banyak laporan sekaligus dalam satu UPDATE dan satu transaksi."""
+    if request.status not in ["valid", "invalid"]:
+        raise HTTPException(
+            status_code=400, detail="Status harus 'valid' atau 'invalid'"
+        )
+
+    # Hilangkan ID duplikat tapi pertahankan urutan dari request
+    laporan_ids = list(dict.fromkeys(request.laporan_ids))
+
+    try:
+        query = """
+        UPDATE laporan_masalah
+        SET status = :status,
+            validated_by = :validator_name,
+            validated_at = NOW()
+        WHERE id = ANY(:laporan_ids)
+        RETURNING id, status, validated_by, validated_at;
+        """
+
+        mark_write()
+        async with database.transaction():
+            rows = await database.fetch_all(
+                query=query,
+                values={
+                    "status": request.status,
+                    "validator_name": request.validator_name,
+                    "laporan_ids": laporan_ids,
+                },
+            )
+            if rows:
+                ids = [row["id"] for row in rows]
+                await realtime.notify(
+                    LAPORAN_CHANNEL,
+                    {
+                        "event": "validated",
+                        "count": len(ids),
+                        "ids": ids[:LAPORAN_NOTIFY_MAX_IDS],
+                        "truncated": len(ids) > LAPORAN_NOTIFY_MAX_IDS,
+                        "status": request.status,
+                        "validated_by": request.validator_name[:100],
+                    },
+                )
+    except Exception as e:
+        raise HTTPException(
+            status_code=500, detail=f"Gagal memvalidasi laporan: {str(e)}"
+        )
+
+    updated = {row["id"]: dict(row) for row in rows}
+    if updated:
+        # Satu invalidasi untuk seluruh batch
+        cache.invalidate("wordcloud:masalah")
+
+    results = [
+        (
+            {"id": laporan_id, "success": True, "data": updated[laporan_id]}
+            if laporan_id in updated
+            else {
+                "id": laporan_id,
+                "success": False,
+                "error": "Laporan tidak ditemukan",
+            }
+        )
+        for laporan_id in laporan_ids
+    ]
+
+    return {
+        "success": len(updated) == len(laporan_ids),
+        "message": f"{len(updated)}/{len(laporan_ids)} laporan divalidasi sebagai '{request.status}'",
+        "total_updated": len(updated),
+        "total_not_found": len(laporan_ids) - len(updated),
+        "results": results,
+    }
+
+
 # ======================================================
 # 🏥 HEALTH CHECK
 # ======================================================
 @router.get("/health")
 async def health_check():
-    """Cek status kesehatan sistem dan model"""
+    """Cek status kesehatan sistem dan model (tanpa memuat model yang belum dimuat)"""
+    status = model_status()
     return {
         "status": "healthy",
         "models": {
-            "produk_budidaya_kmeans": FULL_PIPELINE_PRODUK_BUDIDAYA is not None,
-            "profil_pasar_agglomerative": FULL_PIPELINE_PROFIL_PASAR is not None,
-            "gemini": GEMINI_MODEL is not None,
+            "produk_budidaya_kmeans": status["produk_budidaya"] == "loaded",
+            "profil_pasar_agglomerative": status["profil_pasar"] == "loaded",
+            "gemini": status["gemini"] == "loaded",
         },
+        "model_status": status,
         "info": {
             "produk_budidaya": "KMeans (4 clusters, Silhouette=0.4779)",
             "profil_pasar": "Agglomerative (3 clusters, Silhouette=0.3372) - Using Original Labels",
         },
+        "drift": jsonable_encoder(drift_summary()),
     }
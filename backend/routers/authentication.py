@@ -7,16 +7,25 @@ router = APIRouter()
 
 # Untuk contoh ini, kita hardcode admin user.
 # Di aplikasi produksi, ini harus datang dari database.
+# Hash bcrypt (~0.2 detik) dibuat saat login pertama, bukan saat import.
 FAKE_ADMIN_USER = {
     "username": "admin",
-    "hashed_password": auth.get_password_hash("admin123") 
+    "hashed_password": None,
 }
 
+
+def get_admin_user():
+    """Admin hardcode dengan hash password yang dibuat sekali saat dibutuhkan."""
+    if FAKE_ADMIN_USER["hashed_password"] is None:
+        FAKE_ADMIN_USER["hashed_password"] = auth.get_password_hash("admin123")
+    return FAKE_ADMIN_USER
+
 @router.post("/token", response_model=schemas.Token)
 async def login_for_access_token(form_data: OAuth2PasswordRequestForm = Depends()):
     """Endpoint untuk admin login dan mendapatkan token JWT."""
-    if not (form_data.username == FAKE_ADMIN_USER["username"] and \
-            auth.verify_password(form_data.password, FAKE_ADMIN_USER["hashed_password"])):
+    admin_user = get_admin_user()
+    if not (form_data.username == admin_user["username"] and \
+            auth.verify_password(form_data.password, admin_user["hashed_password"])):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect username or password",
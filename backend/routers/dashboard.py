@@ -1,67 +1,508 @@
-from fastapi import APIRouter
-from ..database import database
+from fastapi import APIRouter, HTTPException, WebSocket
+from ..database import read_database
+from .. import cache, realtime, dashboard_live, outliers, schemas, snapshot
+from ..logger import get_logger
+from ..metrics import span
+import os
+import math
 import re
+import asyncio
+import itertools
+
+import asyncpg
 
 router = APIRouter(prefix="/dashboard", tags=["Dashboard"])
+log = get_logger(__name__)
+
+
+async def _fetch_cached(name, query, values=None):
+    """fetch_all dengan cache per endpoint; di-invalidate setiap data_raw berubah"""
+    return await cache.get_or_set(
+        f"dashboard:{name}",
+        lambda: read_database().fetch_all(query, values=values),
+        ttl=cache.DATA_TTL,
+    )
+
+
+# ==================================
+# 🗺️ Filter wilayah (rollup per dusun)
+# ==================================
+# Dengan ?kecamatan=&desa=&dusun= endpoint dijawab dari dashboard_region_rollup
+# (migrations/002_dashboard_region_rollup.sql) yang dijaga trigger, bukan dari
+# scan data_raw. Tanpa filter, query global yang lama tetap dipakai.
+# Hanya kombinasi wilayah yang ada di rollup yang di-cache, supaya nilai filter
+# sembarang tidak menambah entri cache tanpa batas.
+REGION_LEVELS = ("kecamatan", "desa", "dusun")
+REGION_UNAVAILABLE = (
+    "Rollup wilayah belum tersedia, jalankan migrations/002_dashboard_region_rollup.sql"
+)
+
+
+def region_filter(kecamatan=None, desa=None, dusun=None):
+    """Filter wilayah yang diisi, dinormalisasi seperti kolom rollup"""
+    values = {"kecamatan": kecamatan, "desa": desa, "dusun": dusun}
+    return {
+        level: value.strip().upper()
+        for level, value in values.items()
+        if value and value.strip()
+    }
+
+
+def _region_where(region):
+    return "".join(f" AND {level} = :{level}" for level in region)
+
+
+def _region_key(name, region):
+    return f"{name}:" + "|".join(region.get(level, "") for level in REGION_LEVELS)
+
+
+async def _region_index():
+    """Kombinasi (kecamatan, desa, dusun) di rollup; level tanpa filter = None"""
+
+    async def compute():
+        try:
+            rows = await read_database().fetch_all(
+                "SELECT DISTINCT kecamatan, desa, dusun FROM dashboard_region_rollup"
+            )
+        except asyncpg.UndefinedTableError:
+            raise HTTPException(status_code=503, detail=REGION_UNAVAILABLE)
+        index = set()
+        for row in rows:
+            values = tuple(row[level] for level in REGION_LEVELS)
+            for mask in itertools.product((True, False), repeat=len(REGION_LEVELS)):
+                index.add(tuple(v if keep else None for v, keep in zip(values, mask)))
+        return index
+
+    return await cache.get_or_set("dashboard:region_index", compute, ttl=cache.DATA_TTL)
+
+
+async def _known_region(region):
+    if not region:
+        return True
+    return _region_tuple(region) in await _region_index()
+
+
+def _region_tuple(region):
+    return tuple(region.get(level) for level in REGION_LEVELS)
+
+
+async def _cached_region(name, region, factory):
+    """cache.get_or_set per kombinasi wilayah; wilayah yang tidak dikenal tidak di-cache"""
+    if not await _known_region(region):
+        return await factory()
+    return await cache.get_or_set(
+        f"dashboard:{_region_key(name, region)}", factory, ttl=cache.DATA_TTL
+    )
+
+
+async def _fetch_region(name, query, region, values=None):
+    """fetch_all ke tabel rollup dengan filter wilayah (cache per kombinasi filter)"""
+    index = await _region_index()  # 503 jika tabel rollup belum ada
+    if region and _region_tuple(region) not in index:
+        return []  # tidak ada baris rollup untuk wilayah ini
+    return await _fetch_cached(
+        _region_key(name, region), query, values={**region, **(values or {})}
+    )
+
+
+async def _distribusi_region(name, dimensi, region, limit=None):
+    query = f"""
+        SELECT kategori, SUM(jumlah) AS jumlah
+        FROM dashboard_region_rollup
+        WHERE dimensi = :dimensi{_region_where(region)}
+        GROUP BY kategori
+        ORDER BY jumlah DESC
+        {f"LIMIT {int(limit)}" if limit else ""}
+    """
+    return await _fetch_region(name, query, region, {"dimensi": dimensi})
+
+
+async def _kelompok_region(name, metric, region):
+    query = f"""
+        SELECT kategori AS kelompok, SUM({metric}) AS total
+        FROM dashboard_region_rollup
+        WHERE dimensi = 'KELOMPOK TANI'{_region_where(region)}
+        GROUP BY kategori
+        HAVING SUM({metric}) > 0
+        ORDER BY total DESC
+        LIMIT 10
+    """
+    return await _fetch_region(name, query, region)
+
+
+# ==================================
+# 🎲 Mode perkiraan (?approx=true)
+# ==================================
+# Untuk data_raw sangat besar, summary & distribusi bisa dijawab dari sampel
+# TABLESAMPLE SYSTEM berukuran ~APPROX_SAMPLE_ROWS baris (waktu konstan, tidak
+# bergantung ukuran tabel). Jumlah baris populasi diambil dari statistik
+# planner (pg_class.reltuples). Margin error = interval kepercayaan 95%
+# (pendekatan normal, dengan koreksi populasi terbatas). Sampel SYSTEM
+# berbasis blok, jadi margin bisa terlalu sempit jika data berkelompok per
+# blok. Tabel yang lebih kecil dari APPROX_MIN_ROWS tetap dijawab exact.
+APPROX_SAMPLE_ROWS = int(os.getenv("DASHBOARD_APPROX_SAMPLE_ROWS", "50000"))
+APPROX_MIN_ROWS = APPROX_SAMPLE_ROWS * 4
+APPROX_Z = 1.96  # 95%
+
+
+async def _approx_plan():
+    """(estimasi jumlah baris, persen sampel), atau None jika exact lebih tepat"""
+    population = await read_database().fetch_val(
+        "SELECT reltuples::bigint FROM pg_class WHERE oid = 'data_raw'::regclass"
+    )
+    if not population or population < APPROX_MIN_ROWS:
+        return None
+    return population, APPROX_SAMPLE_ROWS / population * 100
+
+
+def _approx_info(sample, population):
+    return {
+        "sample_rows": sample,
+        "population_estimate": population,
+        "confidence": 0.95,
+        "method": "TABLESAMPLE SYSTEM",
+    }
+
+
+def _margin(sd, n, population):
+    """Setengah lebar interval kepercayaan untuk rata-rata dari n sampel"""
+    if not n or sd is None:
+        return 0.0
+    fpc = math.sqrt(max(0.0, 1 - n / population))
+    return APPROX_Z * float(sd) / math.sqrt(n) * fpc
+
+
+async def _summary_approx():
+    plan = await _approx_plan()
+    if plan is None:
+        return None
+    population, percent = plan
+
+    with span("dashboard.get_summary_approx"):
+        row = await read_database().fetch_one(
+            """
+            SELECT COUNT(*) AS n,
+                   AVG(COALESCE("TOTAL LAHAN (M2)", 0)) AS lahan_mean,
+                   STDDEV_SAMP(COALESCE("TOTAL LAHAN (M2)", 0)) AS lahan_sd,
+                   AVG(COALESCE("HASIL PER TAHUN (kg)", 0)) AS hasil_mean,
+                   STDDEV_SAMP(COALESCE("HASIL PER TAHUN (kg)", 0)) AS hasil_sd,
+                   COUNT(*) FILTER (WHERE "HASIL PER TAHUN (kg)" > 0) AS hasil_n,
+                   AVG("HASIL PER TAHUN (kg)") FILTER (WHERE "HASIL PER TAHUN (kg)" > 0) AS hasil_pos_mean,
+                   STDDEV_SAMP("HASIL PER TAHUN (kg)") FILTER (WHERE "HASIL PER TAHUN (kg)" > 0) AS hasil_pos_sd,
+                   COUNT(*) FILTER (WHERE "USIA" > 0) AS usia_n,
+                   AVG("USIA") FILTER (WHERE "USIA" > 0) AS usia_mean,
+                   STDDEV_SAMP("USIA") FILTER (WHERE "USIA" > 0) AS usia_sd
+            FROM data_raw TABLESAMPLE SYSTEM (:persen)
+            """,
+            values={"persen": percent},
+        )
+    n = row["n"]
+    if not n:
+        return None
+
+    scale = population / n
+    total_lahan_m2 = float(row["lahan_mean"]) * population
+    total_produksi = float(row["hasil_mean"]) * population
+    hasil_pos_mean = float(row["hasil_pos_mean"] or 0)
+    usia_mean = float(row["usia_mean"] or 0)
+    return {
+        "total_petani": population,
+        "total_lahan_ha": round(total_lahan_m2 / 10000, 2),
+        "kapasitas_produksi_kg_tahun": round(total_produksi),
+        "rata_rata_harga_rp": round(hasil_pos_mean * 100) if row["hasil_n"] else 50000,
+        "rata_rata_lama_bertani_tahun": 10.5,  # Placeholder
+        "rata_rata_usia_tahun": round(usia_mean, 1),
+        "total_populasi_kopi": 15000,  # Placeholder
+        "total_lahan_m2": round(total_lahan_m2),
+        "basis_rata_rata": {
+            "hasil_per_tahun": {
+                "total": round(hasil_pos_mean * row["hasil_n"] * scale),
+                "jumlah": round(row["hasil_n"] * scale),
+            },
+            "usia": {
+                "total": round(usia_mean * row["usia_n"] * scale),
+                "jumlah": round(row["usia_n"] * scale),
+            },
+        },
+        "approx": {
+            **_approx_info(n, population),
+            # ± setengah lebar interval, satuan sama dengan field-nya
+            "margin": {
+                "total_lahan_ha": round(
+                    _margin(row["lahan_sd"], n, population) * population / 10000, 2
+                ),
+                "kapasitas_produksi_kg_tahun": round(
+                    _margin(row["hasil_sd"], n, population) * population
+                ),
+                "rata_rata_harga_rp": round(
+                    _margin(row["hasil_pos_sd"], row["hasil_n"], population) * 100
+                ),
+                "rata_rata_usia_tahun": round(
+                    _margin(row["usia_sd"], row["usia_n"], population), 1
+                ),
+            },
+        },
+    }
+
+
+async def _distribusi_approx(column, field, limit=None):
+    plan = await _approx_plan()
+    if plan is None:
+        return None
+    population, percent = plan
+
+    col = _quote_ident(column)
+    with span("dashboard.distribusi_approx"):
+        rows = await read_database().fetch_all(
+            f"""
+            SELECT kategori, jumlah, sampel
+            FROM (
+                SELECT {col} AS kategori,
+                       COUNT(*) AS jumlah,
+                       SUM(COUNT(*)) OVER () AS sampel
+                FROM data_raw TABLESAMPLE SYSTEM (:persen)
+                GROUP BY {col}
+            ) s
+            WHERE kategori IS NOT NULL AND kategori <> ''
+            ORDER BY jumlah DESC
+            """,
+            values={"persen": percent},
+        )
+    if not rows:
+        return None
+
+    n = int(rows[0]["sampel"])
+    fpc = math.sqrt(max(0.0, 1 - n / population))
+    result = []
+    for r in rows[:limit] if limit else rows:
+        share = r["jumlah"] / n
+        margin = APPROX_Z * math.sqrt(share * (1 - share) / n) * fpc * population
+        result.append(
+            {
+                field: r["kategori"],
+                "jumlah": round(share * population),
+                "margin": round(margin),
+                "approx": True,
+            }
+        )
+    return result
+
+
+async def _cached_approx(name, factory):
+    return await cache.get_or_set(f"dashboard:{name}:approx", factory, ttl=cache.DATA_TTL)
+
+
+@router.websocket("/ws")
+async def dashboard_ws(websocket: WebSocket):
+    """
+    Push delta agregat setiap ada perubahan data petani.
+    Payload: {"event", "NO", "delta"} dengan key delta sama seperti nama endpoint
+    (summary, distribusi-*, kelompok-tani-*); nilai berupa selisih yang
+    ditambahkan ke hasil fetch awal. Rata-rata dihitung ulang dari basis_rata_rata.
+    Perubahan massal dikirim sebagai {"event": "refetch", "reason", "NO": null}
+    tanpa delta: client harus fetch ulang semua endpoint dashboard.
+    """
+    await websocket.accept()
+    await realtime.stream_to_websocket(websocket, dashboard_live.DASHBOARD_CHANNEL)
 
 
 @router.get("/summary")
-async def get_summary():
-    """Ringkasan statistik utama dashboard"""
+async def get_summary(
+    kecamatan: str = None, desa: str = None, dusun: str = None, approx: bool = False
+):
+    """Ringkasan statistik utama dashboard (opsional per wilayah / perkiraan)"""
+    region = region_filter(kecamatan, desa, dusun)
     try:
+        if approx and not region:
+            result = await _cached_approx("summary", _summary_approx)
+            if result is not None:
+                return result
+        if region:
+            return await _cached_region(
+                "summary", region, lambda: _compute_summary_region(region)
+            )
+        return await cache.get_or_set(
+            "dashboard:summary", _compute_summary, ttl=cache.DATA_TTL
+        )
+    except HTTPException:
+        raise
+    except Exception:
+        log.exception("Error in summary")
+        return {
+            "total_petani": 0,
+            "total_lahan_ha": 0,
+            "kapasitas_produksi_kg_tahun": 0,
+            "rata_rata_harga_rp": 0,
+            "rata_rata_lama_bertani_tahun": 0,
+            "rata_rata_usia_tahun": 0,
+            "total_populasi_kopi": 0,
+        }
+
+
+async def _compute_summary():
+    with span("dashboard.get_summary"):
         # Total Petani
-        total_petani = await database.fetch_val("SELECT COUNT(*) FROM data_raw")
+        total_petani = await read_database().fetch_val("SELECT COUNT(*) FROM data_raw")
 
         # Total Lahan
-        total_lahan_m2 = await database.fetch_val(
+        total_lahan_m2 = await read_database().fetch_val(
             'SELECT COALESCE(SUM("TOTAL LAHAN (M2)"), 0) FROM data_raw WHERE "TOTAL LAHAN (M2)" IS NOT NULL'
         )
         total_lahan_ha = round(total_lahan_m2 / 10000, 2) if total_lahan_m2 else 0
 
         # Kapasitas Produksi
-        total_produksi = await database.fetch_val(
+        total_produksi = await read_database().fetch_val(
             'SELECT COALESCE(SUM("HASIL PER TAHUN (kg)"), 0) FROM data_raw WHERE "HASIL PER TAHUN (kg)" IS NOT NULL'
         )
 
         # Harga Rata-rata - Simple approach
-        query_harga = 'SELECT AVG("HASIL PER TAHUN (kg)") FROM data_raw WHERE "HASIL PER TAHUN (kg)" IS NOT NULL AND "HASIL PER TAHUN (kg)" > 0'
-        rata_harga = await database.fetch_val(query_harga)
+        # SUM & COUNT (bukan AVG) supaya client live bisa menerapkan delta rata-rata
+        query_harga = 'SELECT COALESCE(SUM("HASIL PER TAHUN (kg)"), 0) AS total, COUNT("HASIL PER TAHUN (kg)") AS jumlah FROM data_raw WHERE "HASIL PER TAHUN (kg)" IS NOT NULL AND "HASIL PER TAHUN (kg)" > 0'
+        basis_hasil = await read_database().fetch_one(query_harga)
         rata_harga = (
-            round(rata_harga * 100) if rata_harga else 50000
+            round(basis_hasil["total"] / basis_hasil["jumlah"] * 100)
+            if basis_hasil["jumlah"]
+            else 50000
         )  # Default fallback
 
         # Rata-rata Usia
-        rata_usia = await database.fetch_val(
-            'SELECT AVG("USIA") FROM data_raw WHERE "USIA" IS NOT NULL AND "USIA" > 0'
+        basis_usia = await read_database().fetch_one(
+            'SELECT COALESCE(SUM("USIA"), 0) AS total, COUNT("USIA") AS jumlah FROM data_raw WHERE "USIA" IS NOT NULL AND "USIA" > 0'
+        )
+        rata_usia = (
+            round(basis_usia["total"] / basis_usia["jumlah"], 1)
+            if basis_usia["jumlah"]
+            else 0
         )
-        rata_usia = round(rata_usia, 1) if rata_usia else 0
 
-        return {
-            "total_petani": total_petani or 0,
-            "total_lahan_ha": total_lahan_ha,
-            "kapasitas_produksi_kg_tahun": total_produksi or 0,
-            "rata_rata_harga_rp": rata_harga,
-            "rata_rata_lama_bertani_tahun": 10.5,  # Placeholder
-            "rata_rata_usia_tahun": rata_usia,
-            "total_populasi_kopi": 15000,  # Placeholder
-        }
-    except Exception as e:
-        print(f"Error in summary: {e}")
-        return {
-            "total_petani": 0,
-            "total_lahan_ha": 0,
-            "kapasitas_produksi_kg_tahun": 0,
-            "rata_rata_harga_rp": 0,
-            "rata_rata_lama_bertani_tahun": 0,
-            "rata_rata_usia_tahun": 0,
-            "total_populasi_kopi": 0,
-        }
+    return {
+        "total_petani": total_petani or 0,
+        "total_lahan_ha": total_lahan_ha,
+        "kapasitas_produksi_kg_tahun": total_produksi or 0,
+        "rata_rata_harga_rp": rata_harga,
+        "rata_rata_lama_bertani_tahun": 10.5,  # Placeholder
+        "rata_rata_usia_tahun": rata_usia,
+        "total_populasi_kopi": 15000,  # Placeholder
+        "total_lahan_m2": total_lahan_m2 or 0,
+        "basis_rata_rata": {
+            "hasil_per_tahun": {
+                "total": basis_hasil["total"],
+                "jumlah": basis_hasil["jumlah"],
+            },
+            "usia": {"total": basis_usia["total"], "jumlah": basis_usia["jumlah"]},
+        },
+    }
+
+
+async def _compute_summary_region(region):
+    with span("dashboard.get_summary_region"):
+        row = await read_database().fetch_one(
+            f"""
+            SELECT COALESCE(SUM(jumlah), 0) AS total_petani,
+                   COALESCE(SUM(total_lahan_m2), 0) AS total_lahan_m2,
+                   COALESCE(SUM(total_hasil_kg), 0) AS total_produksi,
+                   COALESCE(SUM(hasil_total), 0) AS hasil_total,
+                   COALESCE(SUM(hasil_jumlah), 0) AS hasil_jumlah,
+                   COALESCE(SUM(usia_total), 0) AS usia_total,
+                   COALESCE(SUM(usia_jumlah), 0) AS usia_jumlah,
+                   COALESCE(SUM(harga_total), 0) AS harga_total,
+                   COALESCE(SUM(harga_jumlah), 0) AS harga_jumlah
+            FROM dashboard_region_rollup
+            WHERE dimensi = 'ringkasan'{_region_where(region)}
+            """,
+            values=region,
+        )
+
+    # Kolom rollup NUMERIC -> int, rumus rata-rata sama dengan _compute_summary
+    hasil_total, hasil_jumlah = int(row["hasil_total"]), row["hasil_jumlah"]
+    usia_total, usia_jumlah = int(row["usia_total"]), row["usia_jumlah"]
+    total_lahan_m2 = int(row["total_lahan_m2"])
+    return {
+        "wilayah": region,
+        "total_petani": row["total_petani"],
+        "total_lahan_ha": round(total_lahan_m2 / 10000, 2),
+        "kapasitas_produksi_kg_tahun": int(row["total_produksi"]),
+        "rata_rata_harga_rp": (
+            round(hasil_total / hasil_jumlah * 100) if hasil_jumlah else 50000
+        ),
+        "rata_rata_harga_jual_rp": (
+            round(float(row["harga_total"]) / row["harga_jumlah"])
+            if row["harga_jumlah"]
+            else 0
+        ),
+        "rata_rata_lama_bertani_tahun": 10.5,  # Placeholder
+        "rata_rata_usia_tahun": round(usia_total / usia_jumlah, 1) if usia_jumlah else 0,
+        "total_populasi_kopi": 15000,  # Placeholder
+        "total_lahan_m2": total_lahan_m2,
+        "basis_rata_rata": {
+            "hasil_per_tahun": {"total": hasil_total, "jumlah": hasil_jumlah},
+            "usia": {"total": usia_total, "jumlah": usia_jumlah},
+        },
+    }
+
+
+@router.get("/wilayah")
+async def get_wilayah(kecamatan: str = None, desa: str = None):
+    """
+    Rollup satu level di bawah filter: tanpa filter -> per kecamatan,
+    ?kecamatan= -> per desa, ?kecamatan=&desa= -> per dusun.
+    """
+    region = region_filter(kecamatan, desa)
+    if "desa" in region and "kecamatan" not in region:
+        raise HTTPException(status_code=400, detail="Filter desa butuh kecamatan")
+    level = REGION_LEVELS[len(region)]
+
+    query = f"""
+        SELECT {level} AS nama,
+               SUM(jumlah) AS total_petani,
+               SUM(total_lahan_m2) AS total_lahan_m2,
+               SUM(total_hasil_kg) AS total_produksi,
+               SUM(harga_total) AS harga_total,
+               SUM(harga_jumlah) AS harga_jumlah
+        FROM dashboard_region_rollup
+        WHERE dimensi = 'ringkasan'{_region_where(region)}
+        GROUP BY {level}
+        ORDER BY total_petani DESC
+    """
+    with span("dashboard.wilayah"):
+        rows = await _fetch_region("wilayah", query, region)
+    return {
+        "level": level,
+        "wilayah": region,
+        "items": [
+            {
+                "nama": r["nama"] or "(KOSONG)",
+                "total_petani": r["total_petani"],
+                "total_lahan_ha": round(float(r["total_lahan_m2"]) / 10000, 2),
+                "kapasitas_produksi_kg_tahun": int(r["total_produksi"]),
+                "rata_rata_harga_jual_rp": (
+                    round(float(r["harga_total"]) / r["harga_jumlah"])
+                    if r["harga_jumlah"]
+                    else 0
+                ),
+            }
+            for r in rows
+        ],
+    }
 
 
 @router.get("/distribusi-jenis-kopi")
-async def distribusi_jenis_kopi():
+async def distribusi_jenis_kopi(
+    kecamatan: str = None, desa: str = None, dusun: str = None, approx: bool = False
+):
     """Pie Chart: Distribusi Jenis Kopi"""
+    region = region_filter(kecamatan, desa, dusun)
     try:
+        if approx and not region:
+            result = await _cached_approx(
+                "distribusi_jenis_kopi", lambda: _distribusi_approx("JENIS KOPI", "kategori")
+            )
+            if result is not None:
+                return result
+        if region:
+            result = await _distribusi_region("distribusi_jenis_kopi", "JENIS KOPI", region)
+            return [{"kategori": r["kategori"], "jumlah": r["jumlah"]} for r in result]
+
         query = """
             SELECT "JENIS KOPI" as kategori, COUNT(*) as jumlah
             FROM data_raw
@@ -69,17 +510,33 @@ async def distribusi_jenis_kopi():
             GROUP BY "JENIS KOPI"
             ORDER BY jumlah DESC
         """
-        result = await database.fetch_all(query)
+        with span("dashboard.distribusi_jenis_kopi"):
+            result = await _fetch_cached("distribusi_jenis_kopi", query)
         return [{"kategori": r["kategori"], "jumlah": r["jumlah"]} for r in result]
-    except Exception as e:
-        print(f"Error in distribusi jenis kopi: {e}")
+    except HTTPException:
+        raise
+    except Exception:
+        log.exception("Error in distribusi jenis kopi")
         return []
 
 
 @router.get("/distribusi-metode-panen")
-async def distribusi_metode_panen():
+async def distribusi_metode_panen(
+    kecamatan: str = None, desa: str = None, dusun: str = None, approx: bool = False
+):
     """Pie Chart: Distribusi Metode Panen"""
+    region = region_filter(kecamatan, desa, dusun)
     try:
+        if approx and not region:
+            result = await _cached_approx(
+                "distribusi_metode_panen", lambda: _distribusi_approx("METODE PANEN", "kategori")
+            )
+            if result is not None:
+                return result
+        if region:
+            result = await _distribusi_region("distribusi_metode_panen", "METODE PANEN", region)
+            return [{"kategori": r["kategori"], "jumlah": r["jumlah"]} for r in result]
+
         query = """
             SELECT "METODE PANEN" as kategori, COUNT(*) as jumlah
             FROM data_raw
@@ -87,17 +544,33 @@ async def distribusi_metode_panen():
             GROUP BY "METODE PANEN"
             ORDER BY jumlah DESC
         """
-        result = await database.fetch_all(query)
+        with span("dashboard.distribusi_metode_panen"):
+            result = await _fetch_cached("distribusi_metode_panen", query)
         return [{"kategori": r["kategori"], "jumlah": r["jumlah"]} for r in result]
-    except Exception as e:
-        print(f"Error: {e}")
+    except HTTPException:
+        raise
+    except Exception:
+        log.exception("Error in distribusi metode panen")
         return []
 
 
 @router.get("/distribusi-metode-pengolahan")
-async def distribusi_metode_pengolahan():
+async def distribusi_metode_pengolahan(
+    kecamatan: str = None, desa: str = None, dusun: str = None, approx: bool = False
+):
     """Pie Chart: Distribusi Metode Pengolahan"""
+    region = region_filter(kecamatan, desa, dusun)
     try:
+        if approx and not region:
+            result = await _cached_approx(
+                "distribusi_metode_pengolahan", lambda: _distribusi_approx("METODE PENGOLAHAN", "kategori")
+            )
+            if result is not None:
+                return result
+        if region:
+            result = await _distribusi_region("distribusi_metode_pengolahan", "METODE PENGOLAHAN", region)
+            return [{"kategori": r["kategori"], "jumlah": r["jumlah"]} for r in result]
+
         query = """
             SELECT "METODE PENGOLAHAN" as kategori, COUNT(*) as jumlah
             FROM data_raw
@@ -105,17 +578,33 @@ async def distribusi_metode_pengolahan():
             GROUP BY "METODE PENGOLAHAN"
             ORDER BY jumlah DESC
         """
-        result = await database.fetch_all(query)
+        with span("dashboard.distribusi_metode_pengolahan"):
+            result = await _fetch_cached("distribusi_metode_pengolahan", query)
         return [{"kategori": r["kategori"], "jumlah": r["jumlah"]} for r in result]
-    except Exception as e:
-        print(f"Error: {e}")
+    except HTTPException:
+        raise
+    except Exception:
+        log.exception("Error in distribusi metode pengolahan")
         return []
 
 
 @router.get("/distribusi-proses-pengeringan")
-async def distribusi_proses_pengeringan():
+async def distribusi_proses_pengeringan(
+    kecamatan: str = None, desa: str = None, dusun: str = None, approx: bool = False
+):
     """Pie Chart: Distribusi Proses Pengeringan"""
+    region = region_filter(kecamatan, desa, dusun)
     try:
+        if approx and not region:
+            result = await _cached_approx(
+                "distribusi_proses_pengeringan", lambda: _distribusi_approx("PROSES PENGERINGAN", "kategori")
+            )
+            if result is not None:
+                return result
+        if region:
+            result = await _distribusi_region("distribusi_proses_pengeringan", "PROSES PENGERINGAN", region)
+            return [{"kategori": r["kategori"], "jumlah": r["jumlah"]} for r in result]
+
         query = """
             SELECT "PROSES PENGERINGAN" as kategori, COUNT(*) as jumlah
             FROM data_raw
@@ -123,17 +612,33 @@ async def distribusi_proses_pengeringan():
             GROUP BY "PROSES PENGERINGAN"
             ORDER BY jumlah DESC
         """
-        result = await database.fetch_all(query)
+        with span("dashboard.distribusi_proses_pengeringan"):
+            result = await _fetch_cached("distribusi_proses_pengeringan", query)
         return [{"kategori": r["kategori"], "jumlah": r["jumlah"]} for r in result]
-    except Exception as e:
-        print(f"Error: {e}")
+    except HTTPException:
+        raise
+    except Exception:
+        log.exception("Error in distribusi proses pengeringan")
         return []
 
 
 @router.get("/distribusi-metode-penjualan")
-async def distribusi_metode_penjualan():
+async def distribusi_metode_penjualan(
+    kecamatan: str = None, desa: str = None, dusun: str = None, approx: bool = False
+):
     """Pie Chart: Distribusi Metode Penjualan"""
+    region = region_filter(kecamatan, desa, dusun)
     try:
+        if approx and not region:
+            result = await _cached_approx(
+                "distribusi_metode_penjualan", lambda: _distribusi_approx("METODE PENJUALAN", "kategori")
+            )
+            if result is not None:
+                return result
+        if region:
+            result = await _distribusi_region("distribusi_metode_penjualan", "METODE PENJUALAN", region)
+            return [{"kategori": r["kategori"], "jumlah": r["jumlah"]} for r in result]
+
         query = """
             SELECT "METODE PENJUALAN" as kategori, COUNT(*) as jumlah
             FROM data_raw
@@ -141,17 +646,36 @@ async def distribusi_metode_penjualan():
             GROUP BY "METODE PENJUALAN"
             ORDER BY jumlah DESC
         """
-        result = await database.fetch_all(query)
+        with span("dashboard.distribusi_metode_penjualan"):
+            result = await _fetch_cached("distribusi_metode_penjualan", query)
         return [{"kategori": r["kategori"], "jumlah": r["jumlah"]} for r in result]
-    except Exception as e:
-        print(f"Error: {e}")
+    except HTTPException:
+        raise
+    except Exception:
+        log.exception("Error in distribusi metode penjualan")
         return []
 
 
 @router.get("/distribusi-varietas-kopi")
-async def distribusi_varietas_kopi():
+async def distribusi_varietas_kopi(
+    kecamatan: str = None, desa: str = None, dusun: str = None, approx: bool = False
+):
     """Bar Chart: Distribusi Varietas Kopi"""
+    region = region_filter(kecamatan, desa, dusun)
     try:
+        if approx and not region:
+            result = await _cached_approx(
+                "distribusi_varietas_kopi",
+                lambda: _distribusi_approx("VARIETAS KOPI", "varietas", limit=10),
+            )
+            if result is not None:
+                return result
+        if region:
+            result = await _distribusi_region(
+                "distribusi_varietas_kopi", "VARIETAS KOPI", region, limit=10
+            )
+            return [{"varietas": r["kategori"], "jumlah": r["jumlah"]} for r in result]
+
         query = """
             SELECT "VARIETAS KOPI" as varietas, COUNT(*) as jumlah
             FROM data_raw
@@ -160,17 +684,36 @@ async def distribusi_varietas_kopi():
             ORDER BY jumlah DESC
             LIMIT 10
         """
-        result = await database.fetch_all(query)
+        with span("dashboard.distribusi_varietas_kopi"):
+            result = await _fetch_cached("distribusi_varietas_kopi", query)
         return [{"varietas": r["varietas"], "jumlah": r["jumlah"]} for r in result]
-    except Exception as e:
-        print(f"Error: {e}")
+    except HTTPException:
+        raise
+    except Exception:
+        log.exception("Error in distribusi varietas kopi")
         return []
 
 
 @router.get("/kelompok-tani-vs-hasil")
-async def kelompok_tani_vs_hasil():
+async def kelompok_tani_vs_hasil(
+    kecamatan: str = None,
+    desa: str = None,
+    dusun: str = None,
+    exclude_outliers: bool = False,
+):
     """Bar Chart: Kelompok Tani vs Hasil Per Tahun"""
+    region = region_filter(kecamatan, desa, dusun)
     try:
+        if exclude_outliers:
+            result = await _kelompok_tanpa_outlier("hasil", region)
+            return [{"kelompok": k, "total_hasil": int(total)} for k, total in result]
+
+        if region:
+            result = await _kelompok_region("kelompok_tani_vs_hasil", "hasil_total", region)
+            return [
+                {"kelompok": r["kelompok"], "total_hasil": int(r["total"])} for r in result
+            ]
+
         query = """
             SELECT "KELOMPOK TANI" as kelompok, 
                    SUM("HASIL PER TAHUN (kg)") as total_hasil
@@ -183,19 +726,41 @@ async def kelompok_tani_vs_hasil():
             ORDER BY total_hasil DESC
             LIMIT 10
         """
-        result = await database.fetch_all(query)
+        with span("dashboard.kelompok_tani_vs_hasil"):
+            result = await _fetch_cached("kelompok_tani_vs_hasil", query)
         return [
             {"kelompok": r["kelompok"], "total_hasil": r["total_hasil"]} for r in result
         ]
-    except Exception as e:
-        print(f"Error: {e}")
+    except HTTPException:
+        raise
+    except Exception:
+        log.exception("Error in kelompok tani vs hasil")
         return []
 
 
 @router.get("/kelompok-tani-vs-lahan")
-async def kelompok_tani_vs_lahan():
+async def kelompok_tani_vs_lahan(
+    kecamatan: str = None,
+    desa: str = None,
+    dusun: str = None,
+    exclude_outliers: bool = False,
+):
     """Bar Chart: Kelompok Tani vs Total Lahan"""
+    region = region_filter(kecamatan, desa, dusun)
     try:
+        if exclude_outliers:
+            result = await _kelompok_tanpa_outlier("lahan", region)
+            return [
+                {"kelompok": k, "total_lahan_ha": round(float(total) / 10000, 2)}
+                for k, total in result
+            ]
+
+        if region:
+            result = await _kelompok_region("kelompok_tani_vs_lahan", "lahan_positif_m2", region)
+            return [
+                {"kelompok": r["kelompok"], "total_lahan_ha": round(float(r["total"]) / 10000, 2)} for r in result
+            ]
+
         query = """
             SELECT "KELOMPOK TANI" as kelompok, 
                    ROUND(SUM("TOTAL LAHAN (M2)")::numeric / 10000, 2) as total_lahan_ha
@@ -208,20 +773,32 @@ async def kelompok_tani_vs_lahan():
             ORDER BY total_lahan_ha DESC
             LIMIT 10
         """
-        result = await database.fetch_all(query)
+        with span("dashboard.kelompok_tani_vs_lahan"):
+            result = await _fetch_cached("kelompok_tani_vs_lahan", query)
         return [
             {"kelompok": r["kelompok"], "total_lahan_ha": float(r["total_lahan_ha"])}
             for r in result
         ]
-    except Exception as e:
-        print(f"Error: {e}")
+    except HTTPException:
+        raise
+    except Exception:
+        log.exception("Error in kelompok tani vs lahan")
         return []
 
 
 @router.get("/kelompok-tani-vs-populasi")
-async def kelompok_tani_vs_populasi():
+async def kelompok_tani_vs_populasi(
+    kecamatan: str = None, desa: str = None, dusun: str = None
+):
     """Bar Chart: Kelompok Tani vs Populasi Kopi"""
+    region = region_filter(kecamatan, desa, dusun)
     try:
+        if region:
+            result = await _kelompok_region("kelompok_tani_vs_populasi", "jumlah", region)
+            return [
+                {"kelompok": r["kelompok"], "total_populasi": r["total"]} for r in result
+            ]
+
         query = """
             SELECT "KELOMPOK TANI" as kelompok, 
                    COUNT(*) as total_populasi
@@ -231,11 +808,305 @@ async def kelompok_tani_vs_populasi():
             ORDER BY total_populasi DESC
             LIMIT 10
         """
-        result = await database.fetch_all(query)
+        with span("dashboard.kelompok_tani_vs_populasi"):
+            result = await _fetch_cached("kelompok_tani_vs_populasi", query)
         return [
             {"kelompok": r["kelompok"], "total_populasi": r["total_populasi"]}
             for r in result
         ]
-    except Exception as e:
-        print(f"Error: {e}")
+    except HTTPException:
+        raise
+    except Exception:
+        log.exception("Error in kelompok tani vs populasi")
         return []
+
+
+# ==================================
+# 🚩 Outlier hasil & lahan (lihat backend/outliers.py)
+# ==================================
+# Dihitung dari snapshot kolumnar dan di-cache per versi snapshot. Chart
+# kelompok hasil/lahan bisa mengeluarkan baris yang ditandai lewat
+# ?exclude_outliers=true (metode mad).
+OUTLIER_COLUMNS = [
+    "NO",
+    "NAMA",
+    "KECAMATAN",
+    "DESA",
+    "DUSUN",
+    outliers.KELOMPOK_COLUMN,
+    outliers.HASIL_COLUMN,
+    outliers.LAHAN_COLUMN,
+]
+# chart -> (kolom yang dijumlah, metrik yang membuat baris dikeluarkan)
+OUTLIER_CHARTS = {
+    "hasil": (outliers.HASIL_COLUMN, ("hasil_per_tahun_kg", "hasil_per_m2")),
+    "lahan": (outliers.LAHAN_COLUMN, ("total_lahan_m2", "hasil_per_m2")),
+}
+
+
+async def _current_version():
+    await snapshot.columns()  # terapkan perubahan tertunda dulu
+    return snapshot.version()
+
+
+async def _outlier_scores(method, version):
+    async def compute():
+        frame = await snapshot.get_frame(OUTLIER_COLUMNS)
+        return await asyncio.to_thread(outliers.score, frame, method)
+
+    return await cache.get_or_set(
+        f"dashboard:outliers:{method}:{version}", compute, ttl=cache.DATA_TTL
+    )
+
+
+def _kelompok_totals(frame, column, region, excluded):
+    """[(kelompok, total)] 10 teratas, tanpa NO di `excluded`"""
+    keep = ~frame["NO"].isin(excluded)
+    for level, value in region.items():
+        keep &= frame[level.upper()].astype(str).str.strip().str.upper() == value
+    kelompok = frame[outliers.KELOMPOK_COLUMN]
+    values = frame[column].astype(float)
+    keep &= kelompok.notna() & (kelompok != "") & (values > 0)
+    totals = values[keep].groupby(kelompok[keep], observed=True).sum().nlargest(10)
+    return list(totals.items())
+
+
+async def _snapshot_has_region(region):
+    """Setiap level filter ada di nilai kolom wilayah snapshot (dinormalisasi)"""
+    for level, value in region.items():
+        counts = await snapshot.text_value_counts(level.upper())
+        if value not in {str(text).strip().upper() for text in counts}:
+            return False
+    return True
+
+
+async def _kelompok_tanpa_outlier(chart, region):
+    version = await _current_version()
+    column, metrics = OUTLIER_CHARTS[chart]
+
+    async def compute():
+        scored = await _outlier_scores("mad", version)
+        excluded = outliers.flagged_nos(scored, metrics)
+        frame = await snapshot.get_frame(OUTLIER_COLUMNS)
+        return await asyncio.to_thread(_kelompok_totals, frame, column, region, excluded)
+
+    # Dihitung dari snapshot, jadi wilayah dicek ke snapshot (bukan rollup):
+    # tetap jalan sebelum migrasi 002 dan filter asing tidak menambah cache
+    if not await _snapshot_has_region(region):
+        return []
+    key = _region_key(f"kelompok_{chart}_tanpa_outlier:{version}", region)
+    return await cache.get_or_set(f"dashboard:{key}", compute, ttl=cache.DATA_TTL)
+
+
+@router.get("/outliers")
+async def get_outliers(
+    method: str = "mad", metric: str = None, kelompok: str = None, limit: int = 100
+):
+    """
+    Baris yang menyimpang dari kelompok taninya (hasil/tahun, lahan, hasil per
+    m2). method=mad (robust z) atau iqr; urut dari penyimpangan terbesar.
+    """
+    if method not in outliers.METHODS:
+        raise HTTPException(
+            status_code=400, detail=f"method harus salah satu dari: {', '.join(outliers.METHODS)}"
+        )
+    if metric is not None and metric not in outliers.METRICS:
+        raise HTTPException(
+            status_code=400, detail=f"metric harus salah satu dari: {', '.join(outliers.METRICS)}"
+        )
+
+    version = await _current_version()
+    with span("dashboard.outliers"):
+        scored = await _outlier_scores(method, version)
+
+    flagged = scored[scored["outlier"]]
+    if metric is not None:
+        flagged = flagged[flagged["metrik"] == metric]
+    if kelompok:
+        flagged = flagged[flagged["kelompok"] == kelompok]
+    order = flagged["robust_z"].abs().sort_values(ascending=False, na_position="last").index
+    flagged = flagged.loc[order]
+
+    rows = []
+    for r in flagged.head(max(0, int(limit))).itertuples(index=False):
+        rows.append(
+            {
+                "NO": int(r.NO),
+                "NAMA": r.NAMA if isinstance(r.NAMA, str) else None,
+                "kelompok": r.kelompok,
+                "metrik": r.metrik,
+                "nilai": round(r.nilai, 4),
+                "median_kelompok": round(r.median, 4),
+                "robust_z": None if math.isnan(r.robust_z) else round(r.robust_z, 2),
+                "batas_bawah": None if math.isnan(r.batas_bawah) else round(r.batas_bawah, 4),
+                "batas_atas": None if math.isnan(r.batas_atas) else round(r.batas_atas, 4),
+            }
+        )
+    return {
+        "method": method,
+        "data_version": version,
+        "total": len(flagged),
+        "per_metrik": {m: int((flagged["metrik"] == m).sum()) for m in outliers.METRICS},
+        "outliers": rows,
+    }
+
+
+# ==================================
+# 🔀 Crosstab generik
+# ==================================
+# Kolom diambil dari whitelist turunan schemas.PetaniBase (alias = nama kolom
+# data_raw). Nama kolom dari query string TIDAK PERNAH masuk SQL langsung:
+# hanya alias dari whitelist yang di-quote sebagai identifier.
+CROSSTAB_EXCLUDED = {
+    "NAMA",
+    "NO HP",
+    "MASALAH",
+    "PELATIHAN YANG DIPERLUKAN",
+    "CATATAN",
+    "TGL PENDATAAN",
+    "TGL PERIKSA",
+    "HARGA JUAL PER KG",
+}
+CROSSTAB_MEASURES = ("count", "sum", "avg")
+
+
+def _crosstab_columns():
+    """(kolom kategori, kolom numerik) yang boleh dipakai crosstab"""
+    dimensions, numerics = {}, {}
+    for name, field in schemas.PetaniBase.model_fields.items():
+        alias = field.alias or name
+        if alias in CROSSTAB_EXCLUDED:
+            continue
+        target = numerics if int in getattr(field.annotation, "__args__", ()) else dimensions
+        # Terima alias ("METODE PANEN") maupun nama field ("metode_panen")
+        target[alias.upper()] = alias
+        target[name.upper()] = alias
+    # RT/RW berupa angka tapi bukan besaran yang masuk akal dijumlah
+    for column in ("RT", "RW"):
+        numerics.pop(column, None)
+    return dimensions, numerics
+
+
+CROSSTAB_DIMENSIONS, CROSSTAB_NUMERICS = _crosstab_columns()
+
+
+def _quote_ident(name):
+    return '"' + name.replace('"', '""') + '"'
+
+
+def _resolve_column(value, allowed, param):
+    alias = allowed.get((value or "").strip().upper())
+    if alias is None:
+        raise HTTPException(
+            status_code=400,
+            detail={
+                "message": f"Kolom '{value}' tidak diizinkan untuk {param}",
+                "allowed": sorted(set(allowed.values())),
+            },
+        )
+    return alias
+
+
+def _crosstab_number(value, measure):
+    if value is None:
+        return None
+    return round(float(value), 2) if measure == "avg" else int(value)
+
+
+@router.get("/crosstab")
+async def crosstab(
+    rows: str, cols: str = None, measure: str = "count", value: str = None
+):
+    """
+    Tabel kontingensi rows x cols (cols opsional) dari data_raw.
+    measure=count (jumlah petani), atau sum/avg dari kolom numerik `value`.
+    Contoh: ?rows=METODE PENGOLAHAN&cols=METODE PENJUALAN&measure=avg&value=HASIL PER TAHUN (kg)
+    """
+    measure = measure.lower()
+    if measure not in CROSSTAB_MEASURES:
+        raise HTTPException(
+            status_code=400, detail=f"measure harus salah satu dari {CROSSTAB_MEASURES}"
+        )
+    row_col = _resolve_column(rows, CROSSTAB_DIMENSIONS, "rows")
+    col_col = _resolve_column(cols, CROSSTAB_DIMENSIONS, "cols") if cols else None
+    value_col = None
+    if measure != "count":
+        if not value:
+            raise HTTPException(status_code=400, detail=f"measure={measure} butuh value")
+        value_col = _resolve_column(value, CROSSTAB_NUMERICS, "value")
+
+    key = f"dashboard:crosstab:{row_col}|{col_col or ''}|{measure}|{value_col or ''}"
+    return await cache.get_or_set(
+        key,
+        lambda: _compute_crosstab(row_col, col_col, measure, value_col),
+        ttl=cache.DATA_TTL,
+    )
+
+
+async def _compute_crosstab(row_col, col_col, measure, value_col):
+    row_sql = _quote_ident(row_col)
+    if measure == "count":
+        measure_sql = "COUNT(*)"
+    else:
+        measure_sql = f"{measure.upper()}({_quote_ident(value_col)})"
+
+    # Satu pass: sel + total baris + total kolom + grand total lewat GROUPING SETS
+    if col_col:
+        col_sql = _quote_ident(col_col)
+        query = f"""
+            SELECT {row_sql} AS row_value,
+                   {col_sql} AS col_value,
+                   GROUPING({row_sql}) AS row_total,
+                   GROUPING({col_sql}) AS col_total,
+                   {measure_sql} AS nilai
+            FROM data_raw
+            WHERE {row_sql} IS NOT NULL AND {row_sql} <> ''
+              AND {col_sql} IS NOT NULL AND {col_sql} <> ''
+            GROUP BY GROUPING SETS (({row_sql}, {col_sql}), ({row_sql}), ({col_sql}), ())
+        """
+    else:
+        # Satu dimensi: nilai per baris = total baris
+        query = f"""
+            SELECT {row_sql} AS row_value,
+                   NULL AS col_value,
+                   GROUPING({row_sql}) AS row_total,
+                   1 AS col_total,
+                   {measure_sql} AS nilai
+            FROM data_raw
+            WHERE {row_sql} IS NOT NULL AND {row_sql} <> ''
+            GROUP BY GROUPING SETS (({row_sql}), ())
+        """
+    with span("dashboard.crosstab"):
+        result = await read_database().fetch_all(query)
+
+    cells, row_totals, col_totals, grand_total = {}, {}, {}, None
+    for r in result:
+        nilai = _crosstab_number(r["nilai"], measure)
+        if r["row_total"] and r["col_total"]:
+            grand_total = nilai
+        elif r["row_total"]:
+            col_totals[r["col_value"]] = nilai
+        elif r["col_total"]:
+            row_totals[r["row_value"]] = nilai
+        else:
+            cells[(r["row_value"], r["col_value"])] = nilai
+
+    row_values = sorted(row_totals)
+    col_values = sorted(col_totals)
+    empty = 0 if measure == "count" else None
+    return {
+        "rows": row_col,
+        "cols": col_col,
+        "measure": measure,
+        "value": value_col,
+        "row_values": row_values,
+        "col_values": col_values if col_col else [],
+        "matrix": (
+            [[cells.get((rv, cv), empty) for cv in col_values] for rv in row_values]
+            if col_col
+            else []
+        ),
+        "row_totals": [row_totals[rv] for rv in row_values],
+        "col_totals": [col_totals[cv] for cv in col_values] if col_col else [],
+        "grand_total": grand_total,
+    }
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field, field_validator, ConfigDict
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List
 from datetime import datetime
 
 
@@ -296,3 +296,12 @@ class ValidateLaporanRequest(BaseModel):
     status: str  # 'valid' atau 'invalid'
     validator_name: str
     catatan_validator: Optional[str] = None
+
+
+class BulkValidateLaporanRequest(BaseModel):
+    """Schema untuk validasi banyak laporan sekaligus dengan satu status"""
+
+    laporan_ids: List[int] = Field(..., min_length=1, max_length=1000)
+    status: str  # 'valid' atau 'invalid'
+    validator_name: str
+    catatan_validator: Optional[str] = None
@@ -0,0 +1,93 @@
+from .lazy import lazy_import
+
+np = lazy_import("numpy")
+neighbors = lazy_import("sklearn.neighbors")
+
+# ======================================================
+# 🧭 Index tetangga terdekat (k-NN) yang bisa diperbarui
+# ======================================================
+# BallTree sklearn bersifat statis. Baris yang berubah setelah index dibangun
+# ditandai "removed" di tree dan vektornya disimpan di buffer delta kecil yang
+# dicari brute-force. Query = tree (minta lebih banyak kandidat sebanyak baris
+# yang dibuang) + delta, lalu digabung. Jika delta/removed melewati batas,
+# index dibangun ulang (compact) dari vektor yang sudah ada tanpa transform
+# ulang.
+
+REBUILD_MIN = 256  # perubahan minimum sebelum compact
+REBUILD_RATIO = 0.05  # atau 5% dari ukuran tree
+
+
+class NeighborIndex:
+    """Index k-NN atas vektor fitur per NO petani"""
+
+    def __init__(self, petani_nos, matrix):
+        self.base_nos = np.asarray(petani_nos)
+        self.base = np.asarray(matrix, dtype=float)
+        self.positions = {int(no): i for i, no in enumerate(self.base_nos)}
+        self.tree = neighbors.BallTree(self.base) if len(self.base) else None
+        self.removed = set()
+        self.delta = {}
+
+    def __len__(self):
+        # NO di delta yang juga ada di tree selalu tercatat di removed
+        return len(self.positions) - len(self.removed) + len(self.delta)
+
+    def upsert(self, petani_nos, matrix):
+        for no, vector in zip(petani_nos, np.asarray(matrix, dtype=float)):
+            no = int(no)
+            if no in self.positions:
+                self.removed.add(no)
+            self.delta[no] = vector
+
+    def delete(self, petani_nos):
+        for no in petani_nos:
+            no = int(no)
+            if no in self.positions:
+                self.removed.add(no)
+            self.delta.pop(no, None)
+
+    def vector(self, petani_no):
+        """Vektor fitur terbaru untuk NO (None jika tidak ada)"""
+        if petani_no in self.delta:
+            return self.delta[petani_no]
+        position = self.positions.get(petani_no)
+        if position is None or petani_no in self.removed:
+            return None
+        return self.base[position]
+
+    def needs_compact(self):
+        pending = len(self.delta) + len(self.removed)
+        return pending > max(REBUILD_MIN, REBUILD_RATIO * len(self.base))
+
+    def compact(self):
+        """Index baru berisi tree + delta (dipanggil di thread)"""
+        keep = np.array([no not in self.removed for no in self.base_nos.tolist()], dtype=bool)
+        petani_nos = self.base_nos[keep].tolist() + list(self.delta)
+        parts = [self.base[keep]]
+        if self.delta:
+            parts.append(np.vstack(list(self.delta.values())))
+        return NeighborIndex(petani_nos, np.vstack(parts))
+
+    def query(self, vector, k, exclude=None):
+        """[(NO, jarak)] k tetangga terdekat dari `vector`, urut jarak"""
+        candidates = []
+        if self.tree is not None:
+            fetch = min(len(self.base), k + len(self.removed) + 1)
+            distances, indices = self.tree.query(vector.reshape(1, -1), k=fetch)
+            for distance, index in zip(distances[0], indices[0]):
+                no = int(self.base_nos[index])
+                if no not in self.removed and no != exclude:
+                    candidates.append((no, float(distance)))
+
+        if self.delta:
+            delta_nos = list(self.delta)
+            delta_matrix = np.vstack(list(self.delta.values()))
+            distances = np.linalg.norm(delta_matrix - vector, axis=1)
+            candidates.extend(
+                (no, float(distance))
+                for no, distance in zip(delta_nos, distances)
+                if no != exclude
+            )
+
+        candidates.sort(key=lambda item: item[1])
+        return candidates[:k]
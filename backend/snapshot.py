@@ -0,0 +1,248 @@
+import io
+import os
+import time
+import asyncio
+
+from . import changes, metrics
+from .database import read_database
+from .lazy import lazy_import
+from .logger import get_logger
+
+pd = lazy_import("pandas")
+
+# ======================================================
+# 🧊 Snapshot kolumnar data_raw (in-process)
+# ======================================================
+# Endpoint analisis dulu mengambil SELECT * sebagai Record asyncpg, mengubah
+# tiap baris jadi dict lalu membangun DataFrame (tiga salinan tabel dalam objek
+# Python per request). Snapshot ini dibangun sekali per worker lewat COPY ->
+# read_csv: kolom numerik jadi array NumPy dan kolom teks jadi Categorical
+# (kode integer + daftar nilai unik), diurutkan berdasarkan NO.
+#
+# Perubahan data (crud di worker ini, NOTIFY channel dashboard dari worker
+# lain, atau change log data_raw di backend/changes.py) hanya menandai NO yang
+# berubah; baris itu diambil ulang saat snapshot dipakai berikutnya. Rebuild
+# penuh jika perubahan terlalu banyak atau snapshot lebih tua dari
+# SNAPSHOT_MAX_AGE (jaring pengaman jika change log belum dimigrasi).
+
+SNAPSHOT_MAX_AGE = int(os.getenv("SNAPSHOT_MAX_AGE", "3600"))  # detik
+INCREMENTAL_LIMIT = 1000  # lebih dari ini baris berubah -> rebuild penuh
+TABLE_NAME = "data_raw"
+TEXT_TYPES = {"text", "character varying", "character"}
+NULL_MARKER = "\\N"
+
+log = get_logger(__name__)
+
+_frame = None
+_text_columns = []
+_built_at = 0.0
+_version = 0
+_dirty = set()
+_needs_rebuild = False
+_lock = asyncio.Lock()
+_listeners = []
+
+
+def mark_changed(petani_no=None):
+    """Tandai baris NO berubah (None = rebuild penuh pada akses berikutnya)"""
+    global _needs_rebuild
+    if petani_no is None:
+        _needs_rebuild = True
+    else:
+        _dirty.add(petani_no)
+
+
+def add_listener(callback):
+    """
+    callback(petani_nos) dipanggil setiap snapshot berubah: set NO yang
+    diperbarui, atau None setelah rebuild penuh. Harus cepat (dipanggil di
+    dalam lock snapshot).
+    """
+    _listeners.append(callback)
+
+
+def _notify(petani_nos):
+    for callback in _listeners:
+        try:
+            callback(petani_nos)
+        except Exception:
+            log.exception("Listener snapshot gagal")
+
+
+def _on_changes(changes_set):
+    if changes_set["reset"]:
+        mark_changed(None)
+        return
+    for petani_no in changes_set["upserted"] | changes_set["deleted"]:
+        mark_changed(petani_no)
+
+
+def version():
+    """Nomor versi data snapshot, naik setiap ada perubahan yang diterapkan"""
+    return _version
+
+
+async def _column_types():
+    rows = await read_database().fetch_all(
+        """
+        SELECT column_name, data_type
+        FROM information_schema.columns
+        WHERE table_name = :table
+        ORDER BY ordinal_position
+        """,
+        values={"table": TABLE_NAME},
+    )
+    return {row["column_name"]: row["data_type"] for row in rows}
+
+
+def _parse_csv(buffer, column_types):
+    buffer.seek(0)
+    text_columns = [col for col, kind in column_types.items() if kind in TEXT_TYPES]
+    date_columns = [
+        col for col, kind in column_types.items() if kind.startswith(("date", "timestamp"))
+    ]
+    frame = pd.read_csv(
+        buffer,
+        dtype={col: "object" for col in text_columns},
+        keep_default_na=False,
+        na_values=[NULL_MARKER],
+        parse_dates=date_columns,
+    )
+    for col in text_columns:
+        frame[col] = frame[col].astype("category")
+    frame.index = frame["NO"].to_numpy()
+    return frame, text_columns
+
+
+async def _rebuild():
+    global _frame, _text_columns, _built_at, _version, _needs_rebuild
+    _needs_rebuild = False
+    _dirty.clear()
+
+    column_types = await _column_types()
+    buffer = io.BytesIO()
+    async with read_database().connection() as connection:
+        await connection.raw_connection.copy_from_query(
+            f'SELECT * FROM {TABLE_NAME} ORDER BY "NO"',
+            output=buffer,
+            format="csv",
+            header=True,
+            null=NULL_MARKER,
+        )
+    size = buffer.tell()
+    _frame, _text_columns = await asyncio.to_thread(_parse_csv, buffer, column_types)
+    _built_at = time.monotonic()
+    _version += 1
+    _notify(None)
+    log.info(
+        "Snapshot %s dibangun: %d baris, CSV %.1f MB, memori %.1f MB",
+        TABLE_NAME,
+        len(_frame),
+        size / 1e6,
+        _frame.memory_usage(deep=True).sum() / 1e6,
+    )
+
+
+async def _apply_changes(petani_nos):
+    global _frame, _version
+    rows = await read_database().fetch_all(
+        f'SELECT * FROM {TABLE_NAME} WHERE "NO" = ANY(:nos)',
+        values={"nos": list(petani_nos)},
+    )
+
+    frame = _frame.drop(index=[no for no in petani_nos if no in _frame.index])
+    if rows:
+        changed = pd.DataFrame([dict(row) for row in rows], columns=frame.columns)
+        changed.index = changed["NO"].to_numpy()
+        for col in _text_columns:
+            values = changed[col].astype(object)
+            new_categories = pd.Index(values.dropna().unique()).difference(
+                frame[col].cat.categories
+            )
+            if len(new_categories):
+                frame[col] = frame[col].cat.add_categories(new_categories)
+            changed[col] = pd.Categorical(values, categories=frame[col].cat.categories)
+        frame = pd.concat([frame, changed]).sort_index()
+
+    _frame = frame
+    _version += 1
+    _notify(set(petani_nos))
+    log.debug("Snapshot diperbarui untuk %d baris", len(petani_nos))
+
+
+async def _ensure_fresh():
+    async with _lock:
+        stale = time.monotonic() - _built_at > SNAPSHOT_MAX_AGE
+        if _frame is None or _needs_rebuild or stale or len(_dirty) > INCREMENTAL_LIMIT:
+            await _rebuild()
+        elif _dirty:
+            changed = set(_dirty)
+            _dirty.difference_update(changed)
+            await _apply_changes(changed)
+
+
+async def get_frame(columns=None):
+    """
+    DataFrame dari snapshot (baris urut NO). Hanya kolom `columns` yang disalin
+    (kolom yang tidak ada dilewati); kolom teks tetap Categorical. Pemanggil
+    yang butuh object (kode analisis lama) memakai decode_text().
+    """
+    await _ensure_fresh()
+    return _select(_frame, columns)
+
+
+async def get_rows(petani_nos, columns=None):
+    """Seperti get_frame, tapi hanya baris dengan NO di `petani_nos`"""
+    await _ensure_fresh()
+    found = _frame.index.intersection(list(petani_nos))
+    return _select(_frame.loc[found], columns)
+
+
+def _select(frame, columns):
+    if columns is None:
+        return frame.reset_index(drop=True)
+    selected = [col for col in dict.fromkeys(columns) if col in frame.columns]
+    return frame[selected].reset_index(drop=True)
+
+
+def decode_text(df):
+    """Ubah kolom Categorical ke object (sama seperti DataFrame hasil SELECT *)"""
+    for col in df.columns:
+        if isinstance(df[col].dtype, pd.CategoricalDtype):
+            df[col] = df[col].astype(object)
+    return df
+
+
+async def columns():
+    """Daftar kolom data_raw di snapshot"""
+    await _ensure_fresh()
+    return list(_frame.columns)
+
+
+async def text_value_counts(column):
+    """{teks: jumlah baris} untuk kolom teks, tanpa NULL dan string kosong"""
+    await _ensure_fresh()
+    if column not in _frame.columns:
+        return {}
+    counts = _frame[column].value_counts(sort=False)
+    return {text: int(count) for text, count in counts.items() if count > 0 and text != ""}
+
+
+def _snapshot_stats():
+    if _frame is None:
+        return None
+    return {
+        ("rows",): len(_frame),
+        ("memory_bytes",): int(_frame.memory_usage(deep=True).sum()),
+        ("version",): _version,
+    }
+
+
+changes.subscribe(_on_changes)
+
+metrics.Gauge(
+    "data_raw_snapshot",
+    "Statistik snapshot kolumnar data_raw di worker ini",
+    ["stat"],
+    function=_snapshot_stats,
+)
@@ -0,0 +1,8 @@
+import os
+
+# backend.auth membaca konfigurasi JWT saat import; nilai dummy cukup untuk
+# unit test (tidak ada koneksi database atau token yang dibuat)
+os.environ.setdefault("SECRET_KEY", "test")
+os.environ.setdefault("ALGORITHM", "HS256")
+os.environ.setdefault("ACCESS_TOKEN_EXPIRE_MINUTES", "30")
+os.environ.setdefault("WATCHDOG_ENABLED", "false")
@@ -0,0 +1,101 @@
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+
+from backend.routers import dashboard
+from backend.routers.dashboard import (
+    CROSSTAB_DIMENSIONS,
+    CROSSTAB_NUMERICS,
+    _compute_crosstab,
+    _resolve_column,
+)
+
+PRIVATE_COLUMNS = ["NAMA", "NO HP", "MASALAH", "CATATAN", "TGL PENDATAAN", "TGL PERIKSA"]
+
+
+def test_resolves_alias_and_field_name_case_insensitive():
+    assert _resolve_column(" metode panen ", CROSSTAB_DIMENSIONS, "rows") == "METODE PANEN"
+    assert _resolve_column("metode_panen", CROSSTAB_DIMENSIONS, "rows") == "METODE PANEN"
+    assert (
+        _resolve_column("hasil per tahun (kg)", CROSSTAB_NUMERICS, "value")
+        == "HASIL PER TAHUN (kg)"
+    )
+
+
+@pytest.mark.parametrize("column", PRIVATE_COLUMNS + ['NAMA"; DROP TABLE data_raw; --', ""])
+def test_rejects_private_and_unknown_columns(column):
+    for allowed, param in ((CROSSTAB_DIMENSIONS, "rows"), (CROSSTAB_NUMERICS, "value")):
+        with pytest.raises(HTTPException) as error:
+            _resolve_column(column, allowed, param)
+        assert error.value.status_code == 400
+        assert column not in error.value.detail["allowed"]
+
+
+@pytest.mark.parametrize("column", ["RT", "RW"])
+def test_rt_rw_are_not_value_columns(column):
+    with pytest.raises(HTTPException):
+        _resolve_column(column, CROSSTAB_NUMERICS, "value")
+
+
+class FakeDatabase:
+    def __init__(self, rows):
+        self.rows = rows
+
+    async def fetch_all(self, query):
+        return self.rows
+
+
+def compute(monkeypatch, rows, *args):
+    monkeypatch.setattr(dashboard, "read_database", lambda: FakeDatabase(rows))
+    return asyncio.run(_compute_crosstab(*args))
+
+
+def row(row_value, col_value, row_total, col_total, nilai):
+    return {
+        "row_value": row_value,
+        "col_value": col_value,
+        "row_total": row_total,
+        "col_total": col_total,
+        "nilai": nilai,
+    }
+
+
+def test_two_dimensional_grouping_sets(monkeypatch):
+    rows = [
+        row("natural", "Tengkulak", 0, 0, 3),
+        row("natural", "langsung", 0, 0, 1),
+        row("Honey", "langsung", 0, 0, 2),
+        row("natural", None, 0, 1, 4),
+        row("Honey", None, 0, 1, 2),
+        row(None, "Tengkulak", 1, 0, 3),
+        row(None, "langsung", 1, 0, 3),
+        row(None, None, 1, 1, 6),
+    ]
+    result = compute(
+        monkeypatch, rows, "METODE PENGOLAHAN", "METODE PENJUALAN", "count", None
+    )
+
+    assert result["row_values"] == ["Honey", "natural"]
+    assert result["col_values"] == ["Tengkulak", "langsung"]
+    # sel kosong = 0 untuk count
+    assert result["matrix"] == [[0, 2], [3, 1]]
+    assert result["row_totals"] == [2, 4]
+    assert result["col_totals"] == [3, 3]
+    assert result["grand_total"] == 6
+
+
+def test_one_dimensional_avg(monkeypatch):
+    rows = [
+        row("natural", None, 0, 1, 812.345),
+        row("Honey", None, 0, 1, 700),
+        row(None, None, 1, 1, 780.5),
+    ]
+    result = compute(
+        monkeypatch, rows, "METODE PENGOLAHAN", None, "avg", "HASIL PER TAHUN (kg)"
+    )
+
+    assert result["row_values"] == ["Honey", "natural"]
+    assert result["row_totals"] == [700.0, 812.35]
+    assert result["col_values"] == [] and result["matrix"] == [] and result["col_totals"] == []
+    assert result["grand_total"] == 780.5
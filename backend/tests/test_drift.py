@@ -0,0 +1,65 @@
+from backend.drift import DriftMonitor, psi
+
+REFERENCE = {
+    "numeric": {"LUAS": {"min": 0.0, "median": 10.0, "max": 20.0, "mean": 10.0}},
+    "categorical": {
+        "PUPUK": {
+            "mode": "Organik",
+            "categories": ["Kimia", "Organik"],
+            "frequencies": {"Kimia": 0.5, "Organik": 0.5},
+        }
+    },
+    "n_training": 10,
+}
+
+
+def upsert(monitor, rows):
+    """rows: {NO: (LUAS, PUPUK)}"""
+    monitor.upsert(
+        list(rows),
+        [[luas] for luas, _ in rows.values()],
+        [[pupuk] for _, pupuk in rows.values()],
+    )
+
+
+def build(rows):
+    monitor = DriftMonitor(REFERENCE)
+    upsert(monitor, rows)
+    return monitor
+
+
+def test_psi_identical_distribution_is_zero():
+    assert psi([0.5, 0.5], [0.5, 0.5]) == 0
+
+
+def test_insert_delete_matches_full_rebuild():
+    rows = {no: (float(no), "Kimia" if no % 3 else "Organik") for no in range(1, 101)}
+    monitor = build(rows)
+
+    # ganti, tambah (termasuk nilai kosong) lalu hapus beberapa baris
+    changed = {5: (500.0, "Hidroponik"), 200: (None, None), 201: (7.0, "Kimia")}
+    upsert(monitor, changed)
+    monitor.delete([10, 20, 999])
+    rows.update(changed)
+    del rows[10], rows[20]
+
+    assert len(monitor) == len(rows)
+    assert monitor.report() == build(rows).report()
+
+
+def test_missing_values_use_training_imputation():
+    monitor = build({1: (None, None)})
+    report = monitor.report()
+
+    assert report["features"]["LUAS"]["live"]["median"] == 10.0
+    assert report["features"]["LUAS"]["kosong"] == 1
+    assert report["features"]["PUPUK"]["live"] == {"Organik": 1.0}
+
+
+def test_delete_everything_empties_report():
+    monitor = build({1: (1.0, "Kimia"), 2: (2.0, "Organik")})
+    monitor.delete([1, 2])
+
+    assert len(monitor) == 0
+    assert monitor.values["LUAS"] == []
+    assert monitor.report() == {"rows": 0, "features": {}, "stale": None}
@@ -0,0 +1,69 @@
+import pandas as pd
+
+from backend import outliers
+
+
+def frame():
+    rows = []
+    for i in range(10):
+        rows.append(
+            {
+                "NO": i + 1,
+                "NAMA": f"Petani {i + 1}",
+                "KELOMPOK TANI": "Tani Makmur",
+                "HASIL PER TAHUN (kg)": 800 + i * 10,
+                "TOTAL LAHAN (M2)": 5000 + i * 100,
+            }
+        )
+    # salah ketik kelebihan satu nol
+    rows[3]["HASIL PER TAHUN (kg)"] = 8300
+    # kelompok kecil tidak dinilai walau nilainya ekstrem
+    for no, hasil in ((11, 100), (12, 100), (13, 90000)):
+        rows.append(
+            {
+                "NO": no,
+                "NAMA": f"Petani {no}",
+                "KELOMPOK TANI": "Kopi Luhur",
+                "HASIL PER TAHUN (kg)": hasil,
+                "TOTAL LAHAN (M2)": 5000,
+            }
+        )
+    return pd.DataFrame(rows)
+
+
+def test_mad_flags_tenfold_typo():
+    scored = outliers.score(frame(), "mad")
+    flagged = scored[scored["outlier"]]
+
+    assert set(zip(flagged["NO"], flagged["metrik"])) == {
+        (4, "hasil_per_tahun_kg"),
+        (4, "hasil_per_m2"),
+    }
+    assert outliers.flagged_nos(scored, ("hasil_per_tahun_kg",)) == {4}
+    assert outliers.flagged_nos(scored, ("total_lahan_m2",)) == set()
+
+
+def test_iqr_flags_tenfold_typo():
+    scored = outliers.score(frame(), "iqr")
+
+    assert outliers.flagged_nos(scored) == {4}
+
+
+def test_small_groups_are_not_flagged():
+    scored = outliers.score(frame(), "mad")
+    small = scored[scored["kelompok"] == "Kopi Luhur"]
+
+    assert (small["n"] < outliers.MIN_GROUP_SIZE).all()
+    assert not small["outlier"].any()
+
+
+def test_ignores_missing_and_non_positive_values():
+    df = frame()
+    df.loc[0, "HASIL PER TAHUN (kg)"] = None
+    df.loc[1, "TOTAL LAHAN (M2)"] = 0
+    scored = outliers.score(df, "mad")
+
+    hasil = scored[scored["metrik"] == "hasil_per_tahun_kg"]
+    lahan = scored[scored["metrik"] == "total_lahan_m2"]
+    assert 1 not in set(hasil["NO"])
+    assert 2 not in set(lahan["NO"])
@@ -0,0 +1,54 @@
+import numpy as np
+
+from backend.similarity import NeighborIndex
+
+
+def brute_force(vectors, vector, k, exclude=None):
+    distances = [
+        (no, float(np.linalg.norm(v - vector))) for no, v in vectors.items() if no != exclude
+    ]
+    return sorted(distances, key=lambda item: item[1])[:k]
+
+
+def assert_same(index, vectors, k=5):
+    for no in list(vectors)[:20]:
+        expected = brute_force(vectors, vectors[no], k, exclude=no)
+        result = index.query(vectors[no], k, exclude=no)
+        assert [n for n, _ in result] == [n for n, _ in expected]
+        np.testing.assert_allclose([d for _, d in result], [d for _, d in expected])
+
+
+def make_vectors(rng, nos, dims=6):
+    return {no: rng.random(dims) for no in nos}
+
+
+def test_query_matches_brute_force():
+    rng = np.random.default_rng(0)
+    vectors = make_vectors(rng, range(1, 301))
+    index = NeighborIndex(list(vectors), np.vstack(list(vectors.values())))
+
+    assert len(index) == 300
+    assert_same(index, vectors)
+
+
+def test_upsert_and_delete_match_brute_force():
+    rng = np.random.default_rng(1)
+    vectors = make_vectors(rng, range(1, 301))
+    index = NeighborIndex(list(vectors), np.vstack(list(vectors.values())))
+
+    changed = make_vectors(rng, [3, 7, 11, 400, 401])
+    index.upsert(list(changed), np.vstack(list(changed.values())))
+    index.delete([5, 9, 401])
+    vectors.update(changed)
+    for no in (5, 9, 401):
+        del vectors[no]
+
+    assert len(index) == len(vectors)
+    assert index.vector(5) is None
+    np.testing.assert_array_equal(index.vector(3), changed[3])
+    assert_same(index, vectors)
+
+    compacted = index.compact()
+    assert len(compacted) == len(vectors)
+    assert not compacted.removed and not compacted.delta
+    assert_same(compacted, vectors)
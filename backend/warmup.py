@@ -0,0 +1,129 @@
+import os
+import time
+import asyncio
+
+from .logger import get_logger
+
+# ======================================================
+# 🔥 Warm-up setelah startup
+# ======================================================
+# Modul berat (pandas, sklearn lewat joblib, SDK Gemini) dan hash admin tidak
+# lagi dimuat saat import. Setelah server siap menerima request, langkah-langkah
+# di bawah dijalankan di background (langkah sinkron lewat thread supaya event
+# loop tetap bebas). Progresnya dilaporkan oleh GET /ready.
+#
+# WARMUP_PRECOMPUTE=true (opt-in) menambah langkah yang menghitung hasil
+# clustering, word cloud dan agregat dashboard ke cache, supaya user pertama
+# setelah deploy tidak menanggung komputasi dingin. Langkah ini berjalan
+# setelah connect_to_db dan /ready baru 200 setelah semuanya selesai.
+
+WARMUP_PRECOMPUTE = os.getenv("WARMUP_PRECOMPUTE", "false").lower() == "true"
+
+log = get_logger(__name__)
+
+_steps = []
+_state = {"started_at": None, "finished_at": None, "steps": {}}
+_task = None
+
+
+def add_step(name, func):
+    """Daftarkan langkah warm-up (fungsi biasa atau coroutine function)"""
+    _steps.append((name, func))
+    _state["steps"][name] = "pending"
+
+
+def _import_data_stack():
+    import pandas  # noqa: F401
+    import numpy  # noqa: F401
+
+
+async def _precompute_wordclouds():
+    from .routers import analysis
+
+    await analysis.get_wordcloud_data()
+    await analysis.get_wordcloud_pelatihan()
+
+
+async def _precompute_dashboard():
+    from .routers import dashboard
+
+    cache_endpoints = [
+        dashboard.get_summary,
+        dashboard.distribusi_jenis_kopi,
+        dashboard.distribusi_metode_panen,
+        dashboard.distribusi_metode_pengolahan,
+        dashboard.distribusi_proses_pengeringan,
+        dashboard.distribusi_metode_penjualan,
+        dashboard.distribusi_varietas_kopi,
+        dashboard.kelompok_tani_vs_hasil,
+        dashboard.kelompok_tani_vs_lahan,
+        dashboard.kelompok_tani_vs_populasi,
+    ]
+    for endpoint in cache_endpoints:
+        await endpoint()
+
+
+def _register_default_steps():
+    from .routers import analysis, authentication
+
+    add_step("import:pandas", _import_data_stack)
+    add_step("model:produk_budidaya", lambda: analysis.get_model("produk_budidaya"))
+    add_step("model:profil_pasar", lambda: analysis.get_model("profil_pasar"))
+    add_step("model:gemini", lambda: analysis.get_model("gemini"))
+    add_step("auth:admin_hash", authentication.get_admin_user)
+
+    if WARMUP_PRECOMPUTE:
+        add_step("precompute:dashboard", _precompute_dashboard)
+        add_step("precompute:wordcloud", _precompute_wordclouds)
+        add_step("precompute:cluster_produk_budidaya", analysis.cluster_produk_budidaya)
+        add_step("precompute:cluster_profil_pasar", analysis.cluster_profil_pasar)
+
+
+async def _run():
+    _state["started_at"] = time.time()
+    for name, func in _steps:
+        _state["steps"][name] = "running"
+        start = time.perf_counter()
+        try:
+            if asyncio.iscoroutinefunction(func):
+                await func()
+            else:
+                await asyncio.to_thread(func)
+            _state["steps"][name] = "done"
+            log.info("Warm-up %s selesai (%.0f ms)", name, (time.perf_counter() - start) * 1000)
+        except Exception:
+            _state["steps"][name] = "failed"
+            log.exception("Warm-up %s gagal", name)
+    _state["finished_at"] = time.time()
+
+
+def readiness():
+    """Ringkasan progres warm-up untuk endpoint /ready"""
+    steps = _state["steps"]
+    finished = sum(1 for status in steps.values() if status in ("done", "failed"))
+    return {
+        "done": _state["finished_at"] is not None,
+        "progress": f"{finished}/{len(steps)}",
+        "steps": dict(steps),
+    }
+
+
+async def start_warmup():
+    """Jalankan warm-up di background tanpa menahan startup"""
+    global _task
+    if _task is not None:
+        return
+    _register_default_steps()
+    _task = asyncio.create_task(_run())
+
+
+async def stop_warmup():
+    global _task
+    if _task is None:
+        return
+    _task.cancel()
+    try:
+        await _task
+    except asyncio.CancelledError:
+        pass
+    _task = None
@@ -0,0 +1,161 @@
+import os
+import sys
+import time
+import asyncio
+import threading
+import traceback
+
+from . import metrics
+from .logger import get_logger
+
+# ======================================================
+# 🐕 Watchdog event loop
+# ======================================================
+# Task kecil di event loop mencatat "detak" setiap WATCHDOG_INTERVAL detik
+# dan mengukur keterlambatannya (lag). Thread terpisah memeriksa detak itu:
+# jika loop tidak berdetak lebih dari WATCHDOG_THRESHOLD detik, thread
+# mengambil stack thread event loop (sys._current_frames) dan mencatat
+# route yang sedang diproses. Kode sinkron berat (pandas/sklearn, bcrypt,
+# SDK Gemini) di handler async akan terlihat di log dan metric ini.
+
+WATCHDOG_ENABLED = os.getenv("WATCHDOG_ENABLED", "true").lower() == "true"
+WATCHDOG_INTERVAL = float(os.getenv("WATCHDOG_INTERVAL", "0.1"))
+WATCHDOG_THRESHOLD = float(os.getenv("WATCHDOG_THRESHOLD", "0.5"))
+STACK_DEPTH = 20  # frame terdalam yang ditulis ke log
+
+log = get_logger(__name__)
+
+LOOP_LAG = metrics.Histogram(
+    "event_loop_lag_seconds",
+    "Keterlambatan event loop dibanding jadwal sleep",
+    buckets=(0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30),
+)
+LOOP_LAG_MAX = metrics.Gauge(
+    "event_loop_lag_max_seconds",
+    "Lag event loop terbesar sejak proses berjalan",
+)
+LOOP_STALLS = metrics.Counter(
+    "event_loop_stalls_total",
+    "Jumlah kejadian event loop terblok melewati WATCHDOG_THRESHOLD",
+    ["route"],
+)
+
+# Request yang sedang diproses: id(scope) -> (method, scope, waktu mulai)
+_inflight = {}
+_last_beat = None
+_max_lag = 0.0
+_loop_thread_id = None
+_monitor_task = None
+_watchdog_thread = None
+_stop_event = threading.Event()
+
+
+def _route_of(scope):
+    # Template route saja (sama dengan metrics_middleware), bukan path mentah,
+    # supaya label metrik tidak bertambah untuk setiap URL 404
+    route = scope.get("route")
+    return getattr(route, "path", None) or "unmatched"
+
+
+def inflight_requests():
+    """Daftar request yang sedang berjalan beserta umurnya (detik)"""
+    now = time.monotonic()
+    return [
+        {"method": method, "route": _route_of(scope), "age": round(now - started, 3)}
+        for method, scope, started in list(_inflight.values())
+    ]
+
+
+async def inflight_middleware(request, call_next):
+    """Catat request yang sedang diproses supaya stall bisa dikaitkan ke route"""
+    key = id(request.scope)
+    _inflight[key] = (request.method, request.scope, time.monotonic())
+    try:
+        return await call_next(request)
+    finally:
+        _inflight.pop(key, None)
+
+
+async def _monitor():
+    global _last_beat, _max_lag
+    while True:
+        scheduled = time.monotonic()
+        _last_beat = scheduled
+        await asyncio.sleep(WATCHDOG_INTERVAL)
+        lag = max(0.0, time.monotonic() - scheduled - WATCHDOG_INTERVAL)
+        LOOP_LAG.observe(lag)
+        if lag > _max_lag:
+            _max_lag = lag
+            LOOP_LAG_MAX.set(lag)
+
+
+def _report_stall(blocked_for):
+    frame = sys._current_frames().get(_loop_thread_id)
+    if frame is not None:
+        stack = "".join(traceback.format_stack(frame, limit=STACK_DEPTH))
+    else:
+        stack = "(stack tidak tersedia)"
+    requests = inflight_requests()
+
+    # Request tertua yang masih berjalan paling mungkin pemegang loop
+    route = max(requests, key=lambda r: r["age"])["route"] if requests else "-"
+    LOOP_STALLS.inc(route=route)
+    log.warning(
+        "Event loop terblok %.2f detik (route: %s, in-flight: %s)\nStack event loop:\n%s",
+        blocked_for,
+        route,
+        requests,
+        stack,
+    )
+
+
+def _watch():
+    reported_beat = None
+    while not _stop_event.wait(WATCHDOG_INTERVAL):
+        beat = _last_beat
+        if beat is None:
+            continue
+        blocked_for = time.monotonic() - beat - WATCHDOG_INTERVAL
+        # Satu laporan per kejadian stall (detak yang sama tidak dilaporkan dua kali)
+        if blocked_for > WATCHDOG_THRESHOLD and beat != reported_beat:
+            reported_beat = beat
+            try:
+                _report_stall(blocked_for)
+            except Exception:
+                log.exception("Gagal melaporkan stall event loop")
+
+
+async def start_watchdog():
+    """Mulai task monitor dan thread watchdog saat aplikasi start"""
+    global _monitor_task, _watchdog_thread, _loop_thread_id
+    if not WATCHDOG_ENABLED or _monitor_task is not None:
+        return
+
+    _loop_thread_id = threading.get_ident()
+    _stop_event.clear()
+    _monitor_task = asyncio.create_task(_monitor())
+    _watchdog_thread = threading.Thread(target=_watch, name="loop-watchdog", daemon=True)
+    _watchdog_thread.start()
+    log.info(
+        "Watchdog event loop aktif (interval %.2fs, threshold %.2fs)",
+        WATCHDOG_INTERVAL,
+        WATCHDOG_THRESHOLD,
+    )
+
+
+async def stop_watchdog():
+    """Hentikan watchdog saat aplikasi shutdown"""
+    global _monitor_task, _watchdog_thread, _last_beat
+    if _monitor_task is None:
+        return
+
+    _stop_event.set()
+    _monitor_task.cancel()
+    try:
+        await _monitor_task
+    except asyncio.CancelledError:
+        pass
+    _watchdog_thread.join(timeout=1)
+    _monitor_task = None
+    _watchdog_thread = None
+    _last_beat = None
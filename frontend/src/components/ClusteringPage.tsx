@@ -195,6 +195,32 @@ interface ClusteringData {
   };
 }
 
+// Ringkasan cluster tidak lagi memuat nama petani; tiap kartu mengambil
+// halaman pertama anggota dari endpoint members
+const MEMBERS_PREVIEW = 50;
+
+const withMemberNames = async (clusterType: string, data: ClusteringData): Promise<ClusteringData> => {
+  const clusters = await Promise.all(
+    data.clusters.map(async (cluster) => {
+      if (cluster.petani_names) return cluster;
+      try {
+        const res = await fetch(
+          `${API_BASE_URL}/analysis/clusters/${clusterType}/${cluster.cluster_id}/members?page_size=${MEMBERS_PREVIEW}&sort=NAMA`
+        );
+        if (!res.ok) return cluster;
+        const page = await res.json();
+        const names = page.members
+          .map((member: { NAMA: string | null }) => member.NAMA)
+          .filter((name: string | null): name is string => !!name);
+        return { ...cluster, petani_names: names };
+      } catch {
+        return cluster;
+      }
+    })
+  );
+  return { ...data, clusters };
+};
+
 export function ClusteringPage() {
   const [produkBudidaya, setProdukBudidaya] = useState<ClusteringData | null>(null);
   const [profilPasar, setProfilPasar] = useState<ClusteringData | null>(null);
@@ -216,11 +242,13 @@ export function ClusteringPage() {
         if (!produkRes.ok) throw new Error('API not available');
         const produkData = await produkRes.json();
         setProdukBudidaya(produkData);
+        withMemberNames('produk_budidaya', produkData).then(setProdukBudidaya);
 
         const pasarRes = await fetch(`${API_BASE_URL}/analysis/cluster-profil-pasar`);
         if (!pasarRes.ok) throw new Error('API not available');
         const pasarData = await pasarRes.json();
         setProfilPasar(pasarData);
+        withMemberNames('profil_pasar', pasarData).then(setProfilPasar);
         
         console.log('✅ Data loaded from API');
       } catch (apiError) {